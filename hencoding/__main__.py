@@ -7,30 +7,108 @@ command:
 python -m hencoding input_file output_file [--encode/decode] 
         [...optional arguments]
 
+Passing '-' as the input or output file streams from stdin or to stdout. Only
+converted lines are then written to the output, and the report is written to
+stderr or to the file given by --report.
+
 The primary functionality lies in the package modules, and not directly in the
 main module here.
 
 Author: Rani Hinnawi
 Date: 2023-08-08
 """
-from sys import stderr
+from contextlib import ExitStack
+from sys import stderr, stdin, stdout
 from pathlib import Path
 import argparse
 from support.is_valid_io import is_valid_io
+from support.metrics_export import export_json, export_prometheus
 from hencoding.run import run
+from hencoding.stream import run_stream, DEFAULT_FLUSH_LINES
+from hencoding.chunked_reader import DEFAULT_CHUNK_SIZE
+from hencoding.pipeline import DEFAULT_QUEUE_SIZE
+from hencoding.block_model import DEFAULT_BLOCK_SIZE
+from hencoding.transforms import TRANSFORMS
+from hencoding.engines import AUTO_ENGINE, ENGINE_NAMES
 
 DEFAULT_FREQUENCY_TABLE_PATH = "hencoding/DefaultFreqTable.txt"
+STREAM = "-"
 
 # Set up command line argument parsing
 arg_parser = argparse.ArgumentParser()
-arg_parser.add_argument("input_file", type=str, help="Input file pathname")
-arg_parser.add_argument("output_file", type=str, help="Output file pathname")
+arg_parser.add_argument("input_file", type=str,
+                        help="Input file pathname OR '-' for stdin")
+arg_parser.add_argument("output_file", type=str,
+                        help="Output file pathname OR '-' for stdout")
 arg_parser.add_argument("--frequency_table", type=str,
                         help="(Optional) Frequency table file pathname")
 arg_parser.add_argument("--memoize", action="store_true",
                         help="Toggles on memoization for encoding")
 arg_parser.add_argument("--debug", action="store_true",
                         help="Toggles debug mode to log errors to stderr")
+arg_parser.add_argument("--workers", type=int, default=1,
+                        help="(Optional) Number of worker processes for "
+                        "converting long lines in parallel chunks")
+arg_parser.add_argument("--speculative", action="store_true",
+                        help="Toggles on speculative parallel decoding of "
+                        "long bitstreams without whitespace")
+arg_parser.add_argument("--dry-run", "--dry_run", dest="dry_run",
+                        action="store_true",
+                        help="Projects encoded sizes without encoding. "
+                        "Requires --encode")
+arg_parser.add_argument("--track-memory", "--track_memory",
+                        dest="track_memory", action="store_true",
+                        help="Measures peak and net change in memory of "
+                        "tree construction and each conversion")
+arg_parser.add_argument("--metrics_json", type=str,
+                        help="(Optional) File pathname to export conversion "
+                        "metrics to as JSON")
+arg_parser.add_argument("--metrics_prometheus", type=str,
+                        help="(Optional) File pathname to export conversion "
+                        "metrics to in Prometheus text format")
+arg_parser.add_argument("--pipelined", action="store_true",
+                        help="Toggles on reading, converting, and writing in "
+                        "overlapping threads")
+arg_parser.add_argument("--queue_size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="(Optional) Max number of lines held between "
+                        "pipeline stages")
+arg_parser.add_argument("--model_tables", type=str, nargs='+',
+                        help="(Optional) Frequency table pathnames of extra "
+                        "trees. Each block is converted with the best tree")
+arg_parser.add_argument("--block_size", type=int, default=DEFAULT_BLOCK_SIZE,
+                        help="(Optional) Number of characters per block with "
+                        "--model_tables")
+arg_parser.add_argument("--inline_trees", action="store_true",
+                        help="Lets a block store its own tree when that saves "
+                        "bits. Requires --model_tables")
+arg_parser.add_argument("--transforms", type=str, nargs='+',
+                        choices=list(TRANSFORMS),
+                        help="(Optional) Reversible transforms applied in "
+                        "order before encoding and undone after decoding")
+arg_parser.add_argument("--engine", type=str,
+                        choices=[AUTO_ENGINE, *ENGINE_NAMES],
+                        help="(Optional) Engine encoding every line, or "
+                        "'auto' to pick the fastest per line size")
+arg_parser.add_argument("--sample_rate", type=int, default=1,
+                        help="(Optional) Times 1 in N lines and only counts "
+                        "the rest, scaling report totals to estimates")
+arg_parser.add_argument("--mapped", action="store_true",
+                        help="Decodes lines directly from a read-only memory "
+                        "map of the input file. Requires --decode")
+arg_parser.add_argument("--report", type=str,
+                        help="(Optional) When streaming, file pathname to "
+                        "write the report to instead of stderr")
+arg_parser.add_argument("--flush_lines", type=int,
+                        default=DEFAULT_FLUSH_LINES,
+                        help="(Optional) When streaming, number of output "
+                        "lines written between flushes")
+
+arg_parser.add_argument("--chunk_size", type=int, nargs='?',
+                        const=DEFAULT_CHUNK_SIZE,
+                        help="(Optional) When streaming, reads and converts "
+                        "lines in pieces of this many characters, so long "
+                        f"lines are never held whole (default: "
+                        f"{DEFAULT_CHUNK_SIZE})")
 
 # Either --encode or --decode may be passed in. Not both nor neither
 group = arg_parser.add_mutually_exclusive_group(required=True)
@@ -40,17 +118,101 @@ group.add_argument("--decode", action="store_true",
                    help="Indicates to decode input file strings")
 args = arg_parser.parse_args()
 
+if args.dry_run and not args.encode:
+    arg_parser.error("--dry-run requires --encode")
+
+if args.model_tables and (args.workers > 1):
+    arg_parser.error("--model_tables cannot be used with --workers")
+
+if args.sample_rate < 1:
+    arg_parser.error("--sample_rate must be a positive integer")
+
+if args.engine and (args.model_tables or (args.workers > 1)):
+    arg_parser.error("--engine cannot be used with --model_tables or "
+                     "--workers")
+
+if args.mapped and (args.encode or args.pipelined or args.model_tables or
+                    args.transforms or (args.workers > 1)):
+    arg_parser.error("--mapped requires --decode and cannot be used with "
+                     "--pipelined, --model_tables, --transforms, or --workers")
+
+streaming = STREAM in (args.input_file, args.output_file)
+if (args.chunk_size is not None) and not streaming:
+    arg_parser.error("--chunk_size can only be used when streaming")
+
+if (args.chunk_size is not None) and (args.chunk_size < 1):
+    arg_parser.error("--chunk_size must be a positive integer")
+
+if streaming and (args.dry_run or args.pipelined or args.model_tables or
+                  args.transforms or args.mapped or (args.workers > 1)):
+    arg_parser.error("--dry-run, --pipelined, --model_tables, --transforms, "
+                     "--mapped, and --workers cannot be used when streaming")
+
 # Convert file names into paths
 in_file = Path(args.input_file)
 out_file = Path(args.output_file)
 freq_table = Path(args.frequency_table) if args.frequency_table else Path(
     DEFAULT_FREQUENCY_TABLE_PATH)
+model_tables = [Path(model_table) for model_table in args.model_tables or []]
+metrics_files = [Path(metrics_file).resolve().parent
+                 for metrics_file in (args.metrics_json,
+                                      args.metrics_prometheus) if metrics_file]
+
+
+def run_streaming() -> None:
+    """
+    Helper function for converting with '-' as the input or output file.
+    Output files are created if they don't exist
+    """
+    stream_files = [Path(args.report).resolve().parent] if args.report else []
+    if args.input_file != STREAM:
+        stream_files.append(in_file)
+    if args.output_file != STREAM:
+        stream_files.append(out_file.resolve().parent)
+
+    is_valid_io(freq_table, *stream_files, *metrics_files)
+
+    with ExitStack() as stack:
+        input_stream = stdin if args.input_file == STREAM else \
+            stack.enter_context(open(in_file, 'r', encoding="utf-8"))
+        output_stream = stdout if args.output_file == STREAM else \
+            stack.enter_context(open(out_file, 'w', encoding="utf-8"))
+        report_stream = stack.enter_context(
+            open(args.report, 'w', encoding="utf-8")) if args.report \
+            else stderr
+
+        performance = run_stream(
+            freq_table, input_stream, output_stream, report_stream,
+            memo=args.memoize, encode=args.encode, decode=args.decode,
+            debug=args.debug, flush_lines=args.flush_lines,
+            track_memory=args.track_memory, engine=args.engine,
+            sample_rate=args.sample_rate, chunk_size=args.chunk_size)
+
+    if args.metrics_json:
+        export_json(performance, args.metrics_json)
+
+    if args.metrics_prometheus:
+        export_prometheus(performance, args.metrics_prometheus)
+
 
 # Validate file paths then run main program
 try:
-    is_valid_io(in_file, out_file, freq_table)
-    run(freq_table, in_file, out_file, encode=args.encode,
-        memo=args.memoize, decode=args.decode, debug=args.debug)
+    if streaming:
+        run_streaming()
+    else:
+        is_valid_io(in_file, out_file, freq_table, *model_tables,
+                    *metrics_files)
+        run(freq_table, in_file, out_file, encode=args.encode,
+            memo=args.memoize, decode=args.decode, debug=args.debug,
+            workers=args.workers, speculative=args.speculative,
+            dry_run=args.dry_run, track_memory=args.track_memory,
+            metrics_json=args.metrics_json,
+            metrics_prometheus=args.metrics_prometheus,
+            pipelined=args.pipelined, queue_size=args.queue_size,
+            model_tables=model_tables, block_size=args.block_size,
+            inline_trees=args.inline_trees, transforms=args.transforms,
+            engine=args.engine, sample_rate=args.sample_rate,
+            mapped=args.mapped)
 except FileNotFoundError as fnfe:
     error_message = fnfe.args[0]
     if args.debug:
@@ -0,0 +1,280 @@
+"""
+batch
+
+This module contains functions for converting many input files in one
+process launch. Inputs are given as a directory, a glob pattern, or a
+manifest of input/output pairs. The Huffman Tree is built once per process
+and shared through a TreeRegistry, and files are distributed across a pool of
+worker processes. Shared trees are memoized, so Huffman codes are also built
+once per process. Each output file holds its own results and performance
+report, as written by run, and the aggregated metrics of all files are written
+to a batch report. It can be run as a program:
+python -m hencoding.batch source report_file [--output_dir] [--manifest]
+        [--frequency_table] [--workers N] [--track-memory] [--debug]
+        [--encode] [--decode]
+
+Manifests list one input/output pair per line, separated by a tab. Empty
+lines and lines starting with '#' are skipped.
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+from pathlib import Path
+from sys import stderr
+from typing import Dict, List, Optional, TextIO, Tuple
+from hencoding.run import run
+from hencoding.tree_registry import TreeRegistry
+from support.performance import Performance
+from support.output_formatters import write_to_output
+from support.format_performance_report import format_performance_report
+from support.is_valid_io import is_valid_io
+
+DEFAULT_FREQUENCY_TABLE_PATH = "hencoding/DefaultFreqTable.txt"
+OUTPUT_SUFFIX = "_output"
+GLOB_CHARS = set("*?[")
+
+# Registry holding the shared Huffman Tree of each process
+_registry: Optional['TreeRegistry'] = None
+
+
+def collect_inputs(source: str, output_dir: Optional[TextIO] = None,
+                   manifest=False) -> List[Tuple[Path, Path]]:
+    """
+    Function that lists the input/output file pairs of a batch. Inputs in a
+    directory or matching a glob pattern are written to output_dir, named
+    after the input with '_output' added to its stem. Files this batch
+    writes as outputs, such as from an earlier run, are not taken as inputs.
+
+    Args:
+        source (str): directory, glob pattern, or manifest pathname
+        output_dir (TextIO): directory for output files OR None to write
+            next to each input. Ignored for manifests
+        manifest (bool): True if source is a manifest, otherwise False
+
+    Returns:
+        List[Tuple[Path, Path]]: input and output pathname per file, sorted
+            by input for directories and glob patterns
+
+    Raises:
+        ValueError: when a manifest line is not an input/output pair, when
+            no input files are found, or when two inputs share an output
+    """
+    if manifest:
+        pairs = []
+        with open(source, 'r', encoding="utf-8") as file:
+            for line_number, line in enumerate(file, start=1):
+                line = line.strip()
+                if (not line) or line.startswith('#'):
+                    continue
+
+                paths = line.split('\t')
+                if len(paths) != 2:
+                    raise ValueError(f"INVALID MANIFEST: line {line_number} "
+                                     "is not a tab-separated input/output "
+                                     "pair")
+
+                pairs.append((Path(paths[0].strip()), Path(paths[1].strip())))
+    else:
+        if GLOB_CHARS & set(source):
+            inputs = [Path(path) for path in glob(source, recursive=True)]
+        else:
+            inputs = list(Path(source).iterdir())
+
+        pairs = []
+        for path in sorted(path for path in inputs if path.is_file()):
+            directory = Path(output_dir) if output_dir else path.parent
+            output = directory / f"{path.stem}{OUTPUT_SUFFIX}{path.suffix}"
+            pairs.append((path, output))
+
+        # Case: output of an earlier run that this batch writes again. Don't
+        # convert it as an input
+        outputs = {output.resolve() for _, output in pairs}
+        pairs = [(path, output) for path, output in pairs
+                 if path.resolve() not in outputs]
+
+    if not pairs:
+        raise ValueError(f"INVALID BATCH: no input files found in {source}")
+
+    # Error case: two inputs would overwrite each other's output
+    written: Dict[Path, Path] = {}
+    for path, output in pairs:
+        previous = written.setdefault(output.resolve(), path)
+        if previous is not path:
+            raise ValueError(f"INVALID BATCH: {previous} and {path} are both "
+                             f"written to {output}")
+
+    return pairs
+
+
+def _init_worker(frequency_table: TextIO) -> None:
+    """
+    Worker process initializer that builds the process's shared Huffman
+    Tree once, ahead of its first file.
+
+    Args:
+        frequency_table (TextIO): frequency table file pathname
+    """
+    global _registry
+    _registry = TreeRegistry(max_trees=1)
+
+    try:
+        _registry.get(frequency_table)
+    except (FileNotFoundError, ValueError):
+        # Errors are reported by run for each file
+        pass
+
+
+def _convert_file(task: Tuple[TextIO, Path, Path, Dict[str, bool]]) \
+        -> Tuple[Optional['Performance'], Optional[str]]:
+    """
+    Worker function that converts one file with the process's shared tree.
+
+    Args:
+        task (Tuple[TextIO, Path, Path, Dict[str, bool]]): frequency table
+            pathname, input pathname, output pathname, and keyword arguments
+            for run
+
+    Returns:
+        Performance: metrics logged for the file OR None on error
+        str: error message OR None
+    """
+    frequency_table, input_file, output_file, options = task
+
+    try:
+        is_valid_io(input_file, output_file.resolve().parent)
+        output_file.touch()
+        performance = run(frequency_table, input_file, output_file,
+                          registry=_registry, **options)
+        return performance, None
+    except (FileNotFoundError, ValueError) as error:
+        return None, error.args[0].strip()
+
+
+def run_batch(frequency_table: TextIO, pairs: List[Tuple[Path, Path]],
+              report_file: TextIO, workers=1, encode=False, decode=False,
+              debug=False, track_memory=False) \
+        -> 'Performance':
+    """
+    Function that converts each input file to its output file, then writes a
+    batch report of every file's outcome and of the aggregated metrics.
+
+    Args:
+        frequency_table (TextIO): file containing frequencies per character
+        pairs (List[Tuple[Path, Path]]): input and output pathname per file
+        report_file (TextIO): text file where the batch report is written
+        workers (int): number of worker processes converting files. 1
+            converts every file in-process
+        encode (bool): True if input file strings will be encoded
+        decode (bool): True if input file strings will be decoded
+        debug (bool): True if debug mode is toggled on, otherwise False
+        track_memory (bool): True if measuring peak and net change in memory
+            of each conversion, otherwise False
+
+    Returns:
+        Performance: metrics aggregated across all files
+
+    Raises:
+        ValueError: if both decode and encode are False
+    """
+    if encode == decode:
+        # Error case: decode OR encode can be True, but not both or neither
+        raise ValueError("Either encode or decode must be True")
+
+    options = {"memo": True, "encode": encode, "decode": decode,
+               "debug": debug, "track_memory": track_memory}
+    tasks = [(frequency_table, input_file, output_file, options)
+             for input_file, output_file in pairs]
+
+    # The tree of this process converts files without workers, and is
+    # reported with the aggregated metrics
+    _init_worker(frequency_table)
+
+    if (workers > 1) and (len(tasks) > 1):
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_worker,
+                                 initargs=(frequency_table,)) as pool:
+            results = list(pool.map(_convert_file, tasks))
+    else:
+        results = [_convert_file(task) for task in tasks]
+
+    # Aggregate metrics and note each file's outcome
+    aggregate = Performance(track_memory=track_memory)
+    out = ["-------Batch Report-------\n"]
+    num_failed = 0
+
+    for (input_file, output_file), (performance, error) in zip(pairs,
+                                                              results):
+        if error is not None:
+            num_failed += 1
+            out.append(f"{input_file}: {error}")
+
+            if debug:
+                print(f"{input_file}: {error}", file=stderr)
+            continue
+
+        aggregate.merge(performance)
+        out.append(f"{input_file} -> {output_file}: "
+                   f"{performance.get_num_successes()} successes, "
+                   f"{performance.get_num_errors()} errors")
+
+    out.append(f"\nFiles converted: {len(pairs) - num_failed}")
+    out.append(f"Files failed: {num_failed}")
+
+    huffman_tree = None
+    try:
+        huffman_tree = _registry.get(frequency_table)
+    except (FileNotFoundError, ValueError):
+        pass
+
+    out.append(format_performance_report(aggregate, micro_sec=True,
+                                         huffman_tree=huffman_tree))
+    aggregate.set_memory_tracking(False)
+
+    write_to_output(report_file, out)
+    return aggregate
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("source", type=str,
+                            help="Input directory, glob pattern, or manifest "
+                            "pathname")
+    arg_parser.add_argument("report_file", type=str,
+                            help="Batch report file pathname")
+    arg_parser.add_argument("--output_dir", type=str,
+                            help="(Optional) Directory for output files. "
+                            "Defaults to each input's directory")
+    arg_parser.add_argument("--manifest", action="store_true",
+                            help="Reads source as a manifest of input/output "
+                            "pairs")
+    arg_parser.add_argument("--frequency_table", type=str,
+                            default=DEFAULT_FREQUENCY_TABLE_PATH,
+                            help="(Optional) Frequency table file pathname")
+    arg_parser.add_argument("--workers", type=int, default=1,
+                            help="(Optional) Number of worker processes "
+                            "converting files")
+    arg_parser.add_argument("--track-memory", "--track_memory",
+                            dest="track_memory", action="store_true",
+                            help="Measures peak and net change in memory of "
+                            "each conversion")
+    arg_parser.add_argument("--debug", action="store_true",
+                            help="Toggles debug mode to log errors to stderr")
+
+    group = arg_parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--encode", action="store_true",
+                       help="Indicates to encode input file strings")
+    group.add_argument("--decode", action="store_true",
+                       help="Indicates to decode input file strings")
+    args = arg_parser.parse_args()
+
+    try:
+        is_valid_io(Path(args.frequency_table),
+                    Path(args.report_file).resolve().parent)
+        run_batch(args.frequency_table,
+                  collect_inputs(args.source, args.output_dir, args.manifest),
+                  args.report_file, workers=args.workers,
+                  encode=args.encode, decode=args.decode, debug=args.debug,
+                  track_memory=args.track_memory)
+    except (FileNotFoundError, ValueError) as error:
+        if args.debug:
+            print(error.args[0], file=stderr)
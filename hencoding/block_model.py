@@ -0,0 +1,422 @@
+"""
+block_model
+
+This module contains a class for encoding with a set of Huffman Trees rather
+than one. Expressions are split into blocks of characters, and each block is
+encoded with whichever tree gives it the fewest estimated bits. When enabled,
+a block may instead carry its own code lengths, if building a tree from the
+block's own counts saves more bits than storing it costs. Each block starts
+with a header recording its tree ID, so the decoder switches trees by block.
+
+Encoded block layout, as a binary string:
+    tree ID (fixed width) | payload length in bits (Elias gamma of length + 1)
+    | code length per letter a-z, 5 bits each (inline trees only) | payload
+
+Inline trees use canonical Huffman codes, which are fully determined by their
+code lengths. Both sides must use the same trees in the same order. This
+implementation allows for method chaining.
+"""
+from collections import Counter
+from string import ascii_lowercase
+from typing import Dict, List, Optional, Tuple
+from hencoding.huffman_tree import HuffmanTree
+from hencoding.huffman_encoding import HuffmanEncoding
+
+# Number of input characters per block
+DEFAULT_BLOCK_SIZE = 4096
+
+# Bits storing each letter's code length in an inline tree
+LENGTH_BITS = 5
+INLINE_TABLE_BITS = LENGTH_BITS * len(ascii_lowercase)
+
+
+def _gamma(number: int) -> str:
+    """
+    Helper function for the Elias gamma code of a positive integer: one 0 per
+    bit after the first, followed by the integer in binary.
+
+    Args:
+        number (int): integer being coded. Must be >= 1
+
+    Returns:
+        str: binary string of the code
+    """
+    binary = format(number, 'b')
+    return '0' * (len(binary) - 1) + binary
+
+
+def _read_gamma(bits: str, position: int) -> Tuple[int, int]:
+    """
+    Helper function for reading an Elias gamma code.
+
+    Args:
+        bits (str): binary string holding the code
+        position (int): index of the code's first bit
+
+    Returns:
+        int: decoded integer
+        int: index of the first bit after the code
+
+    Raises:
+        ValueError: if the code runs past the end of the string
+    """
+    zeros = 0
+    while (position + zeros < len(bits)) and (bits[position + zeros] == '0'):
+        zeros += 1
+
+    end = position + 2 * zeros + 1
+    if end > len(bits):
+        raise ValueError("INVALID BLOCK: Truncated block header")
+
+    return int(bits[position + zeros:end], 2), end
+
+
+def canonical_codes(code_lengths: Dict[str, int]) -> Dict[str, str]:
+    """
+    Function that assigns canonical Huffman codes from code lengths alone.
+    Characters are ordered by code length, then alphabetically, and each
+    takes the next binary value at its length.
+
+    Args:
+        code_lengths (Dict[str, int]): number of bits per character. Lengths
+            of 0 are left out
+
+    Returns:
+        Dict[str, str]: binary code per character
+    """
+    codes = {}
+    value = 0
+    previous_length = 0
+
+    for length, char in sorted((length, char)
+                               for char, length in code_lengths.items()
+                               if length > 0):
+        value <<= length - previous_length
+        codes[char] = format(value, f"0{length}b")
+        value += 1
+        previous_length = length
+
+    return codes
+
+
+class BlockModelEncoding(HuffmanEncoding):
+    """
+    Class for encoding each block of an expression with the best of several
+    Huffman Trees, and decoding blocks by their tree IDs. The first tree is
+    reported by get_tree.
+    """
+
+    def __init__(self, huffman_trees: List['HuffmanTree'],
+                 block_size=DEFAULT_BLOCK_SIZE, inline_trees=False,
+                 allowed_nonalpha_chars=None) -> 'BlockModelEncoding':
+        """
+        Args:
+            huffman_trees (List[HuffmanTree]): preloaded trees, indexed by
+                tree ID. Must hold at least 1 tree
+            block_size (int): number of input characters per block. Must be
+                >= 1
+            inline_trees (bool): True if a block may store its own tree when
+                that saves bits, otherwise False
+            allowed_nonalpha_chars (set): permitted punctuation symbols OR
+                None for the default
+
+        Raises:
+            ValueError: when no trees are given or block_size is not positive
+        """
+        if not huffman_trees:
+            raise ValueError("There must be at least 1 Huffman Tree")
+
+        if block_size < 1:
+            raise ValueError("There must be at least 1 character per block")
+
+        super().__init__(huffman_trees[0], allowed_nonalpha_chars)
+        self._encodings = [HuffmanEncoding(tree, self._allowed_nonalpha_chars)
+                           for tree in huffman_trees]
+        self._block_size = block_size
+        self._inline_trees = inline_trees
+
+        # ID of inline trees, and fixed width of every tree ID
+        self._inline_id = len(huffman_trees)
+        self._id_bits = max(self._inline_id.bit_length(), 1)
+
+        # Number of blocks encoded per tree ID
+        self._tree_usage = [0] * (self._inline_id + 1)
+
+    def encode(self, expression: str) -> str:
+        """
+        Method for encoding an expression block by block, each with the tree
+        giving it the fewest bits.
+
+        Args:
+            expression (str): the string being encoded
+
+        Returns:
+            str: a new binary string made entirely of 1s and 0s
+
+        Raises:
+            ValueError: when a block holds a character that no tree (nor an
+                inline tree, if enabled) can encode
+        """
+        encoded = []
+        for block in self._blocks(expression):
+            tree_id, _, code_lengths = self.choose_tree(block)
+
+            if tree_id == self._inline_id:
+                codes = canonical_codes(code_lengths)
+                payload = ''.join(codes[char] for char in
+                                  self._symbols(block))
+                table = ''.join(format(code_lengths.get(letter, 0),
+                                       f"0{LENGTH_BITS}b")
+                                for letter in ascii_lowercase)
+            else:
+                payload = self._encodings[tree_id].encode(block)
+                table = ""
+
+            encoded.append(format(tree_id, f"0{self._id_bits}b"))
+            encoded.append(_gamma(len(payload) + 1))
+            encoded.append(table)
+            encoded.append(payload)
+            self._tree_usage[tree_id] += 1
+
+        return ''.join(encoded)
+
+    def estimate_bits(self, expression: str) -> int:
+        """
+        Method for calculating the number of bits encoding an expression would
+        produce, including block headers, without encoding it.
+
+        Args:
+            expression (str): the string being measured
+
+        Returns:
+            int: number of bits in the encoded expression
+
+        Raises:
+            ValueError: when a block holds a character that no tree can encode
+        """
+        return sum(self.choose_tree(block)[1]
+                   for block in self._blocks(expression))
+
+    def choose_tree(self, block: str) \
+            -> Tuple[int, int, Optional[Dict[str, int]]]:
+        """
+        Method for choosing the tree that encodes a block in the fewest bits,
+        headers included. Trees of a single character are skipped, as their
+        codes are empty and cannot be decoded.
+
+        Args:
+            block (str): block of the expression being encoded
+
+        Returns:
+            int: chosen tree ID
+            int: number of bits in the encoded block
+            Dict[str, int]: code length per letter of an inline tree OR None
+
+        Raises:
+            ValueError: when no tree can encode the block
+        """
+        best: Optional[Tuple[int, int, Optional[Dict[str, int]]]] = None
+        first_error = None
+
+        for tree_id, encoding in enumerate(self._encodings):
+            if encoding.get_tree().get_root().is_leaf():
+                continue
+
+            try:
+                payload_bits = encoding.estimate_bits(block)
+            except ValueError as ve:
+                first_error = first_error or ve
+                continue
+
+            bits = self._id_bits + len(_gamma(payload_bits + 1)) + \
+                payload_bits
+            if (best is None) or (bits < best[1]):
+                best = (tree_id, bits, None)
+
+        if self._inline_trees:
+            inline = self._inline_tree(block)
+            if (inline is not None) and ((best is None) or
+                                         (inline[1] < best[1])):
+                best = inline
+
+        if best is None:
+            raise first_error or ValueError(
+                "INVALID BLOCK: No Huffman Tree can encode the block")
+
+        return best
+
+    def decode(self, encoded_string: str) -> str:
+        """
+        Decompresses a string of encoded blocks, switching trees by each
+        block's tree ID. Whitespace is ignored.
+
+        Args:
+            encoded_string (str): the compressed binary string
+
+        Returns:
+            str: the decompressed string
+
+        Raises:
+            ValueError: if a character is not a 0 or 1, or a block is invalid
+        """
+        bits = ''.join(encoded_string.split())
+        if bits.strip("01"):
+            # Error case: not a binary string
+            bit = bits.strip("01")[0]
+            raise ValueError(f"INVALID CHAR: {bit} is not a binary bit")
+
+        result = []
+        position = 0
+
+        while position < len(bits):
+            # Read the block header
+            header_end = position + self._id_bits
+            if header_end > len(bits):
+                raise ValueError("INVALID BLOCK: Truncated block header")
+
+            tree_id = int(bits[position:header_end], 2)
+            if tree_id > self._inline_id or \
+                    ((tree_id == self._inline_id) and not self._inline_trees):
+                raise ValueError(f"INVALID BLOCK: Unknown tree ID {tree_id}")
+
+            payload_bits, position = _read_gamma(bits, header_end)
+            payload_bits -= 1
+
+            code_lengths = None
+            if tree_id == self._inline_id:
+                table_end = position + INLINE_TABLE_BITS
+                if table_end > len(bits):
+                    raise ValueError("INVALID BLOCK: Truncated inline tree")
+
+                code_lengths = {
+                    letter: int(bits[index:index + LENGTH_BITS], 2)
+                    for letter, index in zip(
+                        ascii_lowercase,
+                        range(position, table_end, LENGTH_BITS))}
+                position = table_end
+
+            payload_end = position + payload_bits
+            if payload_end > len(bits):
+                raise ValueError("INVALID BLOCK: Truncated block payload")
+
+            payload = bits[position:payload_end]
+            if code_lengths is not None:
+                result.append(self._decode_canonical(payload, code_lengths))
+            else:
+                result.append(self._encodings[tree_id].decode(payload))
+
+            position = payload_end
+
+        return ''.join(result)
+
+    def get_tree_usage(self) -> Dict[str, int]:
+        """
+        Getter method for the number of blocks encoded with each tree
+
+        Returns:
+            Dict[str, int]: number of blocks per tree ID, with inline trees
+                counted under 'inline'
+        """
+        usage = {str(tree_id): count
+                 for tree_id, count in enumerate(self._tree_usage[:-1])}
+        usage["inline"] = self._tree_usage[-1]
+        return usage
+
+    def get_block_size(self) -> int:
+        """
+        Getter method for the number of input characters per block
+
+        Returns:
+            int: block size
+        """
+        return self._block_size
+
+    def _blocks(self, expression: str) -> List[str]:
+        """
+        Helper method for splitting an expression into blocks
+        """
+        size = self._block_size
+        return [expression[start:start + size]
+                for start in range(0, len(expression), size)]
+
+    def _symbols(self, block: str) -> List[str]:
+        """
+        Helper method for the lowercase characters of a block that encoding
+        maps to codes, skipping whitespace and permitted punctuation
+        """
+        allowed = self._allowed_nonalpha_chars
+        return [char.lower() for char in block
+                if not ((char in allowed) or char.isspace())]
+
+    def _inline_tree(self, block: str) \
+            -> Optional[Tuple[int, int, Dict[str, int]]]:
+        """
+        Helper method for the cost of encoding a block with a tree built from
+        its own letter counts.
+
+        Args:
+            block (str): block of the expression being encoded
+
+        Returns:
+            int: inline tree ID
+            int: number of bits in the encoded block, table included
+            Dict[str, int]: code length per letter OR None if the block holds
+                characters other than letters a-z
+        """
+        counts = Counter(self._symbols(block))
+        if not counts or not set(counts) <= set(ascii_lowercase):
+            return None
+
+        if len(counts) == 1:
+            # Case: one letter. Give it a 1-bit code so it can be decoded
+            code_lengths = dict.fromkeys(counts, 1)
+        else:
+            code_lengths = HuffmanTree.from_frequencies(
+                dict(counts)).get_code_lengths()
+
+        if max(code_lengths.values()) >= (1 << LENGTH_BITS):
+            return None
+
+        payload_bits = sum(count * code_lengths[char]
+                           for char, count in counts.items())
+        bits = self._id_bits + len(_gamma(payload_bits + 1)) + \
+            INLINE_TABLE_BITS + payload_bits
+
+        return self._inline_id, bits, code_lengths
+
+    def _decode_canonical(self, payload: str,
+                          code_lengths: Dict[str, int]) -> str:
+        """
+        Helper method for decoding a payload with canonical codes.
+
+        Args:
+            payload (str): binary string of the block's codes
+            code_lengths (Dict[str, int]): code length per letter
+
+        Returns:
+            str: the decompressed block
+
+        Raises:
+            ValueError: if the payload ends with leftover bits or holds a code
+                no letter has
+        """
+        decode_table = {code: char for char, code in
+                        canonical_codes(code_lengths).items()}
+        max_length = max(code_lengths.values(), default=0)
+        result = []
+        start = 0
+
+        for end in range(1, len(payload) + 1):
+            char = decode_table.get(payload[start:end])
+            if char is not None:
+                result.append(char)
+                start = end
+            elif end - start >= max_length:
+                raise ValueError("INVALID BINARY: Unknown code in inline "
+                                 "tree block")
+
+        if start != len(payload):
+            raise ValueError("INVALID BINARY: Leftover bits in the encoded "
+                             "string. Cannot be converted.")
+
+        return ''.join(result)
@@ -0,0 +1,137 @@
+"""
+chunked_reader
+
+This module contains generators for reading and converting lines of any
+length in fixed-size pieces, so memory use stays constant however long a line
+is. Encoding needs no state between pieces, as each character is encoded on
+its own. Decoding resumes each piece from the Huffman Tree node where the
+previous piece stopped.
+"""
+from typing import Iterator, Optional, TextIO, Tuple
+from hencoding.huffman_encoding import HuffmanEncoding
+
+# Number of characters read per piece
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+def iter_line_chunks(input_stream: TextIO, chunk_size=DEFAULT_CHUNK_SIZE) \
+        -> Iterator[Tuple[str, bool]]:
+    """
+    Generator that reads an open text stream in pieces of up to chunk_size
+    characters, split at line ends. Newlines are not included.
+
+    Args:
+        input_stream (TextIO): open file or stream read from
+        chunk_size (int): max number of characters read at once. Must be >= 1
+
+    Yields:
+        str: next piece of the current line
+        bool: True if the piece ends its line, otherwise False
+
+    Raises:
+        ValueError: when chunk_size is not a positive integer
+    """
+    if chunk_size < 1:
+        raise ValueError("There must be at least 1 character per chunk")
+
+    # Whether the last piece yielded ended its line
+    line_ended = True
+
+    while True:
+        chunk = input_stream.read(chunk_size)
+        if not chunk:
+            break
+
+        # Every newline in the chunk ends a line
+        pieces = chunk.split('\n')
+        for piece in pieces[:-1]:
+            yield piece, True
+
+        line_ended = pieces[-1] == ""
+        if not line_ended:
+            yield pieces[-1], False
+
+    if not line_ended:
+        # Case: last line has no newline
+        yield "", True
+
+
+def convert_line_chunks(huffman_encoding: 'HuffmanEncoding',
+                        input_stream: TextIO, encode=False,
+                        chunk_size=DEFAULT_CHUNK_SIZE, keep_empty=False) \
+        -> Iterator[Tuple[int, str, str, bool, Optional[str]]]:
+    """
+    Generator that encodes or decodes each non-empty line of an open text
+    stream piece by piece. Unless keep_empty is True, lines holding only
+    whitespace are skipped, and non-empty lines are numbered from 1 as in the
+    run output. Once a line raises an error, the rest of the line is read
+    and yielded with empty conversions, and the error is yielded with the
+    line's last piece. Pieces of that line converted before the error are
+    not valid output.
+
+    Args:
+        huffman_encoding (HuffmanEncoding): encoder used for conversions
+        input_stream (TextIO): open file or stream read from
+        encode (bool): True if encoding lines, otherwise decoding them
+        chunk_size (int): max number of characters read at once. Must be >= 1
+        keep_empty (bool): True if each line holding only whitespace is
+            yielded as one empty piece, and every line is numbered
+
+    Yields:
+        int: line number
+        str: piece of the line read
+        str: converted piece of the line
+        bool: True if this is the line's last piece, otherwise False
+        str: error message ending the line OR None
+    """
+    line_number = 0
+    new_line = True
+    started = False
+    error = None
+    node = None
+
+    for chunk, line_done in iter_line_chunks(input_stream, chunk_size):
+        if new_line:
+            new_line = False
+            if keep_empty:
+                line_number += 1
+
+        if (not started) and (not chunk.isspace()) and chunk:
+            # Case: first non-whitespace of a line
+            started = True
+            if not keep_empty:
+                line_number += 1
+
+        if started:
+            if error is None:
+                try:
+                    if encode:
+                        piece = huffman_encoding.encode(chunk)
+                    else:
+                        piece, node = huffman_encoding.decode_chunk(chunk,
+                                                                    node)
+                        root = huffman_encoding.get_tree().get_root()
+                        if line_done and (node is not root):
+                            # Error case: leftover bits at the end of the line
+                            error = "INVALID BINARY: Leftover bits in the "
+                            error += "encoded string. Cannot be converted."
+                except ValueError as ve:
+                    error = ve.args[0]
+
+            if error is not None:
+                # Pieces after an error are not converted. The error is
+                # yielded with the line's last piece
+                yield (line_number, chunk, "", line_done,
+                       error if line_done else None)
+            else:
+                yield line_number, chunk, piece, line_done, None
+        elif keep_empty and line_done and not started:
+            # Case: line holding only whitespace
+            yield line_number, chunk, "", True, None
+
+        if line_done:
+            # Reset state for the next line
+            new_line = True
+            started = False
+            error = None
+            node = None
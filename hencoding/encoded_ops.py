@@ -0,0 +1,498 @@
+"""
+encoded_ops
+
+This module contains functions for combining and cutting encoded data
+without decoding it to text and encoding it again. Packed bitstreams are
+concatenated at the bit level, so each part starts right where the previous
+one ends rather than after its padding. Slices are taken by symbol index:
+the bit offsets of the first and last symbols are found by walking the
+Huffman Tree, starting from the nearest checkpoint of a SymbolIndex when one
+exists, and the bits in between are copied as they are. Binary strings are
+packed first, which runs in C, and unpacked again at the end.
+
+The operations can be run as a program on packed files:
+python -m hencoding.encoded_ops concat output_file input_file [input_file ...]
+python -m hencoding.encoded_ops index index_file input_file
+python -m hencoding.encoded_ops slice output_file input_file start stop
+        [--index index_file]
+"""
+import argparse
+from pathlib import Path
+from struct import Struct
+from sys import stderr
+from typing import Iterable, List, Optional, TextIO, Tuple
+from hencoding.huffman_tree import HuffmanTree
+from hencoding.packed_bits import pack_bits, unpack_bits, \
+    read_packed_file, write_packed_bytes
+from support.is_valid_io import is_valid_io
+
+# Default number of symbols between index checkpoints
+DEFAULT_INTERVAL = 1024
+
+# Header of an index file: checkpoint interval, number of symbols, and
+# number of bits indexed, as unsigned 64-bit big-endian ints
+INDEX_HEADER = Struct(">QQQ")
+INDEX_ENTRY = Struct(">Q")
+
+
+def concat_packed(parts: Iterable[Tuple[bytes, int]]) -> Tuple[bytes, int]:
+    """
+    Function that concatenates packed bitstreams encoded with the same
+    Huffman Tree. Each part's padding is dropped and its bits are shifted to
+    follow the previous part's last bit, so the result decodes to the parts'
+    texts joined together.
+
+    Args:
+        parts (Iterable[Tuple[bytes, int]]): packed bits and number of bits
+            of each part
+
+    Returns:
+        bytes: packed bits, with the final byte padded with 0s
+        int: number of bits packed
+
+    Raises:
+        ValueError: if a part's number of bits exceeds its packed bits
+    """
+    output = bytearray()
+
+    # Bits of the last partial byte, not yet written
+    carry = 0
+    carry_bits = 0
+
+    for packed, bit_length in parts:
+        num_bytes = (bit_length + 7) // 8
+        if num_bytes > len(packed):
+            raise ValueError("INVALID LENGTH: more bits than were packed")
+
+        if carry_bits == 0:
+            # Case: byte aligned. Copy the part, then hold its partial byte
+            full_bytes, carry_bits = divmod(bit_length, 8)
+            output += packed[:full_bytes]
+            carry = packed[full_bytes] >> (8 - carry_bits) if carry_bits \
+                else 0
+            continue
+
+        value = int.from_bytes(packed[:num_bytes], "big") >> \
+            (num_bytes * 8 - bit_length)
+        value |= carry << bit_length
+        total_bits = carry_bits + bit_length
+
+        full_bytes, carry_bits = divmod(total_bits, 8)
+        output += (value >> carry_bits).to_bytes(full_bytes, "big")
+        carry = value & ((1 << carry_bits) - 1)
+
+    total_bits = len(output) * 8 + carry_bits
+    if carry_bits:
+        output.append(carry << (8 - carry_bits))
+
+    return bytes(output), total_bits
+
+
+def extract_bits(packed: bytes, start: int, stop: int) -> Tuple[bytes, int]:
+    """
+    Function that copies a range of bits out of packed bits, realigned to
+    start at the first bit of a byte.
+
+    Args:
+        packed (bytes): packed bits, most significant bit first
+        start (int): offset of the first bit copied
+        stop (int): offset after the last bit copied
+
+    Returns:
+        bytes: packed bits, with the final byte padded with 0s
+        int: number of bits packed
+
+    Raises:
+        ValueError: if the range is not within the packed bits
+    """
+    if not 0 <= start <= stop <= len(packed) * 8:
+        raise ValueError("INVALID RANGE: bits are not within the packed bits")
+
+    bit_length = stop - start
+    if bit_length == 0:
+        return b"", 0
+
+    # Only the bytes holding the range are converted
+    first_byte = start // 8
+    last_byte = (stop + 7) // 8
+    value = int.from_bytes(packed[first_byte:last_byte], "big")
+    value >>= last_byte * 8 - stop
+    value &= (1 << bit_length) - 1
+
+    num_bytes = (bit_length + 7) // 8
+    value <<= num_bytes * 8 - bit_length
+
+    return value.to_bytes(num_bytes, "big"), bit_length
+
+
+class SymbolIndex:
+    """
+    Class holding the bit offset of every interval-th symbol of a packed
+    bitstream, so the offset of any symbol is found by walking at most one
+    interval of the Huffman Tree instead of the whole stream.
+    """
+
+    def __init__(self, checkpoints: List[int], interval: int,
+                 num_symbols: int, bit_length: int) -> 'SymbolIndex':
+        """
+        Args:
+            checkpoints (List[int]): bit offset of symbols 0, interval,
+                2 * interval, ...
+            interval (int): number of symbols between checkpoints
+            num_symbols (int): number of symbols in the bitstream
+            bit_length (int): number of bits in the bitstream
+
+        Raises:
+            ValueError: if interval is not a positive integer
+        """
+        if interval < 1:
+            raise ValueError("Interval must be a positive integer")
+
+        self._checkpoints = checkpoints
+        self._interval = interval
+        self._num_symbols = num_symbols
+        self._bit_length = bit_length
+
+    @classmethod
+    def build(cls, huffman_tree: 'HuffmanTree', packed: bytes,
+              bit_length: int, interval=DEFAULT_INTERVAL) -> 'SymbolIndex':
+        """
+        Alternate constructor that indexes packed bits in one walk of the
+        Huffman Tree, without building decoded text.
+
+        Args:
+            huffman_tree (HuffmanTree): tree the bits were encoded with
+            packed (bytes): packed bits, most significant bit first
+            bit_length (int): number of bits to index
+            interval (int): number of symbols between checkpoints
+
+        Returns:
+            SymbolIndex: index of the packed bits
+
+        Raises:
+            ValueError: if bit_length exceeds the packed bits, or if bits are
+                left over at the end
+        """
+        if interval < 1:
+            raise ValueError("Interval must be a positive integer")
+
+        view = memoryview(packed).cast('B')
+        if bit_length > len(view) * 8:
+            raise ValueError("INVALID LENGTH: more bits than were packed")
+
+        root = huffman_tree.get_root()
+        node = root
+        checkpoints = [0]
+        num_symbols = 0
+
+        for offset in range(bit_length):
+            if (view[offset >> 3] >> (7 - (offset & 7))) & 1:
+                node = node.get_right()
+            else:
+                node = node.get_left()
+
+            if node.is_leaf():
+                node = root
+                num_symbols += 1
+                if num_symbols % interval == 0:
+                    checkpoints.append(offset + 1)
+
+        if node is not root:
+            # Error case: leftover bits in the packed bits
+            error = "INVALID BINARY: Leftover bits in the encoded string. "
+            error += "Cannot be converted."
+            raise ValueError(error)
+
+        return cls(checkpoints, interval, num_symbols, bit_length)
+
+    @classmethod
+    def read(cls, index_file: TextIO) -> 'SymbolIndex':
+        """
+        Alternate constructor that loads an index written by write
+
+        Args:
+            index_file (TextIO): index file pathname
+
+        Returns:
+            SymbolIndex: the stored index
+
+        Raises:
+            ValueError: if the index file is truncated
+        """
+        with open(index_file, 'rb') as file:
+            data = file.read()
+
+        if len(data) < INDEX_HEADER.size:
+            raise ValueError("INVALID INDEX FILE: missing header")
+
+        interval, num_symbols, bit_length = INDEX_HEADER.unpack_from(data)
+        num_checkpoints = num_symbols // interval + 1
+        if len(data) != INDEX_HEADER.size + num_checkpoints * INDEX_ENTRY.size:
+            raise ValueError("INVALID INDEX FILE: wrong number of entries")
+
+        checkpoints = [entry for entry, in INDEX_ENTRY.iter_unpack(
+            data[INDEX_HEADER.size:])]
+
+        return cls(checkpoints, interval, num_symbols, bit_length)
+
+    def write(self, index_file: TextIO) -> 'SymbolIndex':
+        """
+        Method for storing the index in a file, so it is built only once per
+        bitstream
+
+        Args:
+            index_file (TextIO): index file pathname
+
+        Returns:
+            SymbolIndex: current instance of the index
+        """
+        with open(index_file, 'wb') as file:
+            file.write(INDEX_HEADER.pack(self._interval, self._num_symbols,
+                                         self._bit_length))
+            for checkpoint in self._checkpoints:
+                file.write(INDEX_ENTRY.pack(checkpoint))
+
+        return self
+
+    def get_interval(self) -> int:
+        """
+        Getter method for the number of symbols between checkpoints
+
+        Returns:
+            int: checkpoint interval
+        """
+        return self._interval
+
+    def get_num_symbols(self) -> int:
+        """
+        Getter method for the number of symbols in the bitstream
+
+        Returns:
+            int: number of symbols
+        """
+        return self._num_symbols
+
+    def get_bit_length(self) -> int:
+        """
+        Getter method for the number of bits in the bitstream
+
+        Returns:
+            int: number of bits
+        """
+        return self._bit_length
+
+    def bit_offset(self, huffman_tree: 'HuffmanTree', packed: bytes,
+                   symbol: int) -> int:
+        """
+        Method for finding the bit offset where a symbol starts, walking the
+        Huffman Tree from the nearest checkpoint before it.
+
+        Args:
+            huffman_tree (HuffmanTree): tree the bits were encoded with
+            packed (bytes): the indexed packed bits
+            symbol (int): symbol index, where the number of symbols is the
+                end of the bitstream
+
+        Returns:
+            int: bit offset of the symbol
+
+        Raises:
+            ValueError: if the symbol index is out of range
+        """
+        if not 0 <= symbol <= self._num_symbols:
+            raise ValueError("INVALID RANGE: symbol index out of range")
+
+        checkpoint, remaining = divmod(symbol, self._interval)
+        offset = self._checkpoints[checkpoint]
+        if remaining == 0:
+            return offset
+
+        return _skip_symbols(huffman_tree, memoryview(packed).cast('B'),
+                             offset, remaining, self._bit_length)
+
+
+def _skip_symbols(huffman_tree: 'HuffmanTree', view: memoryview, offset: int,
+                  num_symbols: int, end: int) -> int:
+    """
+    Helper function for walking the Huffman Tree over packed bits until a
+    number of symbols are completed.
+
+    Args:
+        huffman_tree (HuffmanTree): tree the bits were encoded with
+        view (memoryview): packed bits as unsigned bytes
+        offset (int): bit offset of a symbol boundary where the walk starts
+        num_symbols (int): number of symbols to skip
+        end (int): number of bits in the bitstream
+
+    Returns:
+        int: bit offset after the last skipped symbol
+
+    Raises:
+        ValueError: if the bitstream ends before enough symbols
+    """
+    root = huffman_tree.get_root()
+    node = root
+
+    while num_symbols > 0:
+        if offset >= end:
+            raise ValueError("INVALID RANGE: symbol index out of range")
+
+        if (view[offset >> 3] >> (7 - (offset & 7))) & 1:
+            node = node.get_right()
+        else:
+            node = node.get_left()
+        offset += 1
+
+        if node.is_leaf():
+            node = root
+            num_symbols -= 1
+
+    return offset
+
+
+def slice_packed(huffman_tree: 'HuffmanTree', packed: bytes, bit_length: int,
+                 start: int, stop: int,
+                 index: Optional['SymbolIndex'] = None) -> Tuple[bytes, int]:
+    """
+    Function that extracts symbols start up to (excluding) stop from packed
+    bits, without decoding them. With an index, only the symbols after the
+    nearest checkpoints are walked. Without one, the walk begins at the
+    first bit and ends at the stop symbol.
+
+    Args:
+        huffman_tree (HuffmanTree): tree the bits were encoded with
+        packed (bytes): packed bits, most significant bit first
+        bit_length (int): number of bits in the bitstream
+        start (int): index of the first symbol extracted
+        stop (int): index after the last symbol extracted
+        index (SymbolIndex): index of the packed bits OR None
+
+    Returns:
+        bytes: packed bits of the slice, with the final byte padded with 0s
+        int: number of bits packed
+
+    Raises:
+        ValueError: if the range is out of order or past the last symbol, or
+            if the index does not match the packed bits
+    """
+    if not 0 <= start <= stop:
+        raise ValueError("INVALID RANGE: start must be >= 0 and <= stop")
+
+    view = memoryview(packed).cast('B')
+    if bit_length > len(view) * 8:
+        raise ValueError("INVALID LENGTH: more bits than were packed")
+
+    if index is not None:
+        if index.get_bit_length() != bit_length:
+            raise ValueError("INVALID INDEX: built for another bitstream")
+
+        first = index.bit_offset(huffman_tree, view, start)
+        last = index.bit_offset(huffman_tree, view, stop)
+    else:
+        first = _skip_symbols(huffman_tree, view, 0, start, bit_length)
+        last = _skip_symbols(huffman_tree, view, first, stop - start,
+                             bit_length)
+
+    return extract_bits(view, first, last)
+
+
+def concat_encoded(encoded_strings: Iterable[str]) -> str:
+    """
+    Function that concatenates binary strings encoded with the same Huffman
+    Tree. Surrounding whitespace is dropped.
+
+    Args:
+        encoded_strings (Iterable[str]): binary strings
+
+    Returns:
+        str: binary string that decodes to the strings' texts joined together
+    """
+    return ''.join(encoded.strip() for encoded in encoded_strings)
+
+
+def slice_encoded(huffman_tree: 'HuffmanTree', encoded_string: str,
+                  start: int, stop: int) -> str:
+    """
+    Function that extracts symbols start up to (excluding) stop from a
+    binary string, without decoding them.
+
+    Args:
+        huffman_tree (HuffmanTree): tree the string was encoded with
+        encoded_string (str): binary string made entirely of 1s and 0s
+        start (int): index of the first symbol extracted
+        stop (int): index after the last symbol extracted
+
+    Returns:
+        str: binary string of the slice
+
+    Raises:
+        ValueError: if a character is not a 0 or 1, or if the range is out
+            of order or past the last symbol
+    """
+    packed, bit_length = pack_bits(encoded_string)
+    sliced, sliced_length = slice_packed(huffman_tree, packed, bit_length,
+                                         start, stop)
+    return unpack_bits(sliced, sliced_length)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--frequency_table", type=str,
+                            default="hencoding/DefaultFreqTable.txt",
+                            help="(Optional) Frequency table pathname")
+    arg_parser.add_argument("--debug", action="store_true",
+                            help="Toggles debug mode to log errors to stderr")
+    subparsers = arg_parser.add_subparsers(dest="command", required=True)
+
+    concat_parser = subparsers.add_parser(
+        "concat", help="Joins packed files into one packed file")
+    concat_parser.add_argument("output_file", type=str,
+                               help="Output packed file pathname")
+    concat_parser.add_argument("input_files", type=str, nargs="+",
+                               help="Input packed file pathnames, in order")
+
+    index_parser = subparsers.add_parser(
+        "index", help="Writes a symbol index of a packed file")
+    index_parser.add_argument("index_file", type=str,
+                              help="Output index file pathname")
+    index_parser.add_argument("input_file", type=str,
+                              help="Input packed file pathname")
+    index_parser.add_argument("--interval", type=int,
+                              default=DEFAULT_INTERVAL,
+                              help="(Optional) Symbols between checkpoints")
+
+    slice_parser = subparsers.add_parser(
+        "slice", help="Extracts a range of symbols into a packed file")
+    slice_parser.add_argument("output_file", type=str,
+                              help="Output packed file pathname")
+    slice_parser.add_argument("input_file", type=str,
+                              help="Input packed file pathname")
+    slice_parser.add_argument("start", type=int,
+                              help="Index of the first symbol extracted")
+    slice_parser.add_argument("stop", type=int,
+                              help="Index after the last symbol extracted")
+    slice_parser.add_argument("--index", type=str,
+                              help="(Optional) Index file of the input file")
+    args = arg_parser.parse_args()
+
+    try:
+        if args.command == "concat":
+            is_valid_io(*[Path(file) for file in args.input_files])
+            write_packed_bytes(args.output_file, *concat_packed(
+                read_packed_file(file) for file in args.input_files))
+        elif args.command == "index":
+            is_valid_io(Path(args.frequency_table), Path(args.input_file))
+            SymbolIndex.build(HuffmanTree(args.frequency_table),
+                              *read_packed_file(args.input_file),
+                              interval=args.interval).write(args.index_file)
+        else:
+            is_valid_io(Path(args.frequency_table), Path(args.input_file))
+            symbol_index = SymbolIndex.read(args.index) if args.index \
+                else None
+            write_packed_bytes(args.output_file, *slice_packed(
+                HuffmanTree(args.frequency_table),
+                *read_packed_file(args.input_file), args.start, args.stop,
+                index=symbol_index))
+    except (FileNotFoundError, ValueError) as error:
+        if args.debug:
+            print(error.args[0], file=stderr)
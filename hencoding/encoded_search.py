@@ -0,0 +1,395 @@
+"""
+encoded_search
+
+This module contains a class for finding a pattern inside encoded data
+without decoding it. The pattern is encoded once with the same Huffman Tree,
+and its bits are searched for in the encoded bits. A bit match only counts
+when it starts on a codeword boundary, since a prefix code cannot be read
+from the middle of a codeword. Boundaries are checked by walking the Huffman
+Tree from the last known boundary up to each candidate, which builds no
+decoded text and is skipped entirely for lines without a candidate.
+
+Binary strings are scanned with str.find, which runs in C. Packed bits are
+scanned a byte at a time by an automaton built from the pattern's KMP
+failure function, so they are never unpacked.
+"""
+import argparse
+from pathlib import Path
+from sys import stderr
+from typing import Dict, List, Tuple
+from hencoding.huffman_tree import HuffmanTree
+from hencoding.huffman_node import HuffmanNode
+from hencoding.huffman_encoding import HuffmanEncoding
+from hencoding.packed_bits import PACKED_HEADER, PACKED_HEADER_SIZE
+from support.is_valid_io import is_valid_io
+
+
+class EncodedSearch:
+    """
+    Class for finding every occurrence of a pattern in data encoded with a
+    Huffman Tree. Each match is reported as its offset in the encoded data
+    and the number of symbols before it.
+    """
+
+    def __init__(self, huffman_tree: 'HuffmanTree', pattern: str,
+                 allowed_nonalpha_chars=None) -> 'EncodedSearch':
+        """
+        Encodes the pattern and prepares its KMP failure function
+
+        Args:
+            huffman_tree (HuffmanTree): tree the searched data was encoded
+                with
+            pattern (str): text to find. Whitespace and permitted punctuation
+                are skipped, as when encoding
+            allowed_nonalpha_chars (set): permitted punctuation OR None for
+                the default set
+
+        Raises:
+            ValueError: if the pattern has a character that is not in the
+                Huffman Tree, or has no encodable characters
+        """
+        self._tree = huffman_tree
+        encoding = HuffmanEncoding(huffman_tree, allowed_nonalpha_chars)
+        self._pattern_bits = encoding.encode(pattern)
+
+        if not self._pattern_bits:
+            raise ValueError("INVALID PATTERN: no encodable characters")
+
+        self._failure = self._build_failure(self._pattern_bits)
+
+        # Byte automaton transitions, filled in as states are reached
+        self._byte_transitions: Dict[int, Tuple[int, Tuple[int, ...]]] = {}
+
+    @staticmethod
+    def _build_failure(bits: str) -> List[int]:
+        """
+        Helper method for building the KMP failure function: for each prefix
+        of the bits, the length of its longest proper prefix that is also a
+        suffix.
+
+        Args:
+            bits (str): pattern bits
+
+        Returns:
+            List[int]: failure value per prefix length - 1
+        """
+        failure = [0] * len(bits)
+        length = 0
+
+        for index in range(1, len(bits)):
+            while length > 0 and bits[index] != bits[length]:
+                length = failure[length - 1]
+            if bits[index] == bits[length]:
+                length += 1
+            failure[index] = length
+
+        return failure
+
+    def _step(self, state: int, bit: str) -> int:
+        """
+        Helper method for advancing the bit automaton by one bit. A state is
+        the number of pattern bits matched, and equals the pattern length on
+        a full match.
+
+        Args:
+            state (int): current state
+            bit (str): next bit, '0' or '1'
+
+        Returns:
+            int: next state
+        """
+        bits = self._pattern_bits
+
+        if state == len(bits):
+            state = self._failure[state - 1]
+        while state > 0 and bits[state] != bit:
+            state = self._failure[state - 1]
+        if bits[state] == bit:
+            state += 1
+
+        return state
+
+    def _step_byte(self, state: int, byte: int) \
+            -> Tuple[int, Tuple[int, ...]]:
+        """
+        Helper method for advancing the automaton by the 8 bits of a byte,
+        most significant bit first. Results are cached per state and byte.
+
+        Args:
+            state (int): current state
+            byte (int): next byte
+
+        Returns:
+            int: next state
+            Tuple[int, ...]: bit offsets within the byte where a full match
+                ends (exclusive)
+        """
+        key = (state << 8) | byte
+        transition = self._byte_transitions.get(key)
+
+        if transition is None:
+            ends = []
+            for shift in range(7, -1, -1):
+                state = self._step(state, '1' if (byte >> shift) & 1 else '0')
+                if state == len(self._pattern_bits):
+                    ends.append(8 - shift)
+
+            transition = (state, tuple(ends))
+            self._byte_transitions[key] = transition
+
+        return transition
+
+    def get_pattern_bits(self) -> str:
+        """
+        Getter method for the encoded pattern
+
+        Returns:
+            str: pattern bits made entirely of 1s and 0s
+        """
+        return self._pattern_bits
+
+    def find_all(self, encoded_string: str, first_only=False) \
+            -> List[Tuple[int, int]]:
+        """
+        Method for finding every match in a binary string, as returned by
+        encoding. Overlapping matches are all reported.
+
+        Args:
+            encoded_string (str): binary string, which may hold whitespace
+                between encoded words
+            first_only (bool): True to stop after the first match
+
+        Returns:
+            List[Tuple[int, int]]: character offset of each match in the
+                encoded string, and number of symbols before it
+
+        Raises:
+            ValueError: if a character before a match is not a 0, 1, or
+                whitespace, or whitespace falls inside a codeword
+        """
+        root = self._tree.get_root()
+        node = root
+        position = 0
+        symbols = 0
+        matches = []
+        candidate = encoded_string.find(self._pattern_bits)
+
+        while candidate != -1:
+            node, symbols = self._walk_string(encoded_string, position,
+                                              candidate, node, symbols)
+            position = candidate
+
+            if node is root:
+                matches.append((candidate, symbols))
+                if first_only:
+                    break
+
+            candidate = encoded_string.find(self._pattern_bits, candidate + 1)
+
+        return matches
+
+    def find_all_packed(self, packed: bytes, bit_length: int,
+                        first_only=False) -> List[Tuple[int, int]]:
+        """
+        Method for finding every match in packed bits, 8 per byte and most
+        significant bit first. Accepts any bytes-like object and reads it in
+        place. Overlapping matches are all reported.
+
+        Args:
+            packed (bytes): the compressed, packed bits
+            bit_length (int): number of bits to search
+            first_only (bool): True to stop after the first match
+
+        Returns:
+            List[Tuple[int, int]]: bit offset of each match and number of
+                symbols before it
+
+        Raises:
+            ValueError: if bit_length exceeds the packed bits
+        """
+        view = memoryview(packed).cast('B')
+        if bit_length > len(view) * 8:
+            raise ValueError("INVALID LENGTH: more bits than were packed")
+
+        root = self._tree.get_root()
+        node = root
+        position = 0
+        symbols = 0
+        matches = []
+        pattern_length = len(self._pattern_bits)
+        full_bytes, remaining_bits = divmod(bit_length, 8)
+        state = 0
+
+        for index in range(full_bytes + (1 if remaining_bits else 0)):
+            if index < full_bytes:
+                state, ends = self._step_byte(state, view[index])
+            else:
+                # Last partial byte: step only the bits before the padding
+                ends = []
+                for shift in range(7, 7 - remaining_bits, -1):
+                    bit = '1' if (view[index] >> shift) & 1 else '0'
+                    state = self._step(state, bit)
+                    if state == pattern_length:
+                        ends.append(8 - shift)
+
+            for end in ends:
+                candidate = index * 8 + end - pattern_length
+                node, symbols = self._walk_packed(view, position, candidate,
+                                                  node, symbols)
+                position = candidate
+
+                if node is root:
+                    matches.append((candidate, symbols))
+                    if first_only:
+                        return matches
+
+        return matches
+
+    def contains(self, encoded_string: str) -> bool:
+        """
+        Method for checking whether a binary string holds the pattern
+
+        Args:
+            encoded_string (str): binary string, as returned by encoding
+
+        Returns:
+            bool: True if the pattern is found, otherwise False
+        """
+        return len(self.find_all(encoded_string, first_only=True)) > 0
+
+    def _walk_string(self, encoded_string: str, start: int, end: int,
+                     node: 'HuffmanNode', symbols: int) \
+            -> Tuple['HuffmanNode', int]:
+        """
+        Helper method for walking the Huffman Tree over part of a binary
+        string, counting the symbols completed along the way.
+
+        Args:
+            encoded_string (str): binary string
+            start (int): offset where the walk resumes
+            end (int): offset where the walk stops (exclusive)
+            node (HuffmanNode): node reached at start
+            symbols (int): symbols completed before start
+
+        Returns:
+            HuffmanNode: node reached at end. The root marks a boundary
+            int: symbols completed before end
+
+        Raises:
+            ValueError: if a character is not a 0, 1, or whitespace, or
+                whitespace falls inside a codeword
+        """
+        root = self._tree.get_root()
+
+        for index in range(start, end):
+            bit = encoded_string[index]
+            if bit == '0':
+                node = node.get_left()
+            elif bit == '1':
+                node = node.get_right()
+            elif bit.isspace():
+                if node is not root:
+                    # Error case: "word" in binary string could not be decoded
+                    error = "INVALID BINARY: Leftover bits in the encoded "
+                    error += "string. Cannot be converted."
+                    raise ValueError(error)
+                continue
+            else:
+                # Error case: not a binary string
+                raise ValueError(f"INVALID CHAR: {bit} is not a binary bit")
+
+            if node.is_leaf():
+                symbols += 1
+                node = root
+
+        return node, symbols
+
+    def _walk_packed(self, view: memoryview, start: int, end: int,
+                     node: 'HuffmanNode', symbols: int) \
+            -> Tuple['HuffmanNode', int]:
+        """
+        Helper method for walking the Huffman Tree over a range of packed
+        bits, counting the symbols completed along the way.
+
+        Args:
+            view (memoryview): packed bits as unsigned bytes
+            start (int): bit offset where the walk resumes
+            end (int): bit offset where the walk stops (exclusive)
+            node (HuffmanNode): node reached at start
+            symbols (int): symbols completed before start
+
+        Returns:
+            HuffmanNode: node reached at end. The root marks a boundary
+            int: symbols completed before end
+        """
+        root = self._tree.get_root()
+
+        for index in range(start, end):
+            if (view[index >> 3] >> (7 - (index & 7))) & 1:
+                node = node.get_right()
+            else:
+                node = node.get_left()
+
+            if node.is_leaf():
+                symbols += 1
+                node = root
+
+        return node, symbols
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("frequency_table", type=str,
+                            help="Frequency table pathname")
+    arg_parser.add_argument("encoded_file", type=str,
+                            help="Encoded file pathname")
+    arg_parser.add_argument("pattern", type=str, help="Text to find")
+    arg_parser.add_argument("--packed", action="store_true",
+                            help="Reads the encoded file as packed bits")
+    arg_parser.add_argument("--count", action="store_true",
+                            help="Prints only the number of matches")
+    arg_parser.add_argument("--debug", action="store_true",
+                            help="Toggles debug mode to log errors to stderr")
+    args = arg_parser.parse_args()
+
+    def report(line_number: int, matches: List[Tuple[int, int]]) -> int:
+        """
+        Helper function that prints one line's matches, grep style, as
+        line:offset:symbol, unless only counting.
+        """
+        if not args.count:
+            for offset, symbol in matches:
+                print(f"{line_number}:{offset}:{symbol}")
+        return len(matches)
+
+    try:
+        is_valid_io(Path(args.frequency_table), Path(args.encoded_file))
+        search = EncodedSearch(HuffmanTree(args.frequency_table),
+                               args.pattern)
+        num_matches = 0
+
+        if args.packed:
+            with open(args.encoded_file, 'rb') as encoded:
+                data = encoded.read()
+            if len(data) < PACKED_HEADER_SIZE:
+                raise ValueError("INVALID PACKED FILE: missing header")
+
+            bit_length, = PACKED_HEADER.unpack_from(data)
+            num_matches += report(1, search.find_all_packed(
+                memoryview(data)[PACKED_HEADER_SIZE:], bit_length))
+        else:
+            with open(args.encoded_file, 'r', encoding="utf-8") as encoded:
+                for line_number, line in enumerate(encoded, start=1):
+                    try:
+                        num_matches += report(line_number,
+                                              search.find_all(line.strip()))
+                    except ValueError as ve:
+                        if args.debug:
+                            print(f"Line {line_number}: {ve.args[0]}",
+                                  file=stderr)
+
+        if args.count:
+            print(num_matches)
+    except (FileNotFoundError, ValueError) as error:
+        if args.debug:
+            print(error.args[0], file=stderr)
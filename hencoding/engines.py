@@ -0,0 +1,305 @@
+"""
+engines
+
+This module contains a class for encoding with one of several engines that
+produce identical output at different speeds:
+- traversal: searches the Huffman Tree for each character, as when not
+  memoized
+- table: looks each character up in the code table, as when memoized
+- translate: maps the whole line through a translation table with
+  str.translate, which runs in C but pays a fixed cost per line
+In auto mode, a short calibration times every engine on lines of a few sizes,
+and each line is encoded with the engine that was fastest for the nearest
+calibrated size. A cost model from an earlier calibration may be passed in to
+skip the calibration. Decoding has a single engine, the tree walk.
+"""
+from string import whitespace
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Optional, Tuple
+from hencoding.huffman_tree import HuffmanTree
+from hencoding.huffman_encoding import HuffmanEncoding
+
+AUTO_ENGINE = "auto"
+ENGINE_NAMES = ("traversal", "table", "translate")
+
+# Line sizes (characters) timed during calibration
+CALIBRATION_SIZES = (4, 32, 256, 2048)
+
+# Timed runs per engine and size. The fastest run is kept
+CALIBRATION_ROUNDS = 3
+
+# An engine this many times slower than the fastest is not timed at larger
+# sizes, since its cost grows at least as fast with size
+PRUNE_FACTOR = 4
+
+
+class EngineEncoding(HuffmanEncoding):
+    """
+    Class for encoding with a chosen engine, or with the engine predicted to
+    be fastest for each line's size. Decoding is inherited unchanged. Counts
+    the lines and characters encoded by each engine.
+    """
+
+    def __init__(self, huffman_tree: 'HuffmanTree', engine=AUTO_ENGINE,
+                 cost_model: Optional[Dict[int, Dict[str, int]]] = None,
+                 allowed_nonalpha_chars=None) -> 'EngineEncoding':
+        """
+        Args:
+            huffman_tree (HuffmanTree): tree used for conversions
+            engine (str): name of the engine used for every line, OR 'auto'
+                to choose per line
+            cost_model (Dict[int, Dict[str, int]]): runtime in ns per line
+                size and engine, as returned by get_cost_model, OR None to
+                calibrate. Only used in auto mode
+            allowed_nonalpha_chars (set): permitted punctuation OR None for
+                the default set
+
+        Raises:
+            ValueError: if the engine name is unknown
+        """
+        super().__init__(huffman_tree, allowed_nonalpha_chars)
+
+        if (engine != AUTO_ENGINE) and (engine not in ENGINE_NAMES):
+            raise ValueError(f"INVALID ENGINE: unknown engine '{engine}'")
+
+        self._engine = engine
+        self._engines: Dict[str, Callable[[str], str]] = {
+            "traversal": self._encode_without_memo,
+            "table": self._encode_with_memo,
+            "translate": self._encode_with_translate,
+        }
+
+        # Translation table, rebuilt when the tree's code table changes
+        self._translate_codes: Optional[Dict[str, str]] = None
+        self._translate_table: Dict[int, Optional[str]] = {}
+        self._translate_chars = frozenset()
+
+        self._usage = {name: [0, 0] for name in ENGINE_NAMES}
+        self._last_engine: Optional[str] = None
+
+        # Fastest engine from each listed size upward, smallest first
+        self._cost_model: Dict[int, Dict[str, int]] = {}
+        self._thresholds: List[Tuple[int, str]] = []
+
+        if engine == AUTO_ENGINE:
+            self.set_cost_model(cost_model if cost_model is not None
+                                else self.calibrate())
+
+    def _refresh_translate_table(self) -> None:
+        """
+        Helper method for building the translation table from the current
+        code table: letters of either case map to their codes, and whitespace
+        and permitted punctuation map to nothing.
+        """
+        codes = self._tree.get_code_table()
+        if codes is self._translate_codes:
+            return
+
+        table: Dict[int, Optional[str]] = {}
+        for char, code in codes.items():
+            table[ord(char)] = code
+
+            upper = char.upper()
+            if (len(upper) == 1) and (upper.lower() == char):
+                table[ord(upper)] = code
+
+        for char in set(whitespace) | set(self._allowed_nonalpha_chars):
+            table[ord(char)] = None
+
+        self._translate_codes = codes
+        self._translate_table = table
+        self._translate_chars = frozenset(chr(key) for key in table)
+
+    def _encode_with_translate(self, expression: str) -> str:
+        """
+        Encodes a given expression by mapping every character through a
+        translation table in one call. Expressions holding any character
+        outside the table are passed to the table engine, so errors and
+        unusual case mappings match it exactly.
+
+        Args:
+            expression (str): the string being encoded
+
+        Returns:
+            str: a new binary string made entirely of 1s and 0s
+
+        Raises:
+            ValueError: when a non-punctuation or non-white space character
+                appears that is not a leaf node in the Huffman Tree (it has no
+                corresponding Huffman code)
+        """
+        self._refresh_translate_table()
+
+        if not self._translate_chars.issuperset(expression):
+            return self._encode_with_memo(expression)
+
+        return expression.translate(self._translate_table)
+
+    def calibrate(self) -> Dict[int, Dict[str, int]]:
+        """
+        Method for timing every engine on sample lines of each calibration
+        size, built from the tree's characters. Engines far slower than the
+        fastest at one size are not timed at larger sizes.
+
+        Returns:
+            Dict[int, Dict[str, int]]: fastest runtime in ns per line size
+                and engine
+        """
+        characters = ''.join(self._tree.get_code_table()) or ' '
+        sample = (characters + ' ') * \
+            (max(CALIBRATION_SIZES) // (len(characters) + 1) + 1)
+
+        cost_model = {}
+        remaining = list(ENGINE_NAMES)
+
+        for size in CALIBRATION_SIZES:
+            line = sample[:size]
+            costs = {}
+
+            for name in remaining:
+                encode = self._engines[name]
+                encode(line)
+                runtimes = []
+
+                for _ in range(CALIBRATION_ROUNDS):
+                    start = perf_counter_ns()
+                    encode(line)
+                    runtimes.append(perf_counter_ns() - start)
+
+                costs[name] = min(runtimes)
+
+            cost_model[size] = costs
+            fastest = min(costs.values())
+            remaining = [name for name in remaining
+                         if costs[name] <= fastest * PRUNE_FACTOR]
+
+        return cost_model
+
+    def set_cost_model(self, cost_model: Dict[int, Dict[str, int]]) \
+            -> 'EngineEncoding':
+        """
+        Method for setting the runtimes used to choose engines in auto mode
+
+        Args:
+            cost_model (Dict[int, Dict[str, int]]): runtime in ns per line
+                size and engine
+
+        Returns:
+            EngineEncoding: current instance of the encoding
+
+        Raises:
+            ValueError: if the cost model is empty or names an unknown engine
+        """
+        if not cost_model or not all(costs for costs in cost_model.values()):
+            raise ValueError("INVALID COST MODEL: no runtimes given")
+
+        for costs in cost_model.values():
+            for name in costs:
+                if name not in ENGINE_NAMES:
+                    raise ValueError(
+                        f"INVALID ENGINE: unknown engine '{name}'")
+
+        self._cost_model = {int(size): dict(costs)
+                            for size, costs in cost_model.items()}
+
+        # Keep only the sizes where the fastest engine changes
+        self._thresholds = []
+        for size, costs in sorted(self._cost_model.items()):
+            fastest = min(costs, key=costs.get)
+            if not self._thresholds or self._thresholds[-1][1] != fastest:
+                self._thresholds.append((size, fastest))
+
+        return self
+
+    def choose_engine(self, size: int) -> str:
+        """
+        Method for naming the engine used for a line of a given size: the
+        fixed engine, or in auto mode, the fastest engine at the largest
+        calibrated size not above it
+
+        Args:
+            size (int): number of characters in the line
+
+        Returns:
+            str: engine name
+        """
+        if self._engine != AUTO_ENGINE:
+            return self._engine
+
+        chosen = self._thresholds[0][1]
+        for threshold, name in self._thresholds:
+            if size < threshold:
+                break
+            chosen = name
+
+        return chosen
+
+    def encode(self, expression: str) -> str:
+        """
+        Method for encoding an expression string with the engine chosen for
+        its size
+
+        Args:
+            expression (str): the string being encoded
+
+        Returns:
+            str: a new binary string made entirely of 1s and 0s
+        """
+        name = self.choose_engine(len(expression))
+        self._last_engine = name
+
+        usage = self._usage[name]
+        usage[0] += 1
+        usage[1] += len(expression)
+
+        return self._engines[name](expression)
+
+    def get_engine(self) -> str:
+        """
+        Getter method for the engine name given at instantiation
+
+        Returns:
+            str: engine name OR 'auto'
+        """
+        return self._engine
+
+    def get_last_engine(self) -> Optional[str]:
+        """
+        Getter method for the engine that encoded the last expression
+
+        Returns:
+            str: engine name OR None if nothing was encoded
+        """
+        return self._last_engine
+
+    def get_engine_usage(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Getter method for the number of lines and characters each engine
+        encoded
+
+        Returns:
+            Dict[str, Tuple[int, int]]: lines and characters per engine
+        """
+        return {name: (lines, chars)
+                for name, (lines, chars) in self._usage.items()}
+
+    def get_cost_model(self) -> Dict[int, Dict[str, int]]:
+        """
+        Getter method for the runtimes used to choose engines in auto mode.
+        Can be passed to a later instance to skip calibration
+
+        Returns:
+            Dict[int, Dict[str, int]]: runtime in ns per line size and engine.
+                Empty if not in auto mode
+        """
+        return {size: dict(costs) for size, costs in self._cost_model.items()}
+
+    def get_thresholds(self) -> List[Tuple[int, str]]:
+        """
+        Getter method for the engine chosen from each calibrated size upward
+
+        Returns:
+            List[Tuple[int, str]]: line size and engine, smallest size first.
+                Empty if not in auto mode
+        """
+        return list(self._thresholds)
@@ -0,0 +1,193 @@
+"""
+frequency_counter
+
+This module contains functions for building a frequency table from input
+files, in the 'character - frequency' format read by HuffmanTree. Files are
+split into byte ranges that are counted in parallel by worker processes, each
+reading large blocks and counting letters with C-level bytes methods, and the
+partial counts are merged. Only ASCII letters are counted, case insensitive.
+It can be run as a program:
+python -m hencoding.frequency_counter output_table input_file [input_file ...]
+        [--workers N] [--shard_size N] [--debug]
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from string import ascii_lowercase
+from sys import stderr
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
+from support.is_valid_io import is_valid_io
+
+# Bytes read per block, and max bytes counted by each worker task
+BLOCK_SIZE = 1 << 22
+DEFAULT_SHARD_SIZE = 1 << 26
+
+LETTERS = [letter.encode() for letter in ascii_lowercase]
+
+
+def count_block(block: bytes, counts: Optional[Dict[str, int]] = None) \
+        -> Dict[str, int]:
+    """
+    Function that counts the ASCII letters in a block of bytes, case
+    insensitive. Each letter is counted by one C-level pass over the block.
+
+    Args:
+        block (bytes): bytes being counted
+        counts (Dict[str, int]): counts to add to OR None to start from 0
+
+    Returns:
+        Dict[str, int]: number of occurrences per lowercase letter
+    """
+    if counts is None:
+        counts = dict.fromkeys(ascii_lowercase, 0)
+
+    lowered = block.lower()
+    for letter, letter_byte in zip(ascii_lowercase, LETTERS):
+        counts[letter] += lowered.count(letter_byte)
+
+    return counts
+
+
+def count_range(task: Tuple[str, int, int]) -> Dict[str, int]:
+    """
+    Worker function that counts the letters in a byte range of a file, one
+    block at a time.
+
+    Args:
+        task (Tuple[str, int, int]): file pathname, start offset (inclusive),
+            and end offset (exclusive)
+
+    Returns:
+        Dict[str, int]: number of occurrences per lowercase letter
+    """
+    path, start, end = task
+    counts = dict.fromkeys(ascii_lowercase, 0)
+
+    with open(path, 'rb') as file:
+        file.seek(start)
+        remaining = end - start
+
+        while remaining > 0:
+            block = file.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+
+            count_block(block, counts)
+            remaining -= len(block)
+
+    return counts
+
+
+def shard_files(paths: Iterable[TextIO], shard_size=DEFAULT_SHARD_SIZE) \
+        -> List[Tuple[str, int, int]]:
+    """
+    Function that splits files into byte ranges of at most shard_size bytes.
+    Letters are counted one byte at a time, so ranges may be cut anywhere.
+
+    Args:
+        paths (Iterable[TextIO]): input file pathnames
+        shard_size (int): max number of bytes per range. Must be >= 1
+
+    Returns:
+        List[Tuple[str, int, int]]: file pathname, start offset (inclusive),
+            and end offset (exclusive) of each range
+
+    Raises:
+        ValueError: when shard_size is not a positive integer
+    """
+    if shard_size < 1:
+        raise ValueError("There must be at least 1 byte per shard")
+
+    tasks = []
+    for path in paths:
+        size = Path(path).stat().st_size
+        for start in range(0, size, shard_size):
+            tasks.append((str(path), start, min(start + shard_size, size)))
+
+    return tasks
+
+
+def count_frequencies(paths: Iterable[TextIO], workers=1,
+                      shard_size=DEFAULT_SHARD_SIZE) -> Dict[str, int]:
+    """
+    Function that counts the letters across input files, splitting them into
+    byte ranges counted by a pool of worker processes.
+
+    Args:
+        paths (Iterable[TextIO]): input file pathnames
+        workers (int): number of worker processes. 1 counts in-process
+        shard_size (int): max number of bytes per range. Must be >= 1
+
+    Returns:
+        Dict[str, int]: number of occurrences per lowercase letter
+    """
+    tasks = shard_files(paths, shard_size)
+
+    if (workers > 1) and (len(tasks) > 1):
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partial_counts = list(pool.map(count_range, tasks))
+    else:
+        partial_counts = [count_range(task) for task in tasks]
+
+    # Merge partial counts
+    counts = dict.fromkeys(ascii_lowercase, 0)
+    for partial in partial_counts:
+        for letter, count in partial.items():
+            counts[letter] += count
+
+    return counts
+
+
+def write_frequency_table(output_file: TextIO,
+                          frequencies: Dict[str, int]) -> int:
+    """
+    Function that writes frequencies as a frequency table readable by
+    HuffmanTree: one 'character - frequency' pair per line, in alphabetical
+    order. Characters with a frequency below 1 are left out, as HuffmanTree
+    requires frequencies > 0.
+
+    Args:
+        output_file (TextIO): file to which the frequency table is written
+        frequencies (Dict[str, int]): number of occurrences per character
+
+    Returns:
+        int: number of characters written
+    """
+    lines = [f"{char.upper()} - {frequency}\n"
+             for char, frequency in sorted(frequencies.items())
+             if frequency >= 1]
+
+    with open(output_file, 'w', encoding="utf-8") as output:
+        output.writelines(lines)
+
+    return len(lines)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("output_table", type=str,
+                            help="Output frequency table pathname")
+    arg_parser.add_argument("input_files", type=str, nargs='+',
+                            help="Input file pathnames")
+    arg_parser.add_argument("--workers", type=int, default=1,
+                            help="(Optional) Number of worker processes")
+    arg_parser.add_argument("--shard_size", type=int,
+                            default=DEFAULT_SHARD_SIZE,
+                            help="(Optional) Max bytes counted per task")
+    arg_parser.add_argument("--debug", action="store_true",
+                            help="Toggles debug mode to log errors to stderr")
+    args = arg_parser.parse_args()
+
+    input_paths = [Path(input_file) for input_file in args.input_files]
+
+    try:
+        is_valid_io(*input_paths, Path(args.output_table).resolve().parent)
+        num_chars = write_frequency_table(
+            args.output_table,
+            count_frequencies(input_paths, args.workers, args.shard_size))
+
+        if args.debug:
+            print(f"OK: {num_chars} characters written", file=stderr)
+    except FileNotFoundError as fnfe:
+        if args.debug:
+            print(fnfe.args[0], file=stderr)
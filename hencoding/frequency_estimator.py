@@ -0,0 +1,315 @@
+"""
+frequency_estimator
+
+This module contains a class and function for estimating a frequency table
+from a sample of a large input file rather than counting all of it. Blocks of
+the file are read in random order (sampling without replacement) or in stride
+order (evenly spread passes), and sampling stops once the letter distribution
+converges: doubling the number of blocks read changes it by less than a
+tolerance. Laplace smoothing gives letters missing from the sample a code.
+The estimate also predicts how many more bits per symbol the estimated table
+costs compared to exact counts. It can be run as a program:
+python -m hencoding.frequency_estimator output_table input_file
+        [--block_size N] [--tolerance X] [--smoothing N] [--stride] [--seed N]
+"""
+import argparse
+from math import ceil, log
+from pathlib import Path
+from random import Random
+from string import ascii_lowercase
+from sys import stderr
+from typing import Dict, List, Optional, TextIO
+from hencoding.huffman_tree import HuffmanTree
+from hencoding.frequency_counter import count_block, write_frequency_table
+from support.is_valid_io import is_valid_io
+
+DEFAULT_BLOCK_SIZE = 1 << 16
+DEFAULT_TOLERANCE = 0.005
+DEFAULT_MIN_BLOCKS = 8
+
+
+class FrequencyEstimate:
+    """
+    Class holding a frequency table estimated from a sample, along with how
+    it was sampled and its predicted compression loss.
+    """
+
+    def __init__(self, counts: Dict[str, int], smoothing: int,
+                 sampled_bytes: int, total_bytes: int, converged: bool) \
+            -> 'FrequencyEstimate':
+        """
+        Args:
+            counts (Dict[str, int]): sampled occurrences per lowercase letter
+            smoothing (int): amount added to every letter's count
+            sampled_bytes (int): number of bytes read
+            total_bytes (int): size of the input file in bytes
+            converged (bool): True if sampling stopped on convergence
+        """
+        self._counts = counts
+        self._smoothing = smoothing
+        self._sampled_bytes = sampled_bytes
+        self._total_bytes = total_bytes
+        self._converged = converged
+
+        self._frequencies = {letter: count + smoothing
+                             for letter, count in counts.items()
+                             if count + smoothing >= 1}
+        self._predicted_loss = self._predict_loss()
+
+    def __str__(self) -> str:
+        """
+        Returns a report of the sample and predicted loss
+        """
+        sampled = self._sampled_bytes / self._total_bytes \
+            if self._total_bytes else 1.0
+
+        write = [f"Sampled: {self._sampled_bytes} of {self._total_bytes} "
+                 f"bytes ({sampled:.2%})",
+                 f"Converged: {self._converged}",
+                 f"Symbols sampled: {sum(self._counts.values())}",
+                 f"Characters in table: {len(self._frequencies)}",
+                 "Predicted loss vs exact counts: "
+                 f"{self._predicted_loss:.4f} bits per symbol"]
+
+        return '\n'.join(write)
+
+    def get_frequencies(self) -> Dict[str, int]:
+        """
+        Getter method for the smoothed frequency per character, ready for
+        HuffmanTree
+
+        Returns:
+            Dict[str, int]: estimated frequency per character
+        """
+        return dict(self._frequencies)
+
+    def get_counts(self) -> Dict[str, int]:
+        """
+        Getter method for the unsmoothed occurrences per letter in the sample
+
+        Returns:
+            Dict[str, int]: sampled occurrences per letter
+        """
+        return dict(self._counts)
+
+    def get_predicted_loss(self) -> float:
+        """
+        Getter method for the predicted extra bits per symbol of a tree built
+        from this estimate, compared to one built from exact counts
+
+        Returns:
+            float: predicted loss in bits per symbol
+        """
+        return self._predicted_loss
+
+    def get_sampled_bytes(self) -> int:
+        """
+        Getter method for the number of bytes read
+
+        Returns:
+            int: bytes sampled
+        """
+        return self._sampled_bytes
+
+    def is_converged(self) -> bool:
+        """
+        Indicates whether sampling stopped because the distribution converged,
+        rather than because the whole file was read
+
+        Returns:
+            bool: True if converged before reading the whole file
+        """
+        return self._converged
+
+    def _predict_loss(self) -> float:
+        """
+        Helper method for predicting the extra bits per symbol of the
+        estimated table. It adds the cost of smoothing, measured on the
+        sample, to the expected cost of sampling error: coding a distribution
+        with codes fit to a sample of n symbols from k letters costs about
+        (k - 1) / (2n ln 2) extra bits per symbol. Sampling whole blocks of
+        correlated text makes the true error somewhat larger.
+
+        Returns:
+            float: predicted loss in bits per symbol
+        """
+        sampled = {letter: count for letter, count in self._counts.items()
+                   if count > 0}
+        num_symbols = sum(sampled.values())
+
+        if len(sampled) < 2:
+            # Case: 0 or 1 letters seen. Nothing to compare codes against
+            return 0.0
+
+        def average_code_length(frequencies: Dict[str, int]) -> float:
+            lengths = HuffmanTree.from_frequencies(frequencies) \
+                .get_code_lengths()
+            return sum(count * lengths[letter]
+                       for letter, count in sampled.items()) / num_symbols
+
+        smoothing_loss = average_code_length(self._frequencies) - \
+            average_code_length(sampled)
+
+        if self._sampled_bytes >= self._total_bytes:
+            # Case: whole file read. Counts are exact
+            return max(smoothing_loss, 0.0)
+
+        sampling_loss = (len(sampled) - 1) / (2 * num_symbols * log(2))
+        return max(smoothing_loss, 0.0) + sampling_loss
+
+
+def _total_variation(first: Dict[str, int], second: Dict[str, int]) -> float:
+    """
+    Helper function for the total variation distance between the letter
+    distributions of two sets of counts: half the sum of absolute
+    differences between letter probabilities.
+
+    Args:
+        first (Dict[str, int]): occurrences per letter
+        second (Dict[str, int]): occurrences per letter
+
+    Returns:
+        float: distance between 0 (identical) and 1 (disjoint)
+    """
+    first_total = sum(first.values()) or 1
+    second_total = sum(second.values()) or 1
+
+    return sum(abs(first[letter] / first_total -
+                   second[letter] / second_total)
+               for letter in ascii_lowercase) / 2
+
+
+def _block_order(num_blocks: int, stride: bool, seed: Optional[int]) \
+        -> List[int]:
+    """
+    Helper function for the order in which blocks are sampled. Random order
+    is a uniform sample without replacement. Stride order reads every 2^k-th
+    block in successive passes, so any prefix is spread evenly over the file.
+
+    Args:
+        num_blocks (int): number of blocks in the file
+        stride (bool): True for stride order, otherwise random order
+        seed (int): seed for random order OR None
+
+    Returns:
+        List[int]: block indices in sampling order
+    """
+    if not stride:
+        order = list(range(num_blocks))
+        Random(seed).shuffle(order)
+        return order
+
+    order = []
+    seen = set()
+    step = 1 << max(num_blocks - 1, 0).bit_length()
+
+    while step >= 1:
+        for index in range(0, num_blocks, step):
+            if index not in seen:
+                seen.add(index)
+                order.append(index)
+        step //= 2
+
+    return order
+
+
+def estimate_frequencies(input_file: TextIO,
+                         block_size=DEFAULT_BLOCK_SIZE,
+                         tolerance=DEFAULT_TOLERANCE, smoothing=1,
+                         min_blocks=DEFAULT_MIN_BLOCKS, stride=False,
+                         seed: Optional[int] = None) -> 'FrequencyEstimate':
+    """
+    Function that samples blocks of a file until the letter distribution
+    converges or the whole file is read, then smooths the sampled counts.
+    The distribution is checked after min_blocks blocks and each time the
+    number of blocks read doubles.
+
+    Args:
+        input_file (TextIO): input file pathname
+        block_size (int): number of bytes per block. Must be >= 1
+        tolerance (float): max total variation distance between checks for
+            the distribution to count as converged
+        smoothing (int): amount added to every letter's count. Must be >= 0
+        min_blocks (int): number of blocks read before the first check
+        stride (bool): True for stride order, otherwise random order
+        seed (int): seed for random order OR None
+
+    Returns:
+        FrequencyEstimate: smoothed frequencies and predicted loss
+
+    Raises:
+        ValueError: when block_size is not positive or smoothing is negative
+    """
+    if block_size < 1:
+        raise ValueError("There must be at least 1 byte per block")
+
+    if smoothing < 0:
+        raise ValueError("Smoothing must be >= 0")
+
+    total_bytes = Path(input_file).stat().st_size
+    num_blocks = ceil(total_bytes / block_size)
+
+    counts = dict.fromkeys(ascii_lowercase, 0)
+    previous: Optional[Dict[str, int]] = None
+    next_check = max(min_blocks, 1)
+    sampled_bytes = 0
+    converged = False
+
+    with open(input_file, 'rb') as file:
+        for blocks_read, index in enumerate(
+                _block_order(num_blocks, stride, seed), start=1):
+            file.seek(index * block_size)
+            block = file.read(block_size)
+            count_block(block, counts)
+            sampled_bytes += len(block)
+
+            if (blocks_read == next_check) and (blocks_read < num_blocks):
+                # Check convergence against the previous check
+                if (previous is not None) and \
+                        (_total_variation(previous, counts) < tolerance):
+                    converged = True
+                    break
+
+                previous = dict(counts)
+                next_check *= 2
+
+    return FrequencyEstimate(counts, smoothing, sampled_bytes, total_bytes,
+                             converged)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("output_table", type=str,
+                            help="Output frequency table pathname")
+    arg_parser.add_argument("input_file", type=str, help="Input file pathname")
+    arg_parser.add_argument("--block_size", type=int,
+                            default=DEFAULT_BLOCK_SIZE,
+                            help="(Optional) Bytes per sampled block")
+    arg_parser.add_argument("--tolerance", type=float,
+                            default=DEFAULT_TOLERANCE,
+                            help="(Optional) Max change in distribution "
+                            "between checks to stop sampling")
+    arg_parser.add_argument("--smoothing", type=int, default=1,
+                            help="(Optional) Amount added to every letter's "
+                            "count")
+    arg_parser.add_argument("--stride", action="store_true",
+                            help="Samples blocks in stride order instead of "
+                            "random order")
+    arg_parser.add_argument("--seed", type=int,
+                            help="(Optional) Seed for random order")
+    arg_parser.add_argument("--debug", action="store_true",
+                            help="Toggles debug mode to log errors to stderr")
+    args = arg_parser.parse_args()
+
+    try:
+        is_valid_io(Path(args.input_file),
+                    Path(args.output_table).resolve().parent)
+        estimate = estimate_frequencies(
+            args.input_file, block_size=args.block_size,
+            tolerance=args.tolerance, smoothing=args.smoothing,
+            stride=args.stride, seed=args.seed)
+        write_frequency_table(args.output_table, estimate.get_frequencies())
+        print(estimate)
+    except (FileNotFoundError, ValueError) as error:
+        if args.debug:
+            print(error.args[0], file=stderr)
@@ -9,13 +9,21 @@ chaining.
 Author: Rani Hinnawi
 Date: 2023-08-08
 """
-from typing import Optional
+from collections import Counter
+from typing import Optional, Tuple
 from hencoding.huffman_tree import HuffmanTree
 from hencoding.huffman_node import HuffmanNode
 
 ALLOWED_PUNCTUATION = {'.', ',', ';', ':', '!', '?', '-',
                        '"', "'", '(', ')', '/', '\\', '_', '@', '&', '*', '~'}
 
+# Byte values of binary and whitespace characters in encoded bytes. ASCII
+# whitespace matches str.isspace, which includes \x1c to \x1f
+ZERO_BYTE = ord('0')
+ONE_BYTE = ord('1')
+WHITESPACE_BYTES = frozenset(byte for byte in range(128)
+                             if chr(byte).isspace())
+
 
 class HuffmanEncoding:
     """
@@ -29,6 +37,25 @@ class HuffmanEncoding:
         self._allowed_nonalpha_chars = allowed_nonalpha_chars if \
             allowed_nonalpha_chars is not None else ALLOWED_PUNCTUATION
 
+    def get_tree(self) -> 'HuffmanTree':
+        """
+        Getter method for retrieving the Huffman Tree used for conversions
+
+        Returns:
+            HuffmanTree: Huffman Tree passed in at instantiation
+        """
+        return self._tree
+
+    def get_allowed_nonalpha_chars(self) -> set:
+        """
+        Getter method for retrieving the non-alphabetical characters skipped
+        while encoding
+
+        Returns:
+            set: permitted punctuation symbols
+        """
+        return self._allowed_nonalpha_chars
+
     def encode(self, expression: str) -> str:
         """
         Method for encoding an expression string using the Huffman Tree
@@ -44,6 +71,59 @@ class HuffmanEncoding:
 
         return self._encode_without_memo(expression)
 
+    def count_symbols(self, expression: str) -> int:
+        """
+        Method for counting the characters of an expression that encoding maps
+        to Huffman codes. Whitespace and permitted punctuation are skipped.
+
+        Args:
+            expression (str): the string being measured
+
+        Returns:
+            int: number of encodable characters (symbols)
+        """
+        allowed = self._allowed_nonalpha_chars
+        return sum(1 for char in expression
+                   if not ((char in allowed) or (char.isspace())))
+
+    def estimate_bits(self, expression: str) -> int:
+        """
+        Method for calculating the number of bits encoding an expression would
+        produce, without encoding it. Characters are counted in bulk, and each
+        count is multiplied by the character's code length.
+
+        Args:
+            expression (str): the string being measured
+
+        Returns:
+            int: number of bits in the encoded expression
+
+        Raises:
+            ValueError: when a non-punctuation or non-white space character 
+                appears that is not a leaf node in the Huffman Tree (it has no
+                corresponding Huffman code)
+        """
+        code_lengths = self._tree.get_code_lengths()
+        bits = 0
+
+        # Counter keeps first-seen order, so errors match encode's
+        for char, count in Counter(expression).items():
+            # Enforce case insensitivity
+            char = char.lower()
+
+            if (char in self._allowed_nonalpha_chars) or (char.isspace()):
+                # Case: char is a whitespace or permitted punctuation symbol
+                continue
+
+            length = code_lengths.get(char)
+            if length is None:
+                # Error case: character is not in the Huffman tree
+                raise ValueError(self._value_error_message(char))
+
+            bits += count * length
+
+        return bits
+
     def _value_error_message(self, char: str) -> str:
         """
         Helper method for standardizing value error message across both encode
@@ -61,8 +141,8 @@ class HuffmanEncoding:
         """
         Encodes a given expression using the Huffman Tree. Each character
         should appear as a leaf node, which carries a binary Huffman code
-        corresponding to it. Uses memoization to quickly call a reference to
-        the node and retrieve pre-calculated code.
+        corresponding to it. Uses memoization to quickly retrieve the
+        pre-calculated code from the tree's code table.
 
         Args:
             expression (str): the string being encoded
@@ -75,8 +155,8 @@ class HuffmanEncoding:
                 appears that is not a leaf node in the Huffman Tree (it has no
                 corresponding Huffman code)
         """
-        encoded = ""
-        leaf_nodes = self._tree.get_memo()
+        encoded = []
+        codes = self._tree.get_code_table()
         for char in expression:
             # Enforce case insensitivity
             char = char.lower()
@@ -86,19 +166,14 @@ class HuffmanEncoding:
                 # Case: char is a whitespace or permitted punctuation symbol
                 continue
 
-            index = ord(char) - ord('a')
-            if (index >= len(leaf_nodes)) or (index < 0):
-                # Error case: character is not in the Huffman tree
-                raise ValueError(self._value_error_message(char))
-
-            node = leaf_nodes[index]
-            if node is not None:
-                encoded += node.get_code()
+            code = codes.get(char)
+            if code is not None:
+                encoded.append(code)
             else:
                 # Error case: character is not in the Huffman tree
                 raise ValueError(self._value_error_message(char))
 
-        return encoded
+        return ''.join(encoded)
 
     def _encode_without_memo(self, expression: str) -> str:
         """
@@ -118,8 +193,8 @@ class HuffmanEncoding:
                 appears that is not a leaf node in the Huffman Tree (it has no
                 corresponding Huffman code)
         """
-        def encode_char(node: 'HuffmanNode', target_letter: str, code="") \
-                -> Optional[str]:
+        def encode_char(node: 'HuffmanNode', target_letter: str, value=0,
+                        length=0) -> Optional[Tuple[int, int]]:
             """
             Helper function for leveraging preorder traversal to determine a
             character's Huffman code.
@@ -127,29 +202,32 @@ class HuffmanEncoding:
             Args:
                 node (HuffmanNode): Root of Huffman Tree or subtree
                 char (str): character being searched for in Huffman Tree
-                code (str): binary Huffman code of parent node
+                value (int): binary Huffman code of parent node as an integer
+                length (int): number of bits in parent node's Huffman code
 
             Returns:
-                str: Binary number indicating position of char in the Huffman
-                    Tree OR None if not in tree
+                Tuple[int, int]: Binary number indicating position of char in
+                    the Huffman Tree and its length in bits OR None if not in
+                    tree
             """
             if node.is_leaf():
                 if node.get_characters() == target_letter:
-                    return code
+                    return value, length
                 else:
                     return None
             else:
                 # Must be leaf. Search left, then search right for char
                 left_code = encode_char(node.get_left(), target_letter,
-                                        code + "0")
+                                        value << 1, length + 1)
                 if left_code is not None:
                     return left_code
 
                 right_code = encode_char(node.get_right(), target_letter,
-                                         code + "1")
+                                         (value << 1) | 1, length + 1)
                 return right_code
 
-        encoded = ""
+        encoded = []
+        root = self._tree.get_root()
         for char in expression:
             # Enforce case insensitivity
             char = char.lower()
@@ -159,14 +237,16 @@ class HuffmanEncoding:
                 # Case: char is a whitespace or permitted punctuation symbol
                 continue
 
-            letter_code = encode_char(self._tree.get_root(), char)
+            letter_code = encode_char(root, char)
             if letter_code is not None:
-                encoded += letter_code
+                # Render the integer code as a binary string
+                value, length = letter_code
+                encoded.append(format(value, f"0{length}b") if length else "")
             else:
                 # Error case: character is not in the Huffman tree
                 raise ValueError(self._value_error_message(char))
 
-        return encoded
+        return ''.join(encoded)
 
     def decode(self, encoded_string: str) -> str:
         """
@@ -181,21 +261,55 @@ class HuffmanEncoding:
         Raises:
             ValueError: if a character (bit) is not a 0 or 1
         """
+        result, node = self.decode_chunk(encoded_string)
+
+        if node is not self._tree.get_root():
+            # Error case: leftover bits in the encoded_string
+            error_message = "INVALID BINARY: Leftover bits in the encoded "
+            error_message += "string. Cannot be converted."
+            raise ValueError(error_message)
+
+        return result
+
+    def decode_chunk(self, encoded_chunk: str,
+                     node: Optional['HuffmanNode'] = None) \
+            -> Tuple[str, 'HuffmanNode']:
+        """
+        Decompresses part of a compressed binary string, resuming from the
+        node where the previous part stopped. The node reached at the end of
+        the part is returned, so a string of any length can be decoded piece
+        by piece. The string is complete once the node returned is the root.
+
+        Args:
+            encoded_chunk (str): part of the compressed binary string
+            node (HuffmanNode): node reached by the previous part OR None to
+                start at the root
+
+        Returns:
+            str: the characters decompressed from this part
+            HuffmanNode: node reached at the end of this part
+
+        Raises:
+            ValueError: if a character (bit) is not a 0 or 1, or if a word
+                ends with leftover bits
+        """
         # Begin conversion at the root. Set up output and error message
-        node = self._tree.get_root()
-        result = ""
+        root = self._tree.get_root()
+        if node is None:
+            node = root
+        result = []
         error_message = "INVALID BINARY: Leftover bits in the encoded string. "
         error_message += "Cannot be converted."
 
         # Traverse Huffman Tree. 0 = left, 1 = right. Leaf = letter decoded
-        for bit in encoded_string:
+        for bit in encoded_chunk:
             if bit == '0':
                 node = node.get_left()
             elif bit == '1':
                 node = node.get_right()
             elif bit.isspace():
                 # Case: whitespace encountered at end of a potential word
-                if node != self._tree.get_root():
+                if node is not root:
                     # Error case: "word" in binary string could not be decoded
                     raise ValueError(error_message)
                 continue
@@ -206,11 +320,118 @@ class HuffmanEncoding:
 
             if node.is_leaf():
                 # Add letter to decoded message. Restart next bit at the root
-                result += node.get_characters()
-                node = self._tree.get_root()
+                result.append(node.get_characters())
+                node = root
 
-        if node != self._tree.get_root():
-            # Error case: leftover bits in the encoded_string
+        return ''.join(result), node
+
+    def decode_bytes(self, encoded_bytes: bytes) -> str:
+        """
+        Decompresses a compressed binary string stored as ASCII bytes (b'0'
+        and b'1') using the Huffman Tree. Accepts any bytes-like object, such
+        as a memoryview over a memory-mapped file, and reads it in place
+        without converting it to a string. Bytes holding non-ASCII characters
+        are instead decoded as UTF-8 text, with the same results as decode.
+
+        Args:
+            encoded_bytes (bytes): the compressed binary string as bytes
+
+        Returns:
+            str: the decompressed string
+
+        Raises:
+            ValueError: if a byte is not a 0, 1, or whitespace, or if bits are
+                left over at the end of a word
+        """
+        view = memoryview(encoded_bytes).cast('B')
+        root = self._tree.get_root()
+        node = root
+        result = []
+        error_message = "INVALID BINARY: Leftover bits in the encoded string. "
+        error_message += "Cannot be converted."
+
+        # Traverse Huffman Tree. 0 = left, 1 = right. Leaf = letter decoded
+        for bit in view:
+            if bit == ZERO_BYTE:
+                node = node.get_left()
+            elif bit == ONE_BYTE:
+                node = node.get_right()
+            elif bit in WHITESPACE_BYTES:
+                # Case: whitespace encountered at end of a potential word
+                if node is not root:
+                    raise ValueError(error_message)
+                continue
+            elif bit > 0x7f:
+                # Case: non-ASCII character, such as Unicode whitespace.
+                # Decode the bytes as text to handle it exactly as decode does
+                return self.decode(str(view, "utf-8", errors="replace"))
+            else:
+                # Error case: not a binary string
+                error = f"INVALID CHAR: {chr(bit)} is not a binary bit"
+                raise ValueError(error)
+
+            if node.is_leaf():
+                result.append(node.get_characters())
+                node = root
+
+        if node is not root:
+            # Error case: leftover bits in the encoded bytes
             raise ValueError(error_message)
 
-        return result
+        return ''.join(result)
+
+    def decode_packed(self, packed: bytes, bit_length: int) -> str:
+        """
+        Decompresses packed bits, 8 per byte and most significant bit first,
+        using the Huffman Tree. Accepts any bytes-like object and reads it in
+        place. Padding bits after bit_length are ignored.
+
+        Args:
+            packed (bytes): the compressed, packed bits
+            bit_length (int): number of bits to decode
+
+        Returns:
+            str: the decompressed string
+
+        Raises:
+            ValueError: if bit_length exceeds the packed bits, or if bits are
+                left over at the end
+        """
+        view = memoryview(packed).cast('B')
+        if bit_length > len(view) * 8:
+            raise ValueError("INVALID LENGTH: more bits than were packed")
+
+        root = self._tree.get_root()
+        node = root
+        result = []
+        full_bytes, remaining_bits = divmod(bit_length, 8)
+
+        def walk(byte: int, num_bits: int) -> None:
+            """
+            Helper function for traversing the Huffman Tree with the leading
+            num_bits bits of a byte.
+            """
+            nonlocal node
+            for shift in range(7, 7 - num_bits, -1):
+                if (byte >> shift) & 1:
+                    node = node.get_right()
+                else:
+                    node = node.get_left()
+
+                if node.is_leaf():
+                    result.append(node.get_characters())
+                    node = root
+
+        for byte in view[:full_bytes]:
+            walk(byte, 8)
+
+        if remaining_bits:
+            walk(view[full_bytes], remaining_bits)
+
+        if node is not root:
+            # Error case: leftover bits in the packed bits
+            error = "INVALID BINARY: Leftover bits in the encoded string. "
+            error += "Cannot be converted."
+            raise ValueError(error)
+
+        return ''.join(result)
@@ -4,13 +4,14 @@ huffman_tree
 This module contains a class for building a Huffman tree node. It includes
 functionality for field setters and getters, as well as comparisons. 
 Comparisons give precedence to frequency, and then character length, and 
-then lexicographical ordering. This implementation allows for method chaining.
+then lexicographical ordering. Huffman codes are stored as an integer value
+and a bit length, and only rendered as binary strings on request. This
+implementation allows for method chaining.
 
 Author: Rani Hinnawi
 Date: 2023-08-08
 """
-import re
-from typing import Optional
+from typing import Optional, Tuple
 
 
 class HuffmanNode:
@@ -21,7 +22,8 @@ class HuffmanNode:
     def __init__(self) -> 'HuffmanNode':
         self._chars: Optional[str] = None
         self._freq: Optional[int] = None
-        self._code = ""
+        self._code_value = 0
+        self._code_length = 0
         self._right: Optional['HuffmanNode'] = None
         self._left: Optional['HuffmanNode'] = None
 
@@ -146,7 +148,20 @@ class HuffmanNode:
         Returns:
             str: current node instance's binary Huffman code
         """
-        return self._code
+        if self._code_length == 0:
+            return ""
+        return format(self._code_value, f"0{self._code_length}b")
+
+    def get_code_bits(self) -> Tuple[int, int]:
+        """
+        Getter method for retrieving current node's Huffman Code as an integer
+        value and its length in bits. Leading 0s are kept by the length.
+
+        Returns:
+            int: current node instance's binary Huffman code as an integer
+            int: number of bits in the Huffman code
+        """
+        return self._code_value, self._code_length
 
     def get_frequency(self) -> int:
         """
@@ -199,11 +214,32 @@ class HuffmanNode:
         Raises:
             ValueError: new string is not a valid binary number
         """
-        if (not isinstance(new_code, str)) or \
-                (re.match("^[01]*$", new_code) is None):
+        if (not isinstance(new_code, str)) or new_code.strip("01"):
             raise ValueError("Must be a valid binary number string")
 
-        self._code = new_code
+        return self.set_code_bits(int(new_code, 2) if new_code else 0,
+                                  len(new_code))
+
+    def set_code_bits(self, value: int, length: int) -> 'HuffmanNode':
+        """
+        Setter method for updating current node's Huffman Code from an integer
+        value and its length in bits.
+
+        Args:
+            value (int): binary Huffman code as an integer
+            length (int): number of bits in the Huffman code
+
+        Returns:
+            HuffmanNode: current node instance
+
+        Raises:
+            ValueError: length is negative or too short to hold value
+        """
+        if (length < 0) or (value < 0) or (value >> length):
+            raise ValueError("Must be a valid binary number and bit length")
+
+        self._code_value = value
+        self._code_length = length
         return self
 
     def set_frequency(self, new_frequency: int) -> 'HuffmanNode':
@@ -8,9 +8,10 @@ chaining.
 Author: Rani Hinnawi
 Date: 2023-08-08
 """
-from sys import setrecursionlimit, stderr
-from typing import List, Optional, TextIO
+from sys import getsizeof, setrecursionlimit, stderr
+from typing import Dict, List, Optional, TextIO, Tuple
 from hencoding.huffman_node import HuffmanNode
+from hencoding.tree_stats import TreeStats
 from support.heap import Heap
 
 # Set recursion limit. Python default: 1000. Should not need to exceed number
@@ -26,9 +27,30 @@ class HuffmanTree:
     frequencies nodes in a binary tree structure.
     """
 
-    def __init__(self, frequency_table: TextIO, memo=False) -> 'HuffmanTree':
+    def __init__(self, frequency_table: Optional[TextIO] = None, memo=False,
+                 frequencies: Optional[Dict[str, int]] = None) \
+            -> 'HuffmanTree':
         self._frequency_table = frequency_table
 
+        # Character - frequency pairs, read from the frequency table file
+        # unless passed in directly
+        if frequency_table is not None:
+            self._frequencies = self._read_frequency_table()
+        elif frequencies is not None:
+            self._frequencies = {}
+            self.set_frequencies(frequencies)
+        else:
+            raise ValueError("Either a frequency table or frequencies must be "
+                             "provided")
+
+        # Dirty once frequencies are updated. Rebuilt on next use
+        self._dirty = False
+        self._code_table: Optional[Dict[str, str]] = None
+
+        # Statistics gathered on first request. Dropped when the tree or its
+        # code table changes
+        self._stats: Optional['TreeStats'] = None
+
         # Each index corresponds to a letter in the alphabet
         self._memo = \
             [None for _ in range(ord('z') - ord('a') + 1)] if memo else []
@@ -39,6 +61,26 @@ class HuffmanTree:
         if memo:
             self.set_codes()
 
+    @classmethod
+    def from_frequencies(cls, frequencies: Dict[str, int], memo=False) \
+            -> 'HuffmanTree':
+        """
+        Alternate constructor for building a Huffman Tree from in-memory
+        character - frequency pairs instead of a frequency table file.
+
+        Args:
+            frequencies (Dict[str, int]): frequency per character
+            memo (bool): True if memoizing HuffmanTree nodes, otherwise False
+
+        Returns:
+            HuffmanTree: new Huffman Tree instance
+
+        Raises:
+            ValueError: character key is not a single, unique alphabetical
+                character or frequency value is not an integer >= 1
+        """
+        return cls(memo=memo, frequencies=frequencies)
+
     def __str__(self) -> str:
         """
         String representation of Huffman Tree using pre-order traversal
@@ -74,27 +116,21 @@ class HuffmanTree:
 
             return rep
 
-        return ', '.join(preorder(self._root))
+        return ', '.join(preorder(self.get_root()))
 
-    def _prepare_leaf_nodes(self) -> 'Heap':
+    def _read_frequency_table(self) -> Dict[str, int]:
         """
-        Helper method for building the priority queue containing all leaf 
-        nodes. It error checks inputs and builds new nodes to be placed in the
-        queue. If memoization is activated for current instance, also places
-        references to each leaf node in a memo list index corresponding to its
-        character's position in the Latin (English) alphabet. Case insensitive.
+        Helper method for reading character - frequency pairs from the
+        frequency table file. Case insensitive.
 
         Returns:
-            Heap: priority queue containing HuffmanNode objects within a min
-                heap
+            Dict[str, int]: frequency per character, in file order
 
         Raises:
             ValueError: character key is not a single, unique alphabetical
                 character or frequency value is not an integer >= 1
         """
-        nodes_pq = Heap()
-        has_memo = self.has_memo()
-        unique_chars = set()
+        frequencies = {}
         with open(self._frequency_table, 'r', encoding="utf-8") as freq_table:
             for line in freq_table:
                 # Get character and frequency values
@@ -109,41 +145,87 @@ class HuffmanTree:
                     # Error case: frequency is not a number
                     print(ve.args[0], file=stderr)
 
-                if frequency < 1:
-                    # Error case: cannot have negative frequency
-                    error = "INVALID FREQUENCY: must be > 0"
-                    raise ValueError(error)
-
-                if character in unique_chars:
+                if character in frequencies:
                     # Case: repeat characters in file
                     error = f"INVALID CHAR: {character} has already been added"
                     raise ValueError(error)
 
-                if len(character) != 1:
-                    # Error case: key is not a single character
-                    error = "INVALID CHAR: key must be a single character"
-                    raise ValueError(error)
+                self._validate_entry(character, frequency)
+                frequencies[character] = frequency
 
-                if not character.isalpha():
-                    # Error case: character must be alphabetical
-                    error = "INVALID CHAR: key must be alphabetical"
-                    raise ValueError(error)
+        return frequencies
+
+    def _validate_entry(self, character: str, frequency: int) -> None:
+        """
+        Helper method for error checking a single character - frequency pair.
+
+        Args:
+            character (str): lowercase character key
+            frequency (int): number of occurrences of the character
+
+        Raises:
+            ValueError: character key is not a single alphabetical character or
+                frequency value is not an integer >= 1
+        """
+        if frequency < 1:
+            # Error case: cannot have negative frequency
+            error = "INVALID FREQUENCY: must be > 0"
+            raise ValueError(error)
+
+        if len(character) != 1:
+            # Error case: key is not a single character
+            error = "INVALID CHAR: key must be a single character"
+            raise ValueError(error)
+
+        if not character.isalpha():
+            # Error case: character must be alphabetical
+            error = "INVALID CHAR: key must be alphabetical"
+            raise ValueError(error)
 
-                # Build new leaf node for the character and its frequency
-                new_node = HuffmanNode().set_characters(
-                    character).set_frequency(frequency)
+    def _prepare_leaf_nodes(self) -> 'Heap':
+        """
+        Helper method for building the priority queue containing all leaf 
+        nodes from the stored character - frequency pairs. If memoization is
+        activated for current instance, also places references to each leaf
+        node in a memo list index corresponding to its character's position in
+        the Latin (English) alphabet.
+
+        Returns:
+            Heap: priority queue containing HuffmanNode objects within a min
+                heap
+        """
+        nodes_pq = Heap(key=self._node_key)
+        has_memo = self.has_memo()
 
-                # Add new node to priority queue. Account for memoization
-                nodes_pq.heap_push(new_node)
-                if has_memo:
-                    index = ord(character) - ord('a')
-                    self._memo[index] = new_node
+        for character, frequency in self._frequencies.items():
+            # Build new leaf node for the character and its frequency
+            new_node = HuffmanNode().set_characters(
+                character).set_frequency(frequency)
 
-                # Add character to set for error checking
-                unique_chars.add(character)
+            # Add new node to priority queue. Account for memoization
+            nodes_pq.heap_push(new_node)
+            if has_memo:
+                index = ord(character) - ord('a')
+                self._memo[index] = new_node
 
         return nodes_pq
 
+    @staticmethod
+    def _node_key(node: 'HuffmanNode') -> Tuple[int, bool]:
+        """
+        Helper function returning the value a node is ordered by in the
+        priority queue. Ordering these tuples matches HuffmanNode's less-than
+        comparison: frequency first, then multiple letter groups before single
+        letters, while avoiding its method calls.
+
+        Args:
+            node (HuffmanNode): node being added to the priority queue
+
+        Returns:
+            Tuple[int, bool]: frequency and whether node holds a single letter
+        """
+        return node.get_frequency(), len(node.get_characters()) == 1
+
     def _build_tree(self) -> 'HuffmanNode':
         """
         Encodes characters and their frequencies as HuffmanNodes in a binary
@@ -152,7 +234,9 @@ class HuffmanTree:
         Returns:
             'HuffmanNode': root of new Huffman Tree
         """
-        # Set up a priority queue with all leaf nodes
+        # Set up a priority queue with all leaf nodes. Nodes are pushed one
+        # at a time into a binary heap, and merged nodes are pushed after both
+        # pops, as ties between equal keys are broken by position in the heap
         nodes_pq = self._prepare_leaf_nodes()
 
         # Combine nodes into left-right pairs under a new parent
@@ -177,38 +261,70 @@ class HuffmanTree:
 
     def set_codes(self) -> 'HuffmanTree':
         """
-        Method for adding binary codes to Huffman tree nodes.
+        Method for adding binary codes to Huffman tree nodes. Codes are built
+        as integers, then rendered once per leaf into the code table.
 
         Returns:
             HuffmanTree: current HuffmanTree object instance
         """
+        code_table = {}
 
-        def preorder(node: Optional['HuffmanNode'], prefix="") -> None:
+        def preorder(node: Optional['HuffmanNode'], value=0, length=0) \
+                -> None:
             """
             Helper function for preorder traversal of Huffman Tree to update
             each node's binary Huffman code. Each left child has a 0 appended,
-            and each right has a 1 appended to its parent node's code (prefix).
+            and each right has a 1 appended to its parent node's code, held as
+            an integer value and bit length.
 
             Args:
                 node (HuffmanNode): current node being visited
-                prefix (str): parent node's Huffman code
+                value (int): parent node's Huffman code as an integer
+                length (int): number of bits in parent node's Huffman code
             """
             if not node:
                 return
 
             if node.is_leaf():
-                node.set_code(prefix)
+                node.set_code_bits(value, length)
+                code_table[node.get_characters()] = node.get_code()
             else:
-                preorder(node.get_left(), prefix + "0")
-                preorder(node.get_right(), prefix + "1")
+                preorder(node.get_left(), value << 1, length + 1)
+                preorder(node.get_right(), (value << 1) | 1, length + 1)
 
             return
 
-        root = self._root
+        root = self.get_root()
         preorder(root)
+        self._code_table = code_table
+        self._stats = None
 
         return self
 
+    def get_code_table(self) -> Dict[str, str]:
+        """
+        Getter method for retrieving each leaf character's binary Huffman code.
+        Codes are set if they have not been since the tree was last built.
+
+        Returns:
+            Dict[str, str]: binary Huffman code per character
+        """
+        if self._dirty or (self._code_table is None):
+            self.set_codes()
+
+        return self._code_table
+
+    def get_code_lengths(self) -> Dict[str, int]:
+        """
+        Getter method for retrieving the length of each leaf character's
+        binary Huffman code.
+
+        Returns:
+            Dict[str, int]: number of bits in the Huffman code per character
+        """
+        return {char: len(code)
+                for char, code in self.get_code_table().items()}
+
     def print_codes(self) -> str:
         """
         Method for representing Huffman Encoding binary codes for all Huffman 
@@ -242,7 +358,90 @@ class HuffmanTree:
             # Case: without memoization toggled on, no codes are set to print
             self.set_codes()
 
-        return ', '.join(preorder(self._root))
+        return ', '.join(preorder(self.get_root()))
+
+    def get_leaf_depths(self) -> List[Tuple['HuffmanNode', int]]:
+        """
+        Method for retrieving every leaf node along with its depth in the
+        Huffman Tree. A leaf's depth is the length of its binary Huffman code,
+        so codes do not need to be set beforehand.
+
+        Returns:
+            List[Tuple[HuffmanNode, int]]: preorder list of leaf nodes and
+                their depths
+        """
+        def preorder(root: Optional['HuffmanNode'], depth=0) \
+                -> List[Tuple['HuffmanNode', int]]:
+            rep = []
+
+            if not root:
+                return rep
+
+            if root.is_leaf():
+                rep.append((root, depth))
+                return rep
+
+            rep.extend(preorder(root.get_left(), depth + 1))
+            rep.extend(preorder(root.get_right(), depth + 1))
+
+            return rep
+
+        return preorder(self.get_root())
+
+    def get_stats(self) -> 'TreeStats':
+        """
+        Method for retrieving the Huffman Tree's statistics: depth, node
+        counts, code lengths, weighted path length, entropy, and memory
+        estimate. They are gathered in one traversal on first request, then
+        cached until the tree is rebuilt or its codes are set.
+
+        Returns:
+            TreeStats: statistics of the current tree
+        """
+        root = self.get_root()
+
+        if self._stats is None:
+            extra_bytes = getsizeof(self._memo)
+            if self._code_table is not None:
+                extra_bytes += getsizeof(self._code_table) + sum(
+                    getsizeof(code) for code in self._code_table.values())
+
+            self._stats = TreeStats.from_root(root, extra_bytes)
+
+        return self._stats
+
+    def get_entropy(self) -> float:
+        """
+        Method for calculating the Shannon entropy of the frequency table, the
+        theoretical minimum average number of bits per symbol for any prefix
+        code built from it.
+
+        Returns:
+            float: entropy in bits per symbol
+        """
+        return self.get_stats().get_entropy()
+
+    def get_average_code_length(self) -> float:
+        """
+        Method for calculating the average Huffman code length, weighted by
+        each character's frequency in the frequency table.
+
+        Returns:
+            float: average code length in bits per symbol
+        """
+        return self.get_stats().get_average_code_length()
+
+    def get_memory_estimate(self) -> int:
+        """
+        Method for estimating the memory held by the Huffman Tree: every node,
+        its attributes, its characters and codes, and the memo list.
+        Shared objects such as interned strings are counted once per node, so
+        the estimate errs on the high side.
+
+        Returns:
+            int: estimated footprint in bytes
+        """
+        return self.get_stats().get_memory_estimate()
 
     def get_root(self) -> 'HuffmanNode':
         """
@@ -251,6 +450,8 @@ class HuffmanTree:
         Returns:
             HuffmanNode: the root node
         """
+        if self._dirty:
+            self.rebuild()
         return self._root
 
     def has_memo(self) -> bool:
@@ -276,4 +477,126 @@ class HuffmanTree:
                 current instance of HuffmanTree OR None if this instance does
                 not utilize memoization
         """
+        if self._dirty:
+            self.rebuild()
         return self._memo
+
+    def get_frequencies(self) -> Dict[str, int]:
+        """
+        Getter method for retrieving a copy of the character - frequency pairs
+        the Huffman Tree is built from, including pending updates.
+
+        Returns:
+            Dict[str, int]: frequency per character
+        """
+        return dict(self._frequencies)
+
+    def update(self, deltas: Dict[str, int]) -> 'HuffmanTree':
+        """
+        Method for adjusting character frequencies in memory. Characters not
+        yet in the tree are added with the delta as their frequency. The tree
+        and its codes are rebuilt lazily on next use, so any number of updates
+        before then cost a single rebuild. Case insensitive.
+
+        Args:
+            deltas (Dict[str, int]): amount added to each character's frequency
+
+        Returns:
+            HuffmanTree: current HuffmanTree object instance
+
+        Raises:
+            ValueError: character key is not a single alphabetical character,
+                delta is not an integer, or a new frequency is not >= 1. No
+                updates are applied
+        """
+        updated = {}
+        for character, delta in deltas.items():
+            if not isinstance(delta, int):
+                raise ValueError("Frequency must be an integer")
+
+            character = character.lower()
+            frequency = updated.get(
+                character, self._frequencies.get(character, 0)) + delta
+            self._validate_entry(character, frequency)
+            updated[character] = frequency
+
+        return self._apply_frequencies(updated)
+
+    def set_frequencies(self, frequencies: Dict[str, int]) -> 'HuffmanTree':
+        """
+        Method for setting character frequencies in memory, replacing any
+        previous frequency for those characters. The tree and its codes are
+        rebuilt lazily on next use. Case insensitive.
+
+        Args:
+            frequencies (Dict[str, int]): new frequency per character
+
+        Returns:
+            HuffmanTree: current HuffmanTree object instance
+
+        Raises:
+            ValueError: character key is not a single alphabetical character or
+                frequency value is not an integer >= 1. No updates are applied
+        """
+        updated = {}
+        for character, frequency in frequencies.items():
+            if not isinstance(frequency, int):
+                raise ValueError("Frequency must be an integer")
+
+            character = character.lower()
+            self._validate_entry(character, frequency)
+            updated[character] = frequency
+
+        return self._apply_frequencies(updated)
+
+    def is_dirty(self) -> bool:
+        """
+        Indicates whether frequencies have been updated since the Huffman Tree
+        was last built.
+
+        Returns:
+            bool: True if a rebuild is pending, otherwise False
+        """
+        return self._dirty
+
+    def rebuild(self) -> 'HuffmanTree':
+        """
+        Method for rebuilding the Huffman Tree, and its codes if memoized,
+        from the current character - frequency pairs. Called automatically on
+        next use after frequencies are updated.
+
+        Returns:
+            HuffmanTree: current HuffmanTree object instance
+        """
+        has_memo = self.has_memo()
+        if has_memo:
+            self._memo = [None for _ in range(len(self._memo))]
+
+        # Clear dirty flag first, as setting codes retrieves the new root
+        self._dirty = False
+        self._code_table = None
+        self._stats = None
+        self._root = self._build_tree()
+
+        if has_memo:
+            self.set_codes()
+
+        return self
+
+    def _apply_frequencies(self, frequencies: Dict[str, int]) \
+            -> 'HuffmanTree':
+        """
+        Helper method for storing validated frequencies and marking the tree
+        for a lazy rebuild.
+
+        Args:
+            frequencies (Dict[str, int]): validated frequency per character
+
+        Returns:
+            HuffmanTree: current HuffmanTree object instance
+        """
+        if frequencies:
+            self._frequencies.update(frequencies)
+            self._dirty = True
+
+        return self
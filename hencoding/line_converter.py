@@ -0,0 +1,286 @@
+"""
+line_converter
+
+This module contains a class for converting input lines one at a time while
+logging their performance. It holds what the file runner (run) and the
+stream runner (stream) share: choosing the encoder, sampling, timing,
+compression metrics, error counting, and the per-line metrics shown next to
+each result.
+"""
+from typing import Callable, Optional, Tuple
+from hencoding.huffman_tree import HuffmanTree
+from hencoding.huffman_encoding import HuffmanEncoding
+from hencoding.engines import EngineEncoding
+from support.performance import Performance
+from support.output_formatters import format_projected_size
+from support.format_performance_report import format_engine_report
+
+
+def selects_engine(engine: Optional[str], encode=False, dry_run=False) \
+        -> bool:
+    """
+    Function that decides whether lines are encoded by a chosen engine.
+    Engines only differ when encoding. Decoding always walks the tree
+
+    Args:
+        engine (str): engine name, 'auto', OR None to follow memo
+        encode (bool): True if lines are encoded, otherwise False
+        dry_run (bool): True if encoded sizes are only projected
+
+    Returns:
+        bool: True if lines are encoded with an EngineEncoding
+    """
+    return bool(engine) and encode and not dry_run
+
+
+def make_encoding(huffman_tree: 'HuffmanTree', encode=False, dry_run=False,
+                  engine: Optional[str] = None) -> 'HuffmanEncoding':
+    """
+    Function that builds the in-process encoder for a Huffman Tree: an
+    EngineEncoding if an engine applies, otherwise a HuffmanEncoding
+
+    Args:
+        huffman_tree (HuffmanTree): tree used for conversions
+        encode (bool): True if lines are encoded, otherwise False
+        dry_run (bool): True if encoded sizes are only projected
+        engine (str): engine name, 'auto', OR None to follow memo
+
+    Returns:
+        HuffmanEncoding: encoder for the tree
+
+    Raises:
+        ValueError: if the engine name is unknown
+    """
+    if selects_engine(engine, encode, dry_run):
+        return EngineEncoding(huffman_tree, engine=engine)
+    return HuffmanEncoding(huffman_tree)
+
+
+class LineConverter:
+    """
+    Class for encoding, decoding, or projecting the encoded size of lines
+    with one encoder, and logging each line in a shared Performance. Lines
+    outside the Performance's sample are only counted: they get no timer and
+    no compression metrics. This implementation allows for method chaining.
+    """
+
+    def __init__(self, huffman_encoding: 'HuffmanEncoding',
+                 performance: 'Performance', encode=False, dry_run=False,
+                 engine: Optional[str] = None) -> 'LineConverter':
+        """
+        Args:
+            huffman_encoding (HuffmanEncoding): encoder used for conversions,
+                as returned by make_encoding or wrapping it
+            performance (Performance): metrics each line is logged in
+            encode (bool): True if encoding lines, otherwise decoding them
+            dry_run (bool): True if projecting encoded sizes without
+                encoding. Requires encode
+            engine (str): engine name given to make_encoding OR None
+        """
+        self._encoding = huffman_encoding
+        self._performance = performance
+        self._encode = encode
+        self._dry_run = dry_run
+        self._engine = engine if selects_engine(engine, encode, dry_run) \
+            else None
+
+        # State of the current (or last) line
+        self._size = 0
+        self._sampled = False
+        self._timing = False
+        self._error = False
+
+    def get_encoding(self) -> 'HuffmanEncoding':
+        """
+        Getter method for the encoder used for conversions
+
+        Returns:
+            HuffmanEncoding: encoder
+        """
+        return self._encoding
+
+    def is_sampled(self) -> bool:
+        """
+        Getter method for whether the current line is timed and logged
+
+        Returns:
+            bool: True if sampled, otherwise False
+        """
+        return self._sampled
+
+    def begin(self, size=0) -> 'LineConverter':
+        """
+        Method for starting a line: decides whether it is sampled and, if so,
+        starts the timer
+
+        Args:
+            size (int): number of characters in the line. May instead be
+                given to end when the line is read piece by piece
+
+        Returns:
+            LineConverter: current instance of the converter
+        """
+        self._size = size
+        self._error = False
+        self._sampled = self._performance.sample()
+        self._timing = self._sampled
+
+        if self._sampled:
+            self._performance.set_size(size).start()
+
+        return self
+
+    def stop(self) -> 'LineConverter':
+        """
+        Method for stopping the timer of a sampled line, so that work done
+        after its conversion, such as counting its compression, is not part
+        of its runtime. Called by end if not called before
+
+        Returns:
+            LineConverter: current instance of the converter
+        """
+        if self._timing:
+            self._performance.stop()
+            self._timing = False
+
+        return self
+
+    def end(self, error=False, symbols=0, bits=0,
+            size: Optional[int] = None) -> 'LineConverter':
+        """
+        Method for ending a line: logs it as a success or an error if
+        sampled, otherwise only counts it
+
+        Args:
+            error (bool): True if the line raised an error, otherwise False
+            symbols (int): number of symbols converted. Ignored on error
+            bits (int): number of binary bits converted. Ignored on error
+            size (int): number of characters in the line OR None to keep
+                the size given to begin
+
+        Returns:
+            LineConverter: current instance of the converter
+        """
+        performance = self._performance
+        self._error = error
+
+        if size is not None:
+            self._size = size
+            if self._sampled:
+                performance.set_size(size)
+
+        if not self._sampled:
+            if error:
+                performance.count_error()
+            else:
+                performance.count_success()
+            return self
+
+        self.stop()
+        if not error:
+            performance.set_compression(symbols, bits)
+
+        if error:
+            performance.log_error(micro_sec=True)
+        else:
+            performance.log_success(micro_sec=True)
+
+        return self
+
+    def convert(self, expression: str,
+                decoder: Optional[Callable[[], str]] = None) \
+            -> Tuple[str, bool]:
+        """
+        Method for converting and logging one stripped, non-empty line. In a
+        dry run, the result describes the projected encoded size
+
+        Args:
+            expression (str): line being converted
+            decoder (Callable[[], str]): function decoding the line in place
+                of decoding expression, such as from a memory map, OR None
+
+        Returns:
+            str: converted line OR error message
+            bool: True if the result is an error message, otherwise False
+        """
+        encoding = self._encoding
+        symbols = bits = 0
+        self.begin(len(expression))
+
+        try:
+            if self._dry_run:
+                bits = encoding.estimate_bits(expression)
+            elif self._encode:
+                result = encoding.encode(expression)
+            else:
+                result = decoder() if decoder is not None else \
+                    encoding.decode(expression)
+        except ValueError as ve:
+            self.end(error=True)
+            return ve.args[0], True
+
+        # Runtimes only cover the conversion, not the counting below
+        self.stop()
+
+        if self._dry_run:
+            result = format_projected_size(bits, len(expression))
+            if self._sampled:
+                symbols = encoding.count_symbols(expression)
+        elif self._sampled:
+            symbols, bits = self.count_compression(expression, result)
+
+        self.end(symbols=symbols, bits=bits)
+        return result, False
+
+    def count_compression(self, expression: str, result: str) \
+            -> Tuple[int, int]:
+        """
+        Method for counting the symbols and binary bits of a converted line
+        or piece of a line
+
+        Args:
+            expression (str): line or piece converted
+            result (str): its encoded or decoded result
+
+        Returns:
+            int: number of symbols
+            int: number of binary bits
+        """
+        if self._encode:
+            return self._encoding.count_symbols(expression), len(result)
+        return len(result), len(''.join(expression.split()))
+
+    def get_metrics(self) -> str:
+        """
+        Method for formatting the metrics of the last line: size and runtime,
+        compression if sampled and successful, and engine if one was chosen
+
+        Returns:
+            str: metrics of the last line
+        """
+        if self._sampled:
+            metrics = self._performance.get_metrics_micro_sec()
+            if not self._error:
+                metrics += '\n' + self._performance.get_compression_metrics()
+        else:
+            metrics = f"Size: {self._size}, Runtime: not sampled"
+
+        if (self._engine is not None) and not self._error:
+            metrics += f"\nEngine: {self._encoding.get_last_engine()}"
+
+        return metrics
+
+    def get_engine_report(self) -> Optional[str]:
+        """
+        Method for formatting how many lines and characters each engine
+        encoded, if an engine was chosen
+
+        Returns:
+            str: engine report OR None
+        """
+        if self._engine is None:
+            return None
+
+        return format_engine_report(self._engine,
+                                    self._encoding.get_engine_usage(),
+                                    self._encoding.get_thresholds())
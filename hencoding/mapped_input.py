@@ -0,0 +1,214 @@
+"""
+mapped_input
+
+This module contains a class for reading encoded files through a read-only
+memory map, so that very large encoded files can be decoded without reading
+them into memory. Line boundaries are found with the memory map's C-level
+search, and each line is decoded in place from the mapped bytes. Both binary
+strings written as text (b'0' / b'1') and packed files written by
+packed_bits.write_packed_file are supported.
+"""
+import mmap
+from typing import Iterator, Optional, TextIO, Tuple
+from hencoding.huffman_encoding import HuffmanEncoding, WHITESPACE_BYTES
+from hencoding.packed_bits import PACKED_HEADER, PACKED_HEADER_SIZE
+
+
+class MappedEncodedFile:
+    """
+    Class for decoding an encoded file through a read-only memory map. Meant
+    to be used as a context manager, which closes the map and file on exit.
+    """
+
+    def __init__(self, encoded_file: TextIO, packed=False) \
+            -> 'MappedEncodedFile':
+        """
+        Opens and memory maps an encoded file
+
+        Args:
+            encoded_file (TextIO): encoded file pathname
+            packed (bool): True if the file holds packed bits, otherwise False
+                for binary strings written as text lines
+
+        Raises:
+            ValueError: if a packed file is too short to hold its header
+        """
+        self._packed = packed
+        self._file = open(encoded_file, 'rb')
+        self._map: Optional[mmap.mmap] = None
+
+        # Empty files cannot be memory mapped. They hold no lines to decode
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        except ValueError:
+            self._map = None
+
+        if packed and self.size() < PACKED_HEADER_SIZE:
+            self.close()
+            raise ValueError("INVALID PACKED FILE: missing header")
+
+    def __enter__(self) -> 'MappedEncodedFile':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes the memory map and the underlying file
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+        self._file.close()
+
+    def size(self) -> int:
+        """
+        Method that returns the number of mapped bytes
+
+        Returns:
+            int: size of the encoded file in bytes
+        """
+        return len(self._map) if self._map is not None else 0
+
+    def iter_line_spans(self) -> Iterator[Tuple[int, int]]:
+        """
+        Generator for the byte offsets of each non-empty line in a text
+        encoded file, with surrounding whitespace excluded as by str.strip.
+        Newlines are located with the memory map's find, which scans in C.
+
+        Yields:
+            Tuple[int, int]: start (inclusive) and end (exclusive) offsets
+        """
+        mapped = self._map
+        if mapped is None or self._packed:
+            return
+
+        size = len(mapped)
+        position = 0
+
+        while position < size:
+            newline = mapped.find(b"\n", position)
+            end = size if newline == -1 else newline
+            start = position
+            position = end + 1
+
+            # Strip surrounding whitespace without copying the line
+            while (start < end) and (mapped[start] in WHITESPACE_BYTES):
+                start += 1
+            while (end > start) and (mapped[end - 1] in WHITESPACE_BYTES):
+                end -= 1
+
+            if (start < end) and ((mapped[start] > 0x7f) or
+                                  (mapped[end - 1] > 0x7f)):
+                start, end = self._strip_text(start, end)
+
+            if start < end:
+                yield start, end
+
+    def _strip_text(self, start: int, end: int) -> Tuple[int, int]:
+        """
+        Helper method for stripping a span that starts or ends with a
+        non-ASCII character, such as Unicode whitespace, as str.strip would
+
+        Args:
+            start (int): offset of the first byte (inclusive)
+            end (int): offset after the last byte (exclusive)
+
+        Returns:
+            Tuple[int, int]: offsets of the stripped span
+        """
+        # surrogateescape keeps every byte, so stripped lengths map back
+        text = self._map[start:end].decode("utf-8", errors="surrogateescape")
+        stripped = text.lstrip()
+        start += len(text[:len(text) - len(stripped)].encode(
+            "utf-8", errors="surrogateescape"))
+        end -= len(stripped[len(stripped.rstrip()):].encode(
+            "utf-8", errors="surrogateescape"))
+
+        return start, max(start, end)
+
+    def get_text(self, start: int, end: int) -> str:
+        """
+        Method that copies a span of a text encoded file out as a string,
+        such as for displaying a line next to its result
+
+        Args:
+            start (int): offset of the first byte (inclusive)
+            end (int): offset after the last byte (exclusive)
+
+        Returns:
+            str: text of the span
+        """
+        if self._map is None:
+            return ""
+
+        return self._map[start:end].decode("utf-8", errors="replace")
+
+    def decode_span(self, huffman_encoding: 'HuffmanEncoding', start: int,
+                    end: int) -> str:
+        """
+        Method that decodes a span of a text encoded file, as given by
+        iter_line_spans, directly from the mapped bytes
+
+        Args:
+            huffman_encoding (HuffmanEncoding): encoder built on the Huffman
+                Tree the file was encoded with
+            start (int): offset of the first byte (inclusive)
+            end (int): offset after the last byte (exclusive)
+
+        Returns:
+            str: decoded span
+
+        Raises:
+            ValueError: if the span is not a valid encoded string
+        """
+        if self._map is None:
+            return ""
+
+        # Release the slice before returning so the map can close
+        with memoryview(self._map) as view, view[start:end] as line:
+            return huffman_encoding.decode_bytes(line)
+
+    def decode_lines(self, huffman_encoding: 'HuffmanEncoding') \
+            -> Iterator[Tuple[str, bool]]:
+        """
+        Generator that decodes each non-empty line of a text encoded file, or
+        the single bitstream of a packed file, directly from the mapped bytes.
+        Errors do not stop decoding of the following lines.
+
+        Args:
+            huffman_encoding (HuffmanEncoding): encoder built on the Huffman
+                Tree the file was encoded with
+
+        Yields:
+            str: decoded line OR error message
+            bool: True if the result is an error message, otherwise False
+        """
+        if self._map is None:
+            return
+
+        with memoryview(self._map) as view:
+            if self._packed:
+                bit_length, = PACKED_HEADER.unpack_from(view)
+                spans = [(PACKED_HEADER_SIZE, len(view))]
+            else:
+                spans = self.iter_line_spans()
+
+            for start, end in spans:
+                # Release each slice before yielding so the map can close
+                with view[start:end] as line:
+                    try:
+                        if self._packed:
+                            result = huffman_encoding.decode_packed(
+                                line, bit_length)
+                        else:
+                            result = huffman_encoding.decode_bytes(line)
+                        error = False
+                    except ValueError as ve:
+                        result = ve.args[0]
+                        error = True
+
+                yield result, error
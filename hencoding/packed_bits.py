@@ -0,0 +1,133 @@
+"""
+packed_bits
+
+This module contains helper functions for converting between binary strings
+made of 1s and 0s, as returned by Huffman encoding, and packed bits, where
+each byte holds 8 bits, most significant bit first. The final byte is padded
+with 0s, so the number of bits must be stored alongside the bytes. Packed
+files store it in a fixed-size header before the packed bytes.
+"""
+from struct import Struct
+from typing import TextIO, Tuple
+
+# Header of a packed file: number of bits as an unsigned 64-bit big-endian int
+PACKED_HEADER = Struct(">Q")
+PACKED_HEADER_SIZE = PACKED_HEADER.size
+
+
+def pack_bits(encoded_string: str) -> Tuple[bytes, int]:
+    """
+    Function that packs a binary string into bytes, 8 bits per byte.
+
+    Args:
+        encoded_string (str): binary string made entirely of 1s and 0s
+
+    Returns:
+        bytes: packed bits, with the final byte padded with 0s
+        int: number of bits packed
+
+    Raises:
+        ValueError: if a character is not a 0 or 1
+    """
+    bit_length = len(encoded_string)
+    if bit_length == 0:
+        return b"", 0
+
+    num_bytes = (bit_length + 7) // 8
+    padded = encoded_string.ljust(num_bytes * 8, '0')
+
+    try:
+        packed = int(padded, 2).to_bytes(num_bytes, "big")
+    except ValueError as ve:
+        raise ValueError("INVALID BINARY: must contain only 1s and 0s") \
+            from ve
+
+    return packed, bit_length
+
+
+def unpack_bits(packed: bytes, bit_length: int) -> str:
+    """
+    Function that unpacks bytes into a binary string, dropping padding bits.
+
+    Args:
+        packed (bytes): packed bits, most significant bit first
+        bit_length (int): number of bits to unpack
+
+    Returns:
+        str: binary string made entirely of 1s and 0s
+
+    Raises:
+        ValueError: if bit_length exceeds the number of packed bits
+    """
+    if bit_length > len(packed) * 8:
+        raise ValueError("INVALID LENGTH: more bits than were packed")
+
+    if bit_length == 0:
+        return ""
+
+    bits = format(int.from_bytes(packed, "big"), f"0{len(packed) * 8}b")
+    return bits[:bit_length]
+
+
+def write_packed_file(output_file: TextIO, encoded_string: str) -> int:
+    """
+    Function that writes a binary string to a packed file: the header with
+    the number of bits, followed by the packed bytes.
+
+    Args:
+        output_file (TextIO): file to which the packed bits are written
+        encoded_string (str): binary string made entirely of 1s and 0s
+
+    Returns:
+        int: number of bytes written
+    """
+    return write_packed_bytes(output_file, *pack_bits(encoded_string))
+
+
+def write_packed_bytes(output_file: TextIO, packed: bytes,
+                       bit_length: int) -> int:
+    """
+    Function that writes already packed bits to a packed file: the header
+    with the number of bits, followed by the packed bytes.
+
+    Args:
+        output_file (TextIO): file to which the packed bits are written
+        packed (bytes): packed bits, most significant bit first
+        bit_length (int): number of bits packed
+
+    Returns:
+        int: number of bytes written
+    """
+    with open(output_file, 'wb') as output:
+        output.write(PACKED_HEADER.pack(bit_length))
+        output.write(packed)
+
+    return PACKED_HEADER_SIZE + len(packed)
+
+
+def read_packed_file(input_file: TextIO) -> Tuple[bytes, int]:
+    """
+    Function that reads a packed file written by write_packed_file
+
+    Args:
+        input_file (TextIO): packed file pathname
+
+    Returns:
+        bytes: packed bits
+        int: number of bits packed
+
+    Raises:
+        ValueError: if the file is too short to hold its header or its bits
+    """
+    with open(input_file, 'rb') as file:
+        data = file.read()
+
+    if len(data) < PACKED_HEADER_SIZE:
+        raise ValueError("INVALID PACKED FILE: missing header")
+
+    bit_length, = PACKED_HEADER.unpack_from(data)
+    packed = data[PACKED_HEADER_SIZE:]
+    if bit_length > len(packed) * 8:
+        raise ValueError("INVALID LENGTH: more bits than were packed")
+
+    return packed, bit_length
@@ -0,0 +1,346 @@
+"""
+parallel
+
+This module contains a class for Huffman Encoding that splits very long lines
+into chunks and converts the chunks across a pool of worker processes. Each
+worker rebuilds the same Huffman Tree from the frequencies, so only the
+frequencies and the chunks are sent between processes. Results are joined in
+order and match the serial output exactly, including error messages.
+
+Encoding is character by character, so expressions may be cut anywhere.
+Decoding restarts at the root after every whitespace, so encoded strings are
+only cut at whitespace. Lines shorter than the chunk size, and encoded strings
+without whitespace to cut at, are converted serially in-process.
+
+Optionally, bitstreams without whitespace are decoded speculatively instead:
+each chunk is decoded from its first bit as if a code started there. Huffman
+codes usually resynchronize within a few codes of a wrong start, so a fix-up
+pass re-decodes each chunk only from its true start up to the first code
+boundary shared with the speculative decode, and keeps the rest.
+"""
+import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from hencoding.huffman_tree import HuffmanTree
+from hencoding.huffman_node import HuffmanNode
+from hencoding.huffman_encoding import HuffmanEncoding
+
+# Number of characters per chunk. Lines up to this length are not split
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+WHITESPACE = re.compile(r"\s")
+NON_BINARY = re.compile(r"[^01]")
+
+# Encoder rebuilt once per worker process by _init_worker
+_worker_encoding: Optional['HuffmanEncoding'] = None
+
+
+def _init_worker(frequencies: Dict[str, int], memo: bool,
+                 allowed_nonalpha_chars: set) -> None:
+    """
+    Worker process initializer that rebuilds the Huffman Tree and encoder.
+
+    Args:
+        frequencies (Dict[str, int]): frequency per character
+        memo (bool): True if memoizing HuffmanTree nodes, otherwise False
+        allowed_nonalpha_chars (set): permitted punctuation symbols
+    """
+    global _worker_encoding
+    huffman_tree = HuffmanTree.from_frequencies(frequencies, memo=memo)
+    _worker_encoding = HuffmanEncoding(huffman_tree, allowed_nonalpha_chars)
+
+
+def _encode_chunk(chunk: str) -> str:
+    """
+    Worker function for encoding a chunk of an expression
+    """
+    return _worker_encoding.encode(chunk)
+
+
+def _decode_chunk(chunk: str) -> str:
+    """
+    Worker function for decoding a chunk of an encoded string
+    """
+    return _worker_encoding.decode(chunk)
+
+
+def _speculate_chunk(chunk: str, chunk_length: int) \
+        -> Tuple[str, 'array', int]:
+    """
+    Worker function for speculatively decoding a chunk of a bitstream as if a
+    code starts at its first bit. The chunk carries extra bits after
+    chunk_length so the code crossing the chunk's end can be completed.
+
+    Args:
+        chunk (str): bits of the chunk followed by the overlapping bits
+        chunk_length (int): number of bits in the chunk itself
+
+    Returns:
+        str: decoded characters
+        array: position of the first bit of each decoded character
+        int: position after the last decoded character
+    """
+    root = _worker_encoding.get_tree().get_root()
+    symbols, starts, position, _ = _decode_span(root, chunk, 0, chunk_length)
+    return ''.join(symbols), array('Q', starts), position
+
+
+def _decode_span(root: 'HuffmanNode', bits: str, start: int, end: int,
+                 sync: Optional[Dict[int, int]] = None) \
+        -> Tuple[List[str], List[int], int, bool]:
+    """
+    Helper function for decoding a bitstream from start until the first code
+    boundary at or after end, the end of the bits, or the first boundary
+    found in sync.
+
+    Args:
+        root (HuffmanNode): root of the Huffman Tree
+        bits (str): binary string made entirely of 1s and 0s
+        start (int): position of the first bit of a code
+        end (int): position at which to stop once a code is completed
+        sync (Dict[int, int]): code boundaries at which to stop OR None
+
+    Returns:
+        List[str]: decoded characters
+        List[int]: position of the first bit of each decoded character
+        int: position after the last decoded character
+        bool: True if decoding stopped at a boundary in sync
+    """
+    symbols = []
+    starts = []
+    node = root
+    code_start = start
+
+    for position in range(start, len(bits)):
+        if code_start >= end:
+            break
+
+        if bits[position] == '0':
+            node = node.get_left()
+        else:
+            node = node.get_right()
+
+        if node.is_leaf():
+            symbols.append(node.get_characters())
+            starts.append(code_start)
+            code_start = position + 1
+            node = root
+
+            if (sync is not None) and (code_start in sync):
+                return symbols, starts, code_start, True
+
+    return symbols, starts, code_start, False
+
+
+class ParallelHuffmanEncoding(HuffmanEncoding):
+    """
+    Class for encoding and decoding long lines in parallel chunks. The worker
+    pool is started on first use and reflects the Huffman Tree at that time.
+    Meant to be used as a context manager, which shuts the pool down on exit.
+    """
+
+    def __init__(self, huffman_tree: 'HuffmanTree',
+                 allowed_nonalpha_chars=None, max_workers: Optional[int] = None,
+                 chunk_size=DEFAULT_CHUNK_SIZE, speculative=False) \
+            -> 'ParallelHuffmanEncoding':
+        """
+        Args:
+            huffman_tree (HuffmanTree): Huffman Tree used for conversions
+            allowed_nonalpha_chars (set): permitted punctuation symbols OR None
+                for the default
+            max_workers (int): number of worker processes OR None for the
+                number of CPUs
+            chunk_size (int): number of characters per chunk. Must be >= 1
+            speculative (bool): True if decoding bitstreams without whitespace
+                in speculative chunks, otherwise False
+
+        Raises:
+            ValueError: when chunk_size is not a positive integer
+        """
+        super().__init__(huffman_tree, allowed_nonalpha_chars)
+
+        if chunk_size < 1:
+            raise ValueError("There must be at least 1 character per chunk")
+
+        self._max_workers = max_workers
+        self._chunk_size = chunk_size
+        self._speculative = speculative
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> 'ParallelHuffmanEncoding':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Shuts down the worker pool, if started
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def encode(self, expression: str) -> str:
+        """
+        Method for encoding an expression string using the Huffman Tree. Long
+        expressions are encoded in parallel chunks.
+
+        Args:
+            expression (str): the string being encoded
+
+        Returns:
+            str: a new binary string made entirely of 1s and 0s
+
+        Raises:
+            ValueError: when a character has no corresponding Huffman code
+        """
+        if len(expression) <= self._chunk_size:
+            return super().encode(expression)
+
+        chunks = [expression[i:i + self._chunk_size]
+                  for i in range(0, len(expression), self._chunk_size)]
+
+        # Results, and the first error raised, come back in chunk order
+        return ''.join(self._get_pool().map(_encode_chunk, chunks))
+
+    def decode(self, encoded_string: str) -> str:
+        """
+        Decompresses a given compressed binary string using the Huffman Tree.
+        Long strings are decoded in parallel chunks cut at whitespace.
+
+        Args:
+            encoded_string (str): the compressed binary string
+
+        Returns:
+            str: the decompressed string
+
+        Raises:
+            ValueError: if a character (bit) is not a 0 or 1, or if bits are
+                left over at the end of a word
+        """
+        chunks = self._split_at_whitespace(encoded_string)
+        if len(chunks) > 1:
+            return ''.join(self._get_pool().map(_decode_chunk, chunks))
+
+        if self._speculative and (len(encoded_string) > self._chunk_size):
+            return self.decode_speculative(encoded_string)
+
+        return super().decode(encoded_string)
+
+    def decode_speculative(self, bits: str) -> str:
+        """
+        Decompresses a binary string without whitespace, as returned by
+        encode, in parallel chunks that each guess a code starts at their
+        first bit. A fix-up pass then follows the true code boundaries from
+        the start of the bitstream, re-decoding each chunk only until its true
+        boundaries line up with the guessed ones.
+
+        Args:
+            bits (str): the compressed binary string
+
+        Returns:
+            str: the decompressed string
+
+        Raises:
+            ValueError: if a character (bit) is not a 0 or 1, or if bits are
+                left over at the end
+        """
+        root = self._tree.get_root()
+        if (len(bits) <= self._chunk_size) or root.is_leaf() or \
+                (NON_BINARY.search(bits) is not None):
+            # Case: nothing to split, or errors reported exactly as serial
+            return super().decode(bits)
+
+        # Overlap lets each chunk complete the code crossing its end
+        overlap = self._tree.get_stats().get_depth() - 1
+        offsets = list(range(0, len(bits), self._chunk_size))
+        ends = offsets[1:] + [len(bits)]
+        chunks = [bits[start:end + overlap]
+                  for start, end in zip(offsets, ends)]
+        lengths = [end - start for start, end in zip(offsets, ends)]
+
+        results = self._get_pool().map(_speculate_chunk, chunks, lengths)
+
+        # Fix-up pass. true_start is the first true code boundary not yet
+        # decoded, which is at or after the current chunk's offset
+        pieces = []
+        true_start = 0
+        for offset, end, (symbols, starts, exit_position) in \
+                zip(offsets, ends, results):
+            if true_start >= end:
+                # Case: a previous code spans this whole chunk
+                continue
+
+            if true_start == offset:
+                # Case: the guess was right
+                pieces.append(symbols)
+                true_start = offset + exit_position
+                continue
+
+            # Re-decode until a true boundary matches a guessed boundary
+            sync = {offset + start: index
+                    for index, start in enumerate(starts)}
+            sync[offset + exit_position] = len(symbols)
+
+            fixed, _, position, synced = _decode_span(root, bits, true_start,
+                                                      end, sync)
+            pieces.append(''.join(fixed))
+
+            if synced:
+                pieces.append(symbols[sync[position]:])
+                true_start = offset + exit_position
+            else:
+                true_start = position
+
+        if true_start != len(bits):
+            # Error case: leftover bits in the encoded string
+            error = "INVALID BINARY: Leftover bits in the encoded string. "
+            error += "Cannot be converted."
+            raise ValueError(error)
+
+        return ''.join(pieces)
+
+    def _split_at_whitespace(self, encoded_string: str) -> List[str]:
+        """
+        Helper method for cutting an encoded string into chunks of at least
+        chunk_size characters. Each cut is made at the first whitespace at or
+        after the target length, which starts the next chunk.
+
+        Args:
+            encoded_string (str): the compressed binary string
+
+        Returns:
+            List[str]: chunks in order
+        """
+        chunks = []
+        start = 0
+        size = len(encoded_string)
+
+        while size - start > self._chunk_size:
+            match = WHITESPACE.search(encoded_string,
+                                      start + self._chunk_size)
+            if match is None:
+                break
+
+            chunks.append(encoded_string[start:match.start()])
+            start = match.start()
+
+        chunks.append(encoded_string[start:])
+        return chunks
+
+    def _get_pool(self) -> 'ProcessPoolExecutor':
+        """
+        Helper method for starting the worker pool on first use
+
+        Returns:
+            ProcessPoolExecutor: pool of workers with rebuilt encoders
+        """
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._max_workers, initializer=_init_worker,
+                initargs=(self._tree.get_frequencies(), self._tree.has_memo(),
+                          self._allowed_nonalpha_chars))
+
+        return self._pool
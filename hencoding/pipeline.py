@@ -0,0 +1,274 @@
+"""
+pipeline
+
+This module contains classes for overlapping file I/O with conversions. A
+reader thread reads input lines ahead of the conversion stage, and a writer
+thread writes converted results behind it, so disk latency is hidden behind
+compute. Stages are connected by bounded queues: a stage blocks when the next
+queue is full, so memory use stays bounded however far one stage gets ahead
+of another. Each queue records its depth and the time stages spent blocked on
+it. This implementation allows for method chaining.
+"""
+from queue import Queue
+from threading import Thread
+from time import time_ns
+from typing import Any, Dict, Iterator, Optional, TextIO
+from support.output_formatters import OutputItem
+
+# Max number of items held by each queue
+DEFAULT_QUEUE_SIZE = 256
+
+# Marks the end of a queue's items
+_END = object()
+
+
+class StageQueue(Queue):
+    """
+    Bounded queue between two pipeline stages that records its depth and the
+    time spent blocked putting items on it while full (backpressure) or
+    getting items from it while empty (starvation).
+    """
+
+    def __init__(self, maxsize=DEFAULT_QUEUE_SIZE) -> 'StageQueue':
+        """
+        Instantiate an empty queue
+
+        Args:
+            maxsize (int): max number of items held. Must be >= 1
+
+        Raises:
+            ValueError: when maxsize is not a positive integer
+        """
+        if maxsize < 1:
+            raise ValueError("Queue size must be a positive integer")
+
+        super().__init__(maxsize)
+        self._put_stall = 0
+        self._get_stall = 0
+        self._max_depth = 0
+        self._total_depth = 0
+        self._num_puts = 0
+
+    def put(self, item: Any, block=True, timeout=None) -> None:
+        """
+        Adds an item, waiting while the queue is full. Records the wait and
+        the queue's depth after adding the item.
+        """
+        start = time_ns()
+        super().put(item, block, timeout)
+        self._put_stall += time_ns() - start
+
+        depth = self.qsize()
+        self._max_depth = max(self._max_depth, depth)
+        self._total_depth += depth
+        self._num_puts += 1
+
+    def get(self, block=True, timeout=None) -> Any:
+        """
+        Removes and returns the next item, waiting while the queue is empty.
+        Records the wait.
+        """
+        start = time_ns()
+        item = super().get(block, timeout)
+        self._get_stall += time_ns() - start
+        return item
+
+    def get_max_depth(self) -> int:
+        """
+        Getter method for the max number of items held at once
+
+        Returns:
+            int: max depth
+        """
+        return self._max_depth
+
+    def get_average_depth(self) -> float:
+        """
+        Returns the average number of items held right after each put. If
+        nothing was put, returns 0
+
+        Returns:
+            float: average depth
+        """
+        return self._total_depth / self._num_puts if self._num_puts else 0.0
+
+    def get_put_stall(self) -> int:
+        """
+        Getter method for the time spent waiting to put items on a full queue
+
+        Returns:
+            int: put stall time in ns
+        """
+        return self._put_stall
+
+    def get_get_stall(self) -> int:
+        """
+        Getter method for the time spent waiting to get items from an empty
+        queue
+
+        Returns:
+            int: get stall time in ns
+        """
+        return self._get_stall
+
+
+class Pipeline:
+    """
+    Class that reads an input file in a reader thread and writes to an output
+    file in a writer thread, while the caller converts lines in between.
+    Written items are separated by newlines, like write_to_output. It is used
+    as a context manager, which starts the threads on entry and waits for all
+    writes to finish on exit.
+    """
+
+    def __init__(self, input_file: TextIO, output_file: TextIO,
+                 queue_size=DEFAULT_QUEUE_SIZE) -> 'Pipeline':
+        """
+        Args:
+            input_file (TextIO): text file read line by line
+            output_file (TextIO): text file where items are written
+            queue_size (int): max number of items held by each queue. Must be
+                >= 1
+        """
+        self._input_file = input_file
+        self._output_file = output_file
+        self._read_queue = StageQueue(queue_size)
+        self._write_queue = StageQueue(queue_size)
+        self._queue_size = queue_size
+
+        # Errors raised in the reader or writer thread
+        self._reader_error: Optional[BaseException] = None
+        self._writer_error: Optional[BaseException] = None
+
+        self._reader = Thread(target=self._read, daemon=True)
+        self._writer = Thread(target=self._write, daemon=True)
+        self._closed = False
+
+    def __enter__(self) -> 'Pipeline':
+        self._reader.start()
+        self._writer.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def lines(self) -> Iterator[str]:
+        """
+        Generator that yields each input line as read by the reader thread.
+
+        Yields:
+            str: next line of the input file
+
+        Raises:
+            OSError, ValueError: any error raised reading the input file
+        """
+        while True:
+            line = self._read_queue.get()
+            if line is _END:
+                break
+            yield line
+
+        if self._reader_error is not None:
+            raise self._reader_error
+
+    def write(self, text: 'OutputItem') -> 'Pipeline':
+        """
+        Method for queueing an item to be written by the writer thread. A
+        function item is called by the writer thread with the open output
+        file, to stream its text.
+
+        Args:
+            text (OutputItem): text OR function writing text to a file
+
+        Returns:
+            Pipeline: current instance of the pipeline
+        """
+        self._write_queue.put(text)
+        return self
+
+    def close(self) -> 'Pipeline':
+        """
+        Method for waiting for all queued items to be written. Closing more
+        than once has no effect.
+
+        Returns:
+            Pipeline: current instance of the pipeline
+
+        Raises:
+            OSError: any error raised writing the output file
+        """
+        if not self._closed:
+            self._closed = True
+            self._write_queue.put(_END)
+            self._writer.join()
+
+            if self._writer_error is not None:
+                raise self._writer_error
+
+        return self
+
+    def get_queues(self) -> Dict[str, 'StageQueue']:
+        """
+        Getter method for the pipeline's queues, by name
+
+        Returns:
+            Dict[str, StageQueue]: read and write queues
+        """
+        return {"Read queue": self._read_queue,
+                "Write queue": self._write_queue}
+
+    def get_queue_size(self) -> int:
+        """
+        Getter method for the max number of items held by each queue
+
+        Returns:
+            int: queue size
+        """
+        return self._queue_size
+
+    def _read(self) -> None:
+        """
+        Reader thread target that queues each input line, then the end mark.
+        """
+        try:
+            with open(self._input_file, 'r', encoding="utf-8") as file:
+                for line in file:
+                    self._read_queue.put(line)
+        except (OSError, ValueError) as error:
+            self._reader_error = error
+        finally:
+            self._read_queue.put(_END)
+
+    def _write(self) -> None:
+        """
+        Writer thread target that writes queued items until the end mark.
+        Items keep being taken off the queue after an error, so the
+        converting stage is never blocked.
+        """
+        separator = ""
+
+        try:
+            output = open(self._output_file, 'w', encoding="utf-8")
+        except OSError as error:
+            self._writer_error = error
+            output = None
+
+        try:
+            while True:
+                text = self._write_queue.get()
+                if text is _END:
+                    break
+
+                if (output is not None) and (self._writer_error is None):
+                    try:
+                        output.write(separator)
+                        if callable(text):
+                            text(output)
+                        else:
+                            output.write(text)
+                        separator = '\n'
+                    except OSError as error:
+                        self._writer_error = error
+        finally:
+            if output is not None:
+                output.close()
@@ -8,20 +8,41 @@ to the output file.
 Author: Rani Hinnawi
 Date: 2023-08-08
 """
+from contextlib import nullcontext
+from functools import partial
 from sys import stderr
-from typing import TextIO, List, Tuple
+from typing import Callable, TextIO, List, Optional, Tuple
 from hencoding.huffman_tree import HuffmanTree
-from hencoding.huffman_encoding import HuffmanEncoding
+from hencoding.tree_registry import TreeRegistry
+from hencoding.mapped_input import MappedEncodedFile
+from hencoding.parallel import ParallelHuffmanEncoding
+from hencoding.pipeline import Pipeline, DEFAULT_QUEUE_SIZE
+from hencoding.block_model import BlockModelEncoding, DEFAULT_BLOCK_SIZE
+from hencoding.transforms import TransformChain, TransformEncoding
+from hencoding.line_converter import LineConverter, make_encoding
 from support.performance import Performance
 from support.output_formatters import format_encoded_results, \
-    format_decoded_results, write_to_output
-from support.output_tree_formatters import format_huffman_tree, \
-    format_huffman_tree_binary_codes
-from support.format_performance_report import format_performance_report
+    format_decoded_results, format_estimated_results, write_to_output, \
+    write_items
+from support.output_tree_formatters import write_huffman_tree
+from support.format_performance_report import format_performance_report, \
+    format_dry_run_report, format_pipeline_report, format_model_report, \
+    format_transform_report
+from support.metrics_export import export_json, export_prometheus
 
 
 def run(frequency_table: TextIO, input_file: TextIO, output_file: TextIO,
-        memo=False, encode=False, decode=False, debug=False) -> None:
+        memo=False, encode=False, decode=False, debug=False,
+        registry: Optional['TreeRegistry'] = None, workers=1,
+        speculative=False, dry_run=False, track_memory=False,
+        metrics_json: Optional[TextIO] = None,
+        metrics_prometheus: Optional[TextIO] = None, pipelined=False,
+        queue_size=DEFAULT_QUEUE_SIZE,
+        model_tables: Optional[List[TextIO]] = None,
+        block_size=DEFAULT_BLOCK_SIZE, inline_trees=False,
+        transforms: Optional[List[str]] = None,
+        engine: Optional[str] = None, sample_rate=1,
+        mapped=False) -> 'Performance':
     """
     Wrapper function for encoding or decoding a string using Huffman Encoding
     and a user-provided frequency table.
@@ -34,13 +55,80 @@ def run(frequency_table: TextIO, input_file: TextIO, output_file: TextIO,
         encode (bool): True if input file strings will be encoded
         decode (bool): True if input file strings will be decoded
         debug (bool): True if debug mode is toggled on, otherwise False
+        registry (TreeRegistry): registry from which to retrieve the (memoized)
+            Huffman Tree OR None to build a new one
+        workers (int): number of worker processes converting long lines in
+            parallel chunks. 1 converts every line in-process
+        speculative (bool): True if decoding long bitstreams without
+            whitespace in speculative parallel chunks, otherwise False
+        dry_run (bool): True if projecting the encoded size of input file
+            strings without encoding them. Requires encode
+        track_memory (bool): True if measuring peak and net change in memory
+            of tree construction and each conversion, otherwise False
+        metrics_json (TextIO): file to which conversion metrics are exported
+            as JSON OR None
+        metrics_prometheus (TextIO): file to which conversion metrics are
+            exported in Prometheus text format OR None
+        pipelined (bool): True if reading, converting, and writing in
+            overlapping threads, otherwise False
+        queue_size (int): max number of lines held between pipeline stages
+        model_tables (List[TextIO]): frequency tables of extra trees. If given,
+            each block of a line is converted with the best of all trees,
+            frequency_table's being tree 0. Requires workers to be 1
+        block_size (int): number of characters per block with model_tables
+        inline_trees (bool): True if a block may store its own tree when that
+            saves bits with model_tables, otherwise False
+        transforms (List[str]): names of reversible transforms applied in
+            order before encoding, and undone after decoding, OR None
+        engine (str): name of the engine encoding every line, 'auto' to
+            choose the fastest per line size, OR None to follow memo.
+            Requires workers to be 1 and no model_tables
+        sample_rate (int): 1 in sample_rate lines is timed and reported in
+            full. The others are only counted. Must be >= 1
+        mapped (bool): True if decoding lines directly from a read-only
+            memory map of the input file, otherwise False. Requires decode,
+            and no pipelined, workers, model_tables, or transforms
+
+    Returns:
+        Performance: metrics logged for the conversions. Nothing is logged if
+            the Huffman Tree could not be built
 
     Raises:
-        ValueError: if both decode and encode are False
+        ValueError: if both decode and encode are False, if dry_run is
+            True without encode, if model_tables is given with workers, if
+            engine is given with workers or model_tables, if mapped is True
+            without decode or with another input path, if a transform or
+            engine name is unknown, or if sample_rate is not positive
     """
+    if encode == decode:
+        # Error case: decode OR encode can be True, but not both or neither
+        raise ValueError("Either encode or decode must be True")
+
+    if dry_run and not encode:
+        # Error case: only encoding output size can be projected
+        raise ValueError("A dry run requires encode to be True")
+
+    if model_tables and (workers > 1):
+        # Error case: blocks of a line are not converted in parallel
+        raise ValueError("Block models require workers to be 1")
+
+    if engine and ((workers > 1) or model_tables):
+        # Error case: parallel and block model encodings pick their own paths
+        raise ValueError("Engine selection requires workers to be 1 and no "
+                         "block models")
+
+    if mapped and (encode or pipelined or (workers > 1) or model_tables or
+                   transforms):
+        # Error case: only in-process decoding reads the memory map
+        raise ValueError("Mapped input requires decode, and no pipeline, "
+                         "workers, block models, or transforms")
+
     # Set up Performance object and output strings used by runner functions
-    performance = Performance()
+    chain = TransformChain(transforms) if transforms else None
+    performance = Performance(track_memory=track_memory,
+                              sample_rate=sample_rate)
     out = []
+    model_trees = []
     NODES_PER_LINE = 4
 
     def run_tree_setup() -> Tuple['HuffmanTree', List[str], bool]:
@@ -69,7 +157,13 @@ def run(frequency_table: TextIO, input_file: TextIO, output_file: TextIO,
         performance.start()
 
         try:
-            huffman_tree = HuffmanTree(frequency_table, memo=memo)
+            if registry is not None:
+                huffman_tree = registry.get(frequency_table)
+            else:
+                huffman_tree = HuffmanTree(frequency_table, memo=memo)
+
+            for model_table in model_tables or []:
+                model_trees.append(HuffmanTree(model_table, memo=memo))
         except ValueError as ve:
             # All possible errors are ValueErrrors. Save to output
             error_message = ve.args[0]
@@ -83,92 +177,204 @@ def run(frequency_table: TextIO, input_file: TextIO, output_file: TextIO,
             if error:
                 out.append(error_message)
             else:
-                out.append(format_huffman_tree(
-                    huffman_tree, nodes_per_line=NODES_PER_LINE) + '\n')
+                # Streamed to the output file when written, then a blank line
+                out.append(partial(write_huffman_tree,
+                                   huffman_tree=huffman_tree,
+                                   nodes_per_line=NODES_PER_LINE))
+                out.append("")
 
             out.append(f"Size (number of frequencies): {frequency_table_size}")
             out.append(f"Runtime: {performance.get_runtime_micro_sec()}μs")
 
+            if track_memory:
+                out.append(performance.get_memory_metrics())
+
         return huffman_tree, error
 
-    if encode == decode:
-        # Error case: decode OR encode can be True, but not both or neither
-        raise ValueError("Either encode or decode must be True")
+    def run_conversion(line_number: int, line: str,
+                       decoder: Optional[Callable[[], str]] = None) \
+            -> Optional[str]:
+        """
+        Helper function for converting one input line, measuring its
+        performance, and formatting its results.
 
-    # Build Huffman Tree. Don't attempt encoding / decoding if error raised
-    huffman_tree, error = run_tree_setup()
+        Args:
+            line_number (int): number for labelling the line in the output
+            line (str): input line, including any surrounding whitespace
+            decoder (Callable[[], str]): function decoding the line in place
+                of decoding its text OR None
+
+        Returns:
+            str: formatted results OR None if the line is empty
+        """
+        expression = line.strip()
+        size = len(expression)
 
-    if error:
-        write_to_output(output_file, out)
-        return
+        if size == 0:
+            # Case: empty line. Ignore.
+            return None
 
-    # print(huffman_tree.print_codes())
+        result, error = converter.convert(expression, decoder)
+
+        if error and debug:
+            error_message = f"Expression: {expression}"
+            error_message += f"\n\tError Message: {result}"
+            print(error_message, file=stderr)
+
+        metrics = converter.get_metrics()
+
+        if dry_run:
+            return format_estimated_results(
+                line_number, expression, result, metrics, error)
+        if encode:
+            return format_encoded_results(
+                line_number, expression, result, metrics, error)
+        return format_decoded_results(
+            line_number, expression, result, metrics, error,
+            chars_per_line=85)
+
+    def run_report() -> None:
+        """
+        Helper function for adding the conversion values and reports to the
+        output, and exporting metrics.
+        """
+        # Display conversion values
+        out.append("\nConversion values: ")
+
+        if not memo:
+            # If not using memoization, codes are not preset
+            huffman_tree.set_codes()
+
+        out.append(partial(write_huffman_tree, huffman_tree=huffman_tree,
+                           nodes_per_line=NODES_PER_LINE, binary_codes=True))
+
+        # Output performance report
+        out.append(format_performance_report(performance, micro_sec=True,
+                                             huffman_tree=huffman_tree))
+
+        if dry_run:
+            out.append(format_dry_run_report(performance))
+
+        if model_tables:
+            out.append(format_model_report(
+                huffman_encoding.get_tree_usage(),
+                [frequency_table] + list(model_tables)))
+
+        engine_report = converter.get_engine_report()
+        if engine_report is not None:
+            out.append(engine_report)
+
+        if chain is not None:
+            out.append(format_transform_report(chain.get_stage_metrics()))
+
+        # Export metrics in machine-readable formats
+        if metrics_json is not None:
+            export_json(performance, metrics_json, micro_sec=True)
+
+        if metrics_prometheus is not None:
+            export_prometheus(performance, metrics_prometheus, micro_sec=True)
+
+    # Memory tracking is turned off however the run ends
+    try:
+        # Build Huffman Tree. Don't attempt encoding / decoding if error raised
+        huffman_tree, error = run_tree_setup()
+
+        if error:
+            write_to_output(output_file, out)
+            return performance
+
+        # print(huffman_tree.print_codes())
+
+        # Shuts the worker pool down on exit, however the conversions end
+        workers_context = nullcontext()
+
+        if workers > 1:
+            huffman_encoding = ParallelHuffmanEncoding(
+                huffman_tree, max_workers=workers, speculative=speculative)
+            workers_context = huffman_encoding
+        elif model_tables:
+            huffman_encoding = BlockModelEncoding(
+                [huffman_tree] + model_trees, block_size=block_size,
+                inline_trees=inline_trees)
+        else:
+            huffman_encoding = make_encoding(huffman_tree, encode=encode,
+                                             dry_run=dry_run, engine=engine)
+
+        if chain is not None:
+            huffman_encoding = TransformEncoding(huffman_encoding, chain)
+
+        converter = LineConverter(huffman_encoding, performance, encode=encode,
+                                  dry_run=dry_run, engine=engine)
 
-    huffman_encoding = HuffmanEncoding(huffman_tree)
-    with open(input_file, 'r', encoding="utf-8") as file:
         out.append("\n\n-------Conversion Results-------\n")
 
         # Counting lines for clean formatting
         line_counter = 1
-        for line in file:
-            expression = line.strip()
-            size = len(expression)
-
-            if size == 0:
-                # Case: empty line. Ignore.
-                continue
-
-            # Set up error handling and performance metrics
-            error = False
-            result = ""
-            performance.set_size(size).start()
-
-            try:
-                if encode:
-                    result = huffman_encoding.encode(expression)
-                elif decode:
-                    result = huffman_encoding.decode(expression)
-            except ValueError as ve:
-                result = ve.args[0]
-                error = True
-
-                if debug:
-                    error_message = f"Expression: {expression}"
-                    error_message += f"\n\tError Message: {result}"
-                    print(error_message, file=stderr)
-            finally:
-                performance.stop()
-
-                if error:
-                    performance.log_error(micro_sec=True)
-                else:
-                    performance.log_success(micro_sec=True)
-
-                if encode:
-                    out.append(format_encoded_results(
-                        line_counter, expression, result,
-                        performance.get_metrics_micro_sec(), error))
-                else:
-                    out.append(format_decoded_results(
-                        line_counter, expression, result,
-                        performance.get_metrics_micro_sec(), error,
-                        chars_per_line=85))
-                line_counter += 1
-
-    # Display conversion values
-    out.append("\nConversion values: ")
-
-    if not memo:
-        # If not using memoization, codes are not preset
-        huffman_tree.set_codes()
-
-    out.append(format_huffman_tree_binary_codes(huffman_tree, NODES_PER_LINE))
-
-    # Output performance report
-    out.append(format_performance_report(performance, micro_sec=True))
-
-    # Output results
-    write_to_output(output_file, out)
+
+        with workers_context:
+            if pipelined:
+                # Read, convert, and write in overlapping stages. Results are
+                # written as they are converted rather than all at the end
+                with Pipeline(input_file, output_file, queue_size) as pipeline:
+                    for text in out:
+                        pipeline.write(text)
+                    out.clear()
+
+                    for line in pipeline.lines():
+                        result = run_conversion(line_counter, line)
+                        if result is not None:
+                            pipeline.write(result)
+                            line_counter += 1
+
+                    run_report()
+                    for text in out:
+                        pipeline.write(text)
+
+                # The write stage is closed, so its queue metrics include
+                # every write. The pipeline report is appended after them
+                with open(output_file, 'a', encoding="utf-8") as output:
+                    output.write('\n')
+                    write_items(output, [
+                        format_pipeline_report(pipeline.get_queues(),
+                                               pipeline.get_queue_size()),
+                        "Done."])
+            elif mapped:
+                # Lines are found and decoded in the mapped bytes. Their text is
+                # only copied out to be shown next to their results, and results
+                # are written as they are converted rather than all at the end
+                with MappedEncodedFile(input_file) as mapped_file, \
+                        open(output_file, 'w', encoding="utf-8") as output:
+                    write_items(output, out)
+                    out.clear()
+
+                    for start, end in mapped_file.iter_line_spans():
+                        result = run_conversion(
+                            line_counter, mapped_file.get_text(start, end),
+                            partial(mapped_file.decode_span, huffman_encoding,
+                                    start, end))
+                        if result is not None:
+                            output.write('\n' + result)
+                            line_counter += 1
+
+                    run_report()
+                    output.write('\n')
+                    write_items(output, out + ["Done."])
+            else:
+                with open(input_file, 'r', encoding="utf-8") as file:
+                    for line in file:
+                        result = run_conversion(line_counter, line)
+                        if result is not None:
+                            out.append(result)
+                            line_counter += 1
+
+                run_report()
+
+                # Output results
+                write_to_output(output_file, out)
+    finally:
+        performance.set_memory_tracking(False)
 
     if debug:
         print('OK', file=stderr)
+
+    return performance
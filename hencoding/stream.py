@@ -0,0 +1,256 @@
+"""
+stream
+
+This module contains the function for Huffman Encoding open streams, such as
+stdin and stdout in shell pipelines, without temporary files. Lines are read
+and converted one at a time, and only the converted lines are written to the
+output stream, so one output line corresponds to each input line. A line
+that raised an error is written as ERROR_PREFIX followed by its error
+message, which cannot be mistaken for a converted line: encoded lines hold
+only 0s, 1s, and whitespace, and decoded lines only lowercase letters and
+whitespace. Lines may instead be read and converted in pieces of a fixed
+number of characters, so a line of any length is never held whole. Output is
+flushed in batches of lines. The Huffman Tree,
+conversion values, and performance report are written to a separate report
+stream, such as stderr or a side file.
+"""
+from functools import partial
+from sys import stderr
+from typing import List, Optional, TextIO
+from hencoding.huffman_tree import HuffmanTree
+from hencoding.chunked_reader import convert_line_chunks
+from hencoding.line_converter import LineConverter, make_encoding
+from support.performance import Performance
+from support.output_formatters import OutputItem, write_items
+from support.output_tree_formatters import write_huffman_tree
+from support.format_performance_report import format_performance_report
+
+# Number of output lines written between flushes
+DEFAULT_FLUSH_LINES = 1024
+
+# Starts each output line written for a line that raised an error
+ERROR_PREFIX = "Error - "
+
+
+def run_stream(frequency_table: TextIO, input_stream: TextIO,
+               output_stream: TextIO, report_stream: TextIO, memo=False,
+               encode=False, decode=False, debug=False,
+               flush_lines=DEFAULT_FLUSH_LINES, track_memory=False,
+               engine: Optional[str] = None, sample_rate=1,
+               chunk_size: Optional[int] = None) -> 'Performance':
+    """
+    Function for encoding or decoding each line of an open input stream to an
+    open output stream. Empty lines are passed through as empty lines. A line
+    raising an error is written as ERROR_PREFIX and its error message, and
+    its error is counted in the performance report.
+
+    Args:
+        frequency_table (TextIO): file containing frequencies per character
+        input_stream (TextIO): open stream with strings to encode/decode
+        output_stream (TextIO): open stream where converted lines are written
+        report_stream (TextIO): open stream where the report is written
+        memo (bool): True if memoizing HuffmanTree nodes, otherwise False
+        encode (bool): True if input strings will be encoded
+        decode (bool): True if input strings will be decoded
+        debug (bool): True if debug mode is toggled on, otherwise False
+        flush_lines (int): number of output lines written between flushes.
+            Must be >= 1
+        track_memory (bool): True if measuring peak and net change in memory
+            of each conversion, otherwise False
+        engine (str): name of the engine encoding every line, 'auto' to
+            choose the fastest per line size, OR None to follow memo
+        sample_rate (int): 1 in sample_rate lines is timed and logged. The
+            others are only counted. Must be >= 1
+        chunk_size (int): max number of characters read and converted at
+            once, OR None to read whole lines. When given, converted pieces
+            are written as they are produced, a failed line holds the pieces
+            written before its error followed by ERROR_PREFIX, and each
+            line's runtime includes reading it. Must be >= 1
+
+    Returns:
+        Performance: metrics logged for the conversions. Nothing is logged if
+            the Huffman Tree could not be built
+
+    Raises:
+        ValueError: if both decode and encode are False, or if flush_lines,
+            sample_rate, or chunk_size is not a positive integer
+    """
+    if encode == decode:
+        # Error case: decode OR encode can be True, but not both or neither
+        raise ValueError("Either encode or decode must be True")
+
+    if flush_lines < 1:
+        raise ValueError("There must be at least 1 line per flush")
+
+    if (chunk_size is not None) and (chunk_size < 1):
+        raise ValueError("There must be at least 1 character per chunk")
+
+    performance = Performance(track_memory=track_memory,
+                              sample_rate=sample_rate)
+    NODES_PER_LINE = 4
+    report: List[OutputItem] = ["-------Huffman Tree in Preorder-------\n"]
+
+    # Memory tracking is turned off however the run ends
+    try:
+        try:
+            huffman_tree = HuffmanTree(frequency_table, memo=memo)
+        except ValueError as ve:
+            # All possible errors are ValueErrors. Save to report
+            report.append(ve.args[0])
+            write_items(report_stream, report)
+            report_stream.write('\n')
+            return performance
+
+        # Trees are streamed to the report stream when it is written
+        report.append(partial(write_huffman_tree, huffman_tree=huffman_tree,
+                              nodes_per_line=NODES_PER_LINE))
+        report.append("")
+        converter = LineConverter(
+            make_encoding(huffman_tree, encode=encode, engine=engine),
+            performance, encode=encode, engine=engine)
+
+        if chunk_size is not None:
+            _write_line_chunks(converter, input_stream, output_stream, encode,
+                              debug, flush_lines, chunk_size)
+        else:
+            _write_lines(converter, input_stream, output_stream, debug,
+                        flush_lines)
+
+        # Display conversion values and performance report
+        if not memo:
+            # If not using memoization, codes are not preset
+            huffman_tree.set_codes()
+
+        report.append("Conversion values: ")
+        report.append(partial(write_huffman_tree, huffman_tree=huffman_tree,
+                              nodes_per_line=NODES_PER_LINE, binary_codes=True))
+        report.append(format_performance_report(performance, micro_sec=True,
+                                                huffman_tree=huffman_tree))
+
+        engine_report = converter.get_engine_report()
+        if engine_report is not None:
+            report.append(engine_report)
+
+        write_items(report_stream, report)
+        report_stream.write('\n')
+        report_stream.flush()
+    finally:
+        performance.set_memory_tracking(False)
+
+    return performance
+
+
+def _write_lines(converter: 'LineConverter', input_stream: TextIO,
+                output_stream: TextIO, debug: bool, flush_lines: int) -> None:
+    """
+    Helper function for converting each whole line of an input stream and
+    writing the results in batches of lines.
+
+    Args:
+        converter (LineConverter): converter logging each line
+        input_stream (TextIO): open stream with strings to encode/decode
+        output_stream (TextIO): open stream where converted lines are written
+        debug (bool): True if debug mode is toggled on, otherwise False
+        flush_lines (int): number of output lines written between flushes
+    """
+    # Converted lines waiting to be written
+    pending: List[str] = []
+
+    for line_number, line in enumerate(input_stream, start=1):
+        expression = line.strip()
+        result = ""
+
+        if expression:
+            result, error = converter.convert(expression)
+
+            if error:
+                if debug:
+                    print(f"Line {line_number}: {result}", file=stderr)
+                result = ERROR_PREFIX + result
+
+        pending.append(result + '\n')
+
+        if len(pending) >= flush_lines:
+            output_stream.writelines(pending)
+            output_stream.flush()
+            pending.clear()
+
+    output_stream.writelines(pending)
+    output_stream.flush()
+
+
+def _write_line_chunks(converter: 'LineConverter', input_stream: TextIO,
+                      output_stream: TextIO, encode: bool, debug: bool,
+                      flush_lines: int, chunk_size: int) -> None:
+    """
+    Helper function for converting each line of an input stream in pieces of
+    up to chunk_size characters and writing each piece as it is converted.
+
+    Args:
+        converter (LineConverter): converter logging each line
+        input_stream (TextIO): open stream with strings to encode/decode
+        output_stream (TextIO): open stream where converted lines are written
+        encode (bool): True if encoding lines, otherwise decoding them
+        debug (bool): True if debug mode is toggled on, otherwise False
+        flush_lines (int): number of output lines written between flushes
+        chunk_size (int): max number of characters read and converted at
+            once
+    """
+    lines_written = 0
+    size = symbols = bits = 0
+    has_text = False
+    started = False
+
+    # Whitespace after the last non-whitespace character read, which is only
+    # part of the line's size if more text follows, as in str.strip
+    trailing = 0
+
+    for line_number, chunk, piece, line_done, error in convert_line_chunks(
+            converter.get_encoding(), input_stream, encode=encode,
+            chunk_size=chunk_size, keep_empty=True):
+        if not started:
+            # The timer starts with a line's first piece and covers reading
+            # the rest, since its pieces are read and converted together
+            converter.begin()
+            started = True
+
+        text = chunk if has_text else chunk.lstrip()
+        if text.strip():
+            stripped = text.rstrip()
+            size += trailing + len(stripped)
+            trailing = len(text) - len(stripped)
+            has_text = True
+        elif has_text:
+            trailing += len(text)
+
+        if error is not None:
+            if debug:
+                print(f"Line {line_number}: {error}", file=stderr)
+            output_stream.write(ERROR_PREFIX + error)
+        else:
+            output_stream.write(piece)
+            if converter.is_sampled():
+                piece_symbols, piece_bits = converter.count_compression(
+                    chunk, piece)
+                symbols += piece_symbols
+                bits += piece_bits
+
+        if not line_done:
+            continue
+
+        output_stream.write('\n')
+        lines_written += 1
+        if lines_written % flush_lines == 0:
+            output_stream.flush()
+
+        if has_text:
+            # Lines holding only whitespace are not logged, and their timer
+            # carries over to the next line
+            converter.end(error=error is not None, symbols=symbols,
+                          bits=bits, size=size)
+            started = False
+
+        size = symbols = bits = trailing = 0
+        has_text = False
+
+    output_stream.flush()
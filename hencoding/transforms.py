@@ -0,0 +1,506 @@
+"""
+transforms
+
+This module contains reversible transforms applied to an expression's
+symbols before Huffman Encoding, and undone after decoding, so runs and
+repeated content cost fewer bits than one code per symbol. Each transform
+maps a string of lowercase letters a-z to another such string, so any
+frequency table holding all 26 letters can encode the result:
+    rle: runs of 4+ letters are cut to 4 letters and a count letter
+    bwt: Burrows-Wheeler transform, prefixed by its primary index in letters
+    mtf: move-to-front, replacing each letter by its index as a letter
+Transforms are chained in order, e.g. bwt, mtf, rle, and each stage's runtime
+and sizes are recorded. Whitespace and permitted punctuation, which encoding
+skips, are removed before the first stage. This implementation allows for
+method chaining.
+"""
+from string import ascii_lowercase
+from time import time_ns
+from typing import Callable, Dict, List, Tuple
+from hencoding.huffman_tree import HuffmanTree
+from hencoding.huffman_encoding import HuffmanEncoding
+
+ALPHABET = ascii_lowercase
+ALPHABET_SIZE = len(ascii_lowercase)
+FIRST_LETTER = ord('a')
+
+# Letters of a run kept before its count letter
+RUN_THRESHOLD = 4
+MAX_RUN = RUN_THRESHOLD + ALPHABET_SIZE - 1
+
+
+def rle_forward(symbols: str) -> str:
+    """
+    Function that run-length encodes letters. After 4 identical letters, a
+    count letter (a = 0, ..., z = 25) gives how many more repeat. Runs longer
+    than 29 letters are split.
+
+    Args:
+        symbols (str): lowercase letters
+
+    Returns:
+        str: run-length encoded letters
+    """
+    result = []
+    position = 0
+
+    while position < len(symbols):
+        letter = symbols[position]
+        end = position
+        while (end < len(symbols)) and (symbols[end] == letter) and \
+                (end - position < MAX_RUN):
+            end += 1
+
+        run = end - position
+        if run >= RUN_THRESHOLD:
+            result.append(letter * RUN_THRESHOLD)
+            result.append(chr(FIRST_LETTER + run - RUN_THRESHOLD))
+        else:
+            result.append(letter * run)
+
+        position = end
+
+    return ''.join(result)
+
+
+def rle_inverse(encoded: str) -> str:
+    """
+    Function that undoes rle_forward.
+
+    Args:
+        encoded (str): run-length encoded letters
+
+    Returns:
+        str: original letters
+    """
+    result = []
+    run_letter = None
+    run = 0
+
+    for letter in encoded:
+        if run == RUN_THRESHOLD:
+            # Case: count letter following a run
+            result.append(run_letter * (ord(letter) - FIRST_LETTER))
+            run_letter = None
+            run = 0
+            continue
+
+        if letter == run_letter:
+            run += 1
+        else:
+            run_letter = letter
+            run = 1
+
+        result.append(letter)
+
+    return ''.join(result)
+
+
+def _sort_rotations(symbols: str) -> List[int]:
+    """
+    Helper function for sorting the rotations of a string by prefix doubling:
+    rotations are ranked by their first k letters, for k doubling each round.
+
+    Args:
+        symbols (str): letters being rotated
+
+    Returns:
+        List[int]: start index of each rotation, in sorted order
+    """
+    size = len(symbols)
+    rank = [ord(letter) for letter in symbols]
+    order = sorted(range(size), key=rank.__getitem__)
+    width = 1
+
+    while width < size:
+        def key(index: int) -> Tuple[int, int]:
+            return rank[index], rank[(index + width) % size]
+
+        order.sort(key=key)
+
+        new_rank = [0] * size
+        for position in range(1, size):
+            new_rank[order[position]] = new_rank[order[position - 1]] + \
+                (key(order[position]) != key(order[position - 1]))
+        rank = new_rank
+
+        if rank[order[-1]] == size - 1:
+            # Case: all rotations are distinct and sorted
+            break
+        width *= 2
+
+    return order
+
+
+def _index_to_letters(index: int) -> str:
+    """
+    Helper function for writing a non-negative integer in letters: the number
+    of base-26 digits as a letter (a = 1), then the digits (a = 0).
+    """
+    digits = []
+    while True:
+        index, digit = divmod(index, ALPHABET_SIZE)
+        digits.append(ALPHABET[digit])
+        if index == 0:
+            break
+
+    return ALPHABET[len(digits) - 1] + ''.join(reversed(digits))
+
+
+def _letters_to_index(encoded: str) -> Tuple[int, int]:
+    """
+    Helper function for reading an integer written by _index_to_letters.
+
+    Returns:
+        int: integer read
+        int: number of letters read
+
+    Raises:
+        ValueError: if the letters are truncated
+    """
+    num_digits = ord(encoded[0]) - FIRST_LETTER + 1
+    if len(encoded) < num_digits + 1:
+        raise ValueError("INVALID TRANSFORM: Truncated BWT index")
+
+    index = 0
+    for letter in encoded[1:num_digits + 1]:
+        index = index * ALPHABET_SIZE + ord(letter) - FIRST_LETTER
+
+    return index, num_digits + 1
+
+
+def bwt_forward(symbols: str) -> str:
+    """
+    Function that applies the Burrows-Wheeler transform: the last letter of
+    each sorted rotation, prefixed by the row of the original string.
+
+    Args:
+        symbols (str): lowercase letters
+
+    Returns:
+        str: primary index in letters, then the transformed letters
+    """
+    if not symbols:
+        return ""
+
+    size = len(symbols)
+    order = _sort_rotations(symbols)
+    last_column = ''.join(symbols[(start - 1) % size] for start in order)
+
+    return _index_to_letters(order.index(0)) + last_column
+
+
+def bwt_inverse(encoded: str) -> str:
+    """
+    Function that undoes bwt_forward by following the last-to-first mapping
+    back from the primary index.
+
+    Args:
+        encoded (str): output of bwt_forward
+
+    Returns:
+        str: original letters
+
+    Raises:
+        ValueError: if the primary index is truncated or out of range
+    """
+    if not encoded:
+        return ""
+
+    primary, offset = _letters_to_index(encoded)
+    last_column = encoded[offset:]
+    size = len(last_column)
+
+    if primary >= max(size, 1):
+        raise ValueError("INVALID TRANSFORM: BWT index out of range")
+
+    # Row of each letter's rotation in the first column
+    first_row: Dict[str, int] = {}
+    total = 0
+    for letter in sorted(set(last_column)):
+        first_row[letter] = total
+        total += last_column.count(letter)
+
+    seen: Dict[str, int] = dict.fromkeys(first_row, 0)
+    last_to_first = [0] * size
+    for row, letter in enumerate(last_column):
+        last_to_first[row] = first_row[letter] + seen[letter]
+        seen[letter] += 1
+
+    result = []
+    row = primary
+    for _ in range(size):
+        result.append(last_column[row])
+        row = last_to_first[row]
+
+    return ''.join(reversed(result))
+
+
+def mtf_forward(symbols: str) -> str:
+    """
+    Function that applies move-to-front: each letter is replaced by its index
+    in a list of all letters (as a letter, a = 0), then moved to the front.
+    Repeated letters become runs of 'a'.
+
+    Args:
+        symbols (str): lowercase letters
+
+    Returns:
+        str: index letters
+    """
+    table = list(ALPHABET)
+    result = []
+
+    for letter in symbols:
+        index = table.index(letter)
+        result.append(ALPHABET[index])
+        del table[index]
+        table.insert(0, letter)
+
+    return ''.join(result)
+
+
+def mtf_inverse(encoded: str) -> str:
+    """
+    Function that undoes mtf_forward.
+
+    Args:
+        encoded (str): index letters
+
+    Returns:
+        str: original letters
+    """
+    table = list(ALPHABET)
+    result = []
+
+    for index_letter in encoded:
+        letter = table.pop(ord(index_letter) - FIRST_LETTER)
+        result.append(letter)
+        table.insert(0, letter)
+
+    return ''.join(result)
+
+
+# Forward and inverse function of each transform, by name
+TRANSFORMS: Dict[str, Tuple[Callable[[str], str], Callable[[str], str]]] = {
+    "rle": (rle_forward, rle_inverse),
+    "bwt": (bwt_forward, bwt_inverse),
+    "mtf": (mtf_forward, mtf_inverse),
+}
+
+
+class TransformChain:
+    """
+    Class that applies transforms in order, undoes them in reverse order, and
+    records each stage's runtime and the sizes it took in and gave out.
+    """
+
+    def __init__(self, names: List[str]) -> 'TransformChain':
+        """
+        Args:
+            names (List[str]): transform names in the order applied
+
+        Raises:
+            ValueError: when a name is not a known transform
+        """
+        for name in names:
+            if name not in TRANSFORMS:
+                raise ValueError(f"INVALID TRANSFORM: '{name}' is not one of "
+                                 f"{', '.join(TRANSFORMS)}")
+
+        self._names = list(names)
+
+        # Per stage: [calls, runtime (ns), symbols in, symbols out]
+        self._metrics: Dict[str, List[int]] = {
+            name: [0, 0, 0, 0] for name in self._names}
+
+    def get_names(self) -> List[str]:
+        """
+        Getter method for the transform names in the order applied
+
+        Returns:
+            List[str]: transform names
+        """
+        return list(self._names)
+
+    def forward(self, symbols: str) -> str:
+        """
+        Method for applying every transform in order.
+
+        Args:
+            symbols (str): lowercase letters
+
+        Returns:
+            str: transformed letters
+
+        Raises:
+            ValueError: when a symbol is not a letter a-z
+        """
+        self._validate(symbols)
+
+        for name in self._names:
+            symbols = self._run_stage(name, TRANSFORMS[name][0], symbols)
+
+        return symbols
+
+    def inverse(self, symbols: str) -> str:
+        """
+        Method for undoing every transform in reverse order.
+
+        Args:
+            symbols (str): transformed letters
+
+        Returns:
+            str: original letters
+
+        Raises:
+            ValueError: when a symbol is not a letter a-z, or the letters are
+                not a valid transform output
+        """
+        self._validate(symbols)
+
+        for name in reversed(self._names):
+            symbols = self._run_stage(name, TRANSFORMS[name][1], symbols)
+
+        return symbols
+
+    def get_stage_metrics(self) -> Dict[str, Tuple[int, int, int, int]]:
+        """
+        Getter method for each stage's number of calls, total runtime (ns),
+        and total symbols taken in and given out, in both directions
+
+        Returns:
+            Dict[str, Tuple[int, int, int, int]]: metrics by transform name
+        """
+        return {name: tuple(metrics)
+                for name, metrics in self._metrics.items()}
+
+    def _run_stage(self, name: str, transform: Callable[[str], str],
+                   symbols: str) -> str:
+        """
+        Helper method for running one stage and recording its metrics.
+        """
+        start = time_ns()
+        result = transform(symbols)
+        metrics = self._metrics[name]
+        metrics[0] += 1
+        metrics[1] += time_ns() - start
+        metrics[2] += len(symbols)
+        metrics[3] += len(result)
+        return result
+
+    def _validate(self, symbols: str) -> None:
+        """
+        Helper method for checking that every symbol is a letter a-z.
+
+        Raises:
+            ValueError: naming the first symbol that is not
+        """
+        if not set(symbols) <= set(ALPHABET):
+            char = next(char for char in symbols if char not in ALPHABET)
+            raise ValueError(f"INVALID CHAR: the character '{char}' cannot "
+                             "be transformed. Only letters a-z can be")
+
+
+class TransformEncoding:
+    """
+    Class wrapping an encoder so expressions are transformed before encoding,
+    and decoded strings are inverse transformed after decoding. Any other
+    attribute is looked up on the wrapped encoder.
+    """
+
+    def __init__(self, huffman_encoding: 'HuffmanEncoding',
+                 chain: 'TransformChain') -> 'TransformEncoding':
+        """
+        Args:
+            huffman_encoding (HuffmanEncoding): encoder used after transforms
+            chain (TransformChain): transforms applied in order
+        """
+        self._encoding = huffman_encoding
+        self._chain = chain
+
+    def __getattr__(self, name: str):
+        return getattr(self._encoding, name)
+
+    def get_tree(self) -> 'HuffmanTree':
+        """
+        Getter method for retrieving the Huffman Tree used for conversions
+
+        Returns:
+            HuffmanTree: wrapped encoder's Huffman Tree
+        """
+        return self._encoding.get_tree()
+
+    def get_chain(self) -> 'TransformChain':
+        """
+        Getter method for the transforms applied
+
+        Returns:
+            TransformChain: transforms and their metrics
+        """
+        return self._chain
+
+    def encode(self, expression: str) -> str:
+        """
+        Method for transforming then encoding an expression
+
+        Args:
+            expression (str): the string being encoded
+
+        Returns:
+            str: a new binary string made entirely of 1s and 0s
+
+        Raises:
+            ValueError: when a symbol is not a letter a-z, or the tree has no
+                code for a transformed letter
+        """
+        return self._encoding.encode(self._chain.forward(
+            self._symbols(expression)))
+
+    def estimate_bits(self, expression: str) -> int:
+        """
+        Method for calculating the number of bits encoding an expression would
+        produce. The expression is transformed, but not encoded.
+
+        Args:
+            expression (str): the string being measured
+
+        Returns:
+            int: number of bits in the encoded expression
+        """
+        return self._encoding.estimate_bits(self._chain.forward(
+            self._symbols(expression)))
+
+    def count_symbols(self, expression: str) -> int:
+        """
+        Method for counting the characters of an expression that encoding maps
+        to codes, before any transform.
+
+        Args:
+            expression (str): the string being measured
+
+        Returns:
+            int: number of encodable characters (symbols)
+        """
+        return self._encoding.count_symbols(expression)
+
+    def decode(self, encoded_string: str) -> str:
+        """
+        Method for decoding then inverse transforming a binary string
+
+        Args:
+            encoded_string (str): the compressed binary string
+
+        Returns:
+            str: the decompressed, inverse transformed string
+        """
+        return self._chain.inverse(self._encoding.decode(encoded_string))
+
+    def _symbols(self, expression: str) -> str:
+        """
+        Helper method for the lowercase characters of an expression that
+        encoding maps to codes, skipping whitespace and permitted punctuation
+        """
+        allowed = self._encoding.get_allowed_nonalpha_chars()
+        return ''.join(char.lower() for char in expression
+                       if not ((char in allowed) or char.isspace()))
@@ -0,0 +1,250 @@
+"""
+tree_registry
+
+This module contains a class for a registry of Huffman Trees. Trees are built
+on demand from a frequency table, looked up by a registered table ID or by the
+table's file path, and the most recently used ones are kept in memory along
+with their Huffman codes. Least recently used trees are evicted by count or by
+an estimated memory budget. A tree whose frequency table has changed on disk
+is rebuilt the next time it is requested. This implementation allows for
+method chaining.
+"""
+from collections import OrderedDict
+from pathlib import Path
+from threading import RLock
+from typing import Dict, Optional, Tuple, Union
+from hencoding.huffman_tree import HuffmanTree
+
+DEFAULT_MAX_TREES = 8
+
+
+class TreeRegistry:
+    """
+    Class for loading Huffman Trees by table ID or frequency table path and
+    caching the most recently used ones. Cached trees use memoization, so
+    their Huffman codes are built once and reused by every lookup.
+    """
+
+    def __init__(self, max_trees=DEFAULT_MAX_TREES,
+                 max_bytes: Optional[int] = None) -> 'TreeRegistry':
+        """
+        Instantiate an empty registry
+
+        Args:
+            max_trees (int): max number of trees kept in memory. Must be >= 1
+            max_bytes (int): max estimated bytes held by cached trees OR None
+                for no memory budget
+
+        Raises:
+            ValueError: when max_trees or max_bytes is not a positive integer
+        """
+        if max_trees < 1:
+            raise ValueError("There must be at least 1 tree in the registry")
+
+        if (max_bytes is not None) and (max_bytes < 1):
+            raise ValueError("Memory budget must be a positive integer")
+
+        self._max_trees = max_trees
+        self._max_bytes = max_bytes
+
+        # Table IDs mapped to frequency table paths
+        self._tables: Dict[str, Path] = {}
+
+        # Resolved path mapped to (tree, file signature, estimated bytes).
+        # Ordered from least to most recently used
+        self._trees: 'OrderedDict[Path, Tuple]' = OrderedDict()
+        self._total_bytes = 0
+
+        self._num_hits = 0
+        self._num_misses = 0
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of trees currently cached
+        """
+        return len(self._trees)
+
+    def __contains__(self, key: Union[str, Path]) -> bool:
+        """
+        Indicates whether the tree for a table ID or path is currently cached.
+        Does not check whether its frequency table has changed on disk.
+        """
+        return self._resolve(key) in self._trees
+
+    def register(self, table_id: str, frequency_table: Union[str, Path]) \
+            -> 'TreeRegistry':
+        """
+        Method for registering a table ID for a frequency table file. The tree
+        is not built until it is first requested. Re-registering an ID with a
+        different file drops the previously cached tree.
+
+        Args:
+            table_id (str): name used to look up the tree
+            frequency_table (str | Path): frequency table file pathname
+
+        Returns:
+            TreeRegistry: current instance of the registry
+        """
+        with self._lock:
+            path = Path(frequency_table).resolve()
+            previous = self._tables.get(table_id)
+            self._tables[table_id] = path
+
+            if (previous is not None) and (previous != path):
+                self.evict(previous)
+
+        return self
+
+    def get(self, key: Union[str, Path]) -> 'HuffmanTree':
+        """
+        Method for retrieving the Huffman Tree for a table ID or a frequency
+        table path. The tree is built if it is not cached or if its frequency
+        table has been modified since it was built.
+
+        Args:
+            key (str | Path): registered table ID or frequency table pathname
+
+        Returns:
+            HuffmanTree: memoized Huffman Tree for the frequency table
+
+        Raises:
+            FileNotFoundError: if the frequency table does not exist
+            ValueError: if the frequency table is invalid
+        """
+        with self._lock:
+            path = self._resolve(key)
+
+            if not path.exists():
+                raise FileNotFoundError(
+                    f"ERROR: the files below do not exist\n- {path.name}\n")
+
+            signature = self._signature(path)
+            cached = self._trees.get(path)
+
+            if (cached is not None) and (cached[1] == signature):
+                # Case: tree is cached and its table is unchanged
+                self._trees.move_to_end(path)
+                self._num_hits += 1
+                return cached[0]
+
+            # Case: not cached or stale. Drop any stale tree and rebuild
+            self._num_misses += 1
+            self.evict(path)
+
+            huffman_tree = HuffmanTree(path, memo=True)
+            size = huffman_tree.get_memory_estimate()
+            self._trees[path] = (huffman_tree, signature, size)
+            self._total_bytes += size
+            self._evict_to_limits()
+
+            return huffman_tree
+
+    def evict(self, key: Union[str, Path]) -> 'TreeRegistry':
+        """
+        Method for removing the cached tree of a table ID or path, if any. The
+        table ID stays registered.
+
+        Args:
+            key (str | Path): registered table ID or frequency table pathname
+
+        Returns:
+            TreeRegistry: current instance of the registry
+        """
+        with self._lock:
+            cached = self._trees.pop(self._resolve(key), None)
+            if cached is not None:
+                self._total_bytes -= cached[2]
+
+        return self
+
+    def clear(self) -> 'TreeRegistry':
+        """
+        Method for removing all cached trees. Table IDs stay registered.
+
+        Returns:
+            TreeRegistry: current instance of the registry
+        """
+        with self._lock:
+            self._trees.clear()
+            self._total_bytes = 0
+
+        return self
+
+    def get_memory_estimate(self) -> int:
+        """
+        Getter method for the estimated bytes held by all cached trees
+
+        Returns:
+            int: sum of cached trees' estimated footprints
+        """
+        return self._total_bytes
+
+    def get_num_hits(self) -> int:
+        """
+        Getter method for the number of lookups served from the cache
+
+        Returns:
+            int: number of cache hits
+        """
+        return self._num_hits
+
+    def get_num_misses(self) -> int:
+        """
+        Getter method for the number of lookups that built a tree
+
+        Returns:
+            int: number of cache misses, including stale trees
+        """
+        return self._num_misses
+
+    def _resolve(self, key: Union[str, Path]) -> Path:
+        """
+        Helper method for converting a table ID or pathname into the absolute
+        path used as the cache key.
+
+        Args:
+            key (str | Path): registered table ID or frequency table pathname
+
+        Returns:
+            Path: absolute frequency table path
+        """
+        if isinstance(key, str) and (key in self._tables):
+            return self._tables[key]
+
+        return Path(key).resolve()
+
+    def _signature(self, path: Path) -> Tuple[int, int]:
+        """
+        Helper method for identifying a version of a frequency table file by
+        its modification time and size.
+
+        Args:
+            path (Path): frequency table path
+
+        Returns:
+            Tuple[int, int]: modification time (ns) and size (bytes)
+        """
+        stat = path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _evict_to_limits(self) -> 'TreeRegistry':
+        """
+        Helper method for evicting least recently used trees until both the
+        count and memory limits hold. The most recently used tree is always
+        kept, even if it alone exceeds the memory budget.
+
+        Returns:
+            TreeRegistry: current instance of the registry
+        """
+        def over_limits() -> bool:
+            if len(self._trees) > self._max_trees:
+                return True
+            return (self._max_bytes is not None) and \
+                (self._total_bytes > self._max_bytes)
+
+        while len(self._trees) > 1 and over_limits():
+            _, (_, _, size) = self._trees.popitem(last=False)
+            self._total_bytes -= size
+
+        return self
@@ -0,0 +1,213 @@
+"""
+tree_stats
+
+This module contains a class holding the structural statistics of a Huffman
+Tree, all gathered in one iterative preorder traversal. HuffmanTree computes
+it once, caches it, and drops it whenever the tree is rebuilt, so callers can
+read any statistic repeatedly without walking the tree again.
+"""
+from math import log2
+from sys import getsizeof
+from typing import Optional
+from hencoding.huffman_node import HuffmanNode
+
+
+class TreeStats:
+    """
+    Class holding a Huffman Tree's depth, node counts, code lengths, weighted
+    path length, entropy, and estimated memory footprint. Code lengths are
+    leaf depths, so codes do not need to be set beforehand.
+    """
+
+    def __init__(self, depth: int, leaf_count: int, node_count: int,
+                 min_code_length: int, max_code_length: int,
+                 weighted_path_length: int, total_frequency: int,
+                 entropy: float, memory_estimate: int) -> 'TreeStats':
+        """
+        Args:
+            depth (int): number of edges from the root to the deepest leaf
+            leaf_count (int): number of leaf nodes
+            node_count (int): number of nodes, leaves included
+            min_code_length (int): fewest bits in a leaf's code
+            max_code_length (int): most bits in a leaf's code
+            weighted_path_length (int): sum of each leaf's frequency times
+                its depth
+            total_frequency (int): sum of all leaves' frequencies
+            entropy (float): Shannon entropy of the leaf frequencies
+            memory_estimate (int): estimated footprint in bytes
+        """
+        self._depth = depth
+        self._leaf_count = leaf_count
+        self._node_count = node_count
+        self._min_code_length = min_code_length
+        self._max_code_length = max_code_length
+        self._weighted_path_length = weighted_path_length
+        self._total_frequency = total_frequency
+        self._entropy = entropy
+        self._memory_estimate = memory_estimate
+
+    @classmethod
+    def from_root(cls, root: Optional['HuffmanNode'], extra_bytes=0) \
+            -> 'TreeStats':
+        """
+        Alternate constructor that gathers statistics from a tree's nodes in
+        one preorder traversal.
+
+        Args:
+            root (HuffmanNode): root of the Huffman Tree OR None if empty
+            extra_bytes (int): bytes held outside the nodes, such as a memo
+                list or code table, added to the memory estimate
+
+        Returns:
+            TreeStats: statistics of the tree
+        """
+        leaf_count = 0
+        node_count = 0
+        min_code_length: Optional[int] = None
+        max_code_length = 0
+        weighted_path_length = 0
+        leaf_frequencies = []
+        memory_estimate = extra_bytes
+
+        # Preorder: visit node, then left, then right
+        stack = [(root, 0)] if root else []
+        while stack:
+            node, depth = stack.pop()
+            node_count += 1
+
+            code_value, _ = node.get_code_bits()
+            memory_estimate += getsizeof(node) + getsizeof(vars(node)) + \
+                getsizeof(node.get_characters()) + getsizeof(code_value)
+
+            if node.is_leaf():
+                leaf_count += 1
+                frequency = node.get_frequency()
+                leaf_frequencies.append(frequency)
+                weighted_path_length += frequency * depth
+                max_code_length = max(max_code_length, depth)
+                min_code_length = depth if min_code_length is None else \
+                    min(min_code_length, depth)
+                continue
+
+            if node.get_right():
+                stack.append((node.get_right(), depth + 1))
+            if node.get_left():
+                stack.append((node.get_left(), depth + 1))
+
+        total_frequency = sum(leaf_frequencies)
+        entropy = 0.0
+        for frequency in leaf_frequencies:
+            probability = frequency / total_frequency
+            entropy -= probability * log2(probability)
+
+        return cls(max_code_length, leaf_count, node_count,
+                   min_code_length or 0, max_code_length,
+                   weighted_path_length, total_frequency, entropy,
+                   memory_estimate)
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the statistics
+        """
+        return f"Depth: {self._depth}, Leaves: {self._leaf_count}, " \
+            f"Nodes: {self._node_count}, Code lengths: " \
+            f"{self._min_code_length}-{self._max_code_length} " \
+            f"(average {self.get_average_code_length():.4f}), " \
+            f"Weighted path length: {self._weighted_path_length}, " \
+            f"Memory: {self._memory_estimate}B"
+
+    def get_depth(self) -> int:
+        """
+        Getter method for the number of edges from the root to the deepest
+        leaf
+
+        Returns:
+            int: depth of the tree
+        """
+        return self._depth
+
+    def get_leaf_count(self) -> int:
+        """
+        Getter method for the number of leaf nodes, one per character
+
+        Returns:
+            int: number of leaves
+        """
+        return self._leaf_count
+
+    def get_node_count(self) -> int:
+        """
+        Getter method for the number of nodes, leaves included
+
+        Returns:
+            int: number of nodes
+        """
+        return self._node_count
+
+    def get_min_code_length(self) -> int:
+        """
+        Getter method for the fewest bits in a character's code
+
+        Returns:
+            int: min code length
+        """
+        return self._min_code_length
+
+    def get_max_code_length(self) -> int:
+        """
+        Getter method for the most bits in a character's code
+
+        Returns:
+            int: max code length
+        """
+        return self._max_code_length
+
+    def get_average_code_length(self) -> float:
+        """
+        Returns the average code length, weighted by each character's
+        frequency. If the tree is empty, returns 0
+
+        Returns:
+            float: average code length in bits per symbol
+        """
+        if self._total_frequency == 0:
+            return 0.0
+        return self._weighted_path_length / self._total_frequency
+
+    def get_weighted_path_length(self) -> int:
+        """
+        Getter method for the sum of each leaf's frequency times its depth,
+        the number of bits encoding the frequency table's text would take
+
+        Returns:
+            int: weighted path length
+        """
+        return self._weighted_path_length
+
+    def get_total_frequency(self) -> int:
+        """
+        Getter method for the sum of all leaves' frequencies
+
+        Returns:
+            int: total frequency
+        """
+        return self._total_frequency
+
+    def get_entropy(self) -> float:
+        """
+        Getter method for the Shannon entropy of the leaf frequencies
+
+        Returns:
+            float: entropy in bits per symbol
+        """
+        return self._entropy
+
+    def get_memory_estimate(self) -> int:
+        """
+        Getter method for the estimated footprint of the tree at the time the
+        statistics were gathered
+
+        Returns:
+            int: estimated footprint in bytes
+        """
+        return self._memory_estimate
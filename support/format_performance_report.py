@@ -8,19 +8,32 @@ performance report.
 Author: Rani Hinnawi
 Date: 2023-08-08
 """
+from typing import TYPE_CHECKING, Dict, List, Optional, TextIO, Tuple
 from support.performance import Performance
+from support.output_formatters import format_projected_size
+from hencoding.huffman_tree import HuffmanTree
 
+if TYPE_CHECKING:
+    # Only annotated, so the support layer does not import the pipeline
+    from hencoding.pipeline import StageQueue
 
-def format_performance_report(metrics: 'Performance', micro_sec=True) -> str:
+
+def format_performance_report(metrics: 'Performance', micro_sec=True,
+                              huffman_tree: Optional['HuffmanTree'] = None) \
+        -> str:
     """
     Function that formats the size and runtime data logged for each success and
     failure into a report. Runtimes are outputted by size in order from 
-    smallest to largest.
+    smallest to largest, followed by peak and net change in memory when it
+    was tracked. Compression efficiency totals follow, compared against
+    the frequency table's entropy when a Huffman Tree is given.
 
     Args:
         metrics (Performance): Performance object with logged metrics data
         micro_sec (bool): True if saving runtime in microseconds, otherwise
             False
+        huffman_tree (HuffmanTree): Huffman Tree used for the conversions OR
+            None to omit the table statistics
 
     Returns:
         str: logged successes and failures, formatted to suit a text file
@@ -33,9 +46,11 @@ def format_performance_report(metrics: 'Performance', micro_sec=True) -> str:
     write.append(f"Total number of successes: {metrics.get_num_successes()}")
 
     successes = metrics.get_successes()
+    success_memory = metrics.get_success_memory()
     for size in sorted(successes.keys()):
         runtime = sorted(successes[size])
-        write.append(f"{size}: {runtime}")
+        write.append(f"{size}: {runtime}" +
+                     format_memory(success_memory.get(size, [])))
 
     write.append("\n")
 
@@ -43,11 +58,18 @@ def format_performance_report(metrics: 'Performance', micro_sec=True) -> str:
     write.append(f"Total number of errors: {metrics.get_num_errors()}")
 
     errors = metrics.get_errors()
+    error_memory = metrics.get_error_memory()
     for size in sorted(errors.keys()):
         runtime = sorted(errors[size])
-        write.append(f"{size}: {runtime}\n")
+        write.append(f"{size}: {runtime}" +
+                     format_memory(error_memory.get(size, [])) + "\n")
 
-    write.append("\nFormat:\n\tstring_size: [runtime1, ..., runtimeN]")
+    if metrics.is_tracking_memory():
+        write.append("\nFormat:\n\tstring_size: [runtime1, ..., runtimeN], "
+                     "Peak: [bytes1, ..., bytesN], Delta: [bytes1, ..., "
+                     "bytesN]")
+    else:
+        write.append("\nFormat:\n\tstring_size: [runtime1, ..., runtimeN]")
     footer = "\tNOTE: Runtimes measured in"
 
     if micro_sec:
@@ -57,4 +79,264 @@ def format_performance_report(metrics: 'Performance', micro_sec=True) -> str:
 
     write.append(footer)
 
+    if metrics.get_sample_rate() > 1:
+        write.append(format_sampling(metrics, micro_sec))
+
+    if metrics.is_tracking_memory():
+        write.append("\tNOTE: Memory measured in bytes allocated by Python. "
+                     "Tracking it slows down runtimes")
+
+    write.append(format_compression_report(metrics, huffman_tree))
+
+    return '\n'.join(write)
+
+
+def format_sampling(metrics: 'Performance', micro_sec=True) -> str:
+    """
+    Function that formats the sample rate, how many runs were measured, and
+    the total runtime of all successes estimated from the measured ones.
+
+    Args:
+        metrics (Performance): Performance object with logged metrics data
+        micro_sec (bool): True if runtimes were logged in microseconds,
+            otherwise nanoseconds
+
+    Returns:
+        str: sampling notes, formatted to suit a text file
+    """
+    measured = metrics.get_num_sampled_successes() + \
+        metrics.get_num_sampled_errors()
+    runtime = sum(sum(runtimes)
+                  for runtimes in metrics.get_successes().values())
+    estimated = int(runtime * metrics.get_success_scale())
+    unit = "μs" if micro_sec else "ns"
+
+    return f"\tNOTE: Sampled 1 in {metrics.get_sample_rate()} lines. " \
+        f"{measured} runs were measured and are listed above. Totals count " \
+        f"every run. Estimated total success runtime: {estimated}{unit}"
+
+
+def format_memory(memory: List[Tuple[int, int]]) -> str:
+    """
+    Function that formats the peak and net change in memory logged for one
+    size, each sorted from smallest to largest.
+
+    Args:
+        memory (List[Tuple[int, int]]): (peak, delta) bytes per run
+
+    Returns:
+        str: peak and delta lists OR an empty string if none were logged
+    """
+    if not memory:
+        return ""
+
+    peaks = sorted(peak for peak, _ in memory)
+    deltas = sorted(delta for _, delta in memory)
+    return f", Peak: {peaks}, Delta: {deltas}"
+
+
+def format_compression_report(metrics: 'Performance',
+                              huffman_tree: Optional['HuffmanTree'] = None) \
+        -> str:
+    """
+    Function that formats the compression metrics logged across all successes
+    into a report. Given the Huffman Tree, it also reports the frequency
+    table's Shannon entropy, the average code length, and the gaps between
+    them. A large gap between observed bits per symbol and the average code
+    length means the frequency table no longer matches the input.
+
+    Args:
+        metrics (Performance): Performance object with logged metrics data
+        huffman_tree (HuffmanTree): Huffman Tree used for the conversions OR
+            None to omit the table statistics
+
+    Returns:
+        str: compression totals and table statistics, formatted to suit a text
+            file
+    """
+    write = ["\n-------Compression Report-------\n"]
+
+    bits_per_symbol = metrics.get_total_bits_per_symbol()
+    if metrics.get_sample_rate() > 1:
+        # Only measured successes logged totals. Scale them to all successes
+        scale = metrics.get_success_scale()
+        write.append("Total symbols (estimated): "
+                     f"{round(metrics.get_total_symbols() * scale)}")
+        write.append("Total bits (estimated): "
+                     f"{round(metrics.get_total_bits() * scale)}")
+    else:
+        write.append(f"Total symbols: {metrics.get_total_symbols()}")
+        write.append(f"Total bits: {metrics.get_total_bits()}")
+    write.append(f"Bits per symbol: {bits_per_symbol:.4f}")
+
+    if huffman_tree is not None:
+        entropy = huffman_tree.get_entropy()
+        average_code_length = huffman_tree.get_average_code_length()
+
+        write.append(f"Table entropy: {entropy:.4f}")
+        write.append(f"Average code length: {average_code_length:.4f}")
+        write.append("Redundancy (average code length - entropy): "
+                     f"{average_code_length - entropy:.4f}")
+
+        if metrics.get_total_symbols() > 0:
+            write.append("Observed gap (bits per symbol - entropy): "
+                         f"{bits_per_symbol - entropy:.4f}")
+
+    write.append("\nFormat:\n\tNOTE: Symbols are encodable characters. "
+                 "All ratios measured in bits per symbol")
+
+    return '\n'.join(write)
+
+
+def format_dry_run_report(metrics: 'Performance') -> str:
+    """
+    Function that formats the projected encoded size of all successfully
+    measured lines of a dry run, and its ratio to their size as 8-bit
+    characters.
+
+    Args:
+        metrics (Performance): Performance object with logged metrics data
+
+    Returns:
+        str: projected totals, formatted to suit a text file
+    """
+    write = ["\n-------Dry Run Report-------\n"]
+
+    # Sizes are logged once per success, so weigh each by its run count
+    total_size = sum(size * len(runtimes)
+                     for size, runtimes in metrics.get_successes().items())
+
+    total_bits = metrics.get_total_bits()
+    label = ""
+    if metrics.get_sample_rate() > 1:
+        # Only measured successes were logged. Scale them to all successes
+        scale = metrics.get_success_scale()
+        total_size = round(total_size * scale)
+        total_bits = round(total_bits * scale)
+        label = " (estimated)"
+
+    write.append(f"Total size (characters){label}: {total_size}")
+    write.append(f"Total projected{label}: " +
+                 format_projected_size(total_bits, total_size))
+    write.append("\nFormat:\n\tNOTE: Ratio is projected bits over 8 bits "
+                 "per original character. Nothing was encoded")
+
+    return '\n'.join(write)
+
+
+def format_pipeline_report(queues: Dict[str, 'StageQueue'],
+                           queue_size: int) -> str:
+    """
+    Function that formats the depth and stall times of each pipeline queue.
+    Put stalls mean the stage after the queue is the bottleneck, and get
+    stalls mean the stage before it is.
+
+    Args:
+        queues (Dict[str, StageQueue]): pipeline queues by name
+        queue_size (int): max number of items held by each queue
+
+    Returns:
+        str: queue metrics, formatted to suit a text file
+    """
+    write = ["\n-------Pipeline Report-------\n"]
+    write.append(f"Queue size: {queue_size}")
+
+    for name, queue in queues.items():
+        write.append(f"{name}: Max depth: {queue.get_max_depth()}, "
+                     f"Average depth: {queue.get_average_depth():.2f}, "
+                     f"Put stalls: {queue.get_put_stall() // 1000}μs, "
+                     f"Get stalls: {queue.get_get_stall() // 1000}μs")
+
+    write.append("\nFormat:\n\tNOTE: Put stalls are time spent waiting on a "
+                 "full queue, get stalls on an empty one. Stalls measured in "
+                 "microseconds (μs)")
+
+    return '\n'.join(write)
+
+
+def format_model_report(tree_usage: Dict[str, int],
+                        frequency_tables: List[TextIO]) -> str:
+    """
+    Function that formats the number of blocks encoded with each tree of a
+    block model.
+
+    Args:
+        tree_usage (Dict[str, int]): number of blocks per tree ID, with
+            inline trees under 'inline'
+        frequency_tables (List[TextIO]): frequency table of each tree, in
+            tree ID order
+
+    Returns:
+        str: blocks per tree, formatted to suit a text file
+    """
+    write = ["\n-------Block Model Report-------\n"]
+
+    for tree_id, frequency_table in enumerate(frequency_tables):
+        write.append(f"Tree {tree_id} ({frequency_table}): "
+                     f"{tree_usage.get(str(tree_id), 0)} blocks")
+
+    write.append(f"Inline trees: {tree_usage.get('inline', 0)} blocks")
+    write.append("\nFormat:\n\tNOTE: Counts cover encoded blocks only")
+
+    return '\n'.join(write)
+
+
+def format_transform_report(
+        stage_metrics: Dict[str, Tuple[int, int, int, int]]) -> str:
+    """
+    Function that formats each transform stage's runtime and the symbols it
+    took in and gave out, so CPU time can be weighed against output size.
+
+    Args:
+        stage_metrics (Dict[str, Tuple[int, int, int, int]]): number of
+            calls, total runtime (ns), symbols in, and symbols out per stage
+
+    Returns:
+        str: metrics per stage, formatted to suit a text file
+    """
+    write = ["\n-------Transform Report-------\n"]
+
+    for name, (calls, runtime, symbols_in, symbols_out) in \
+            stage_metrics.items():
+        ratio = symbols_out / symbols_in if symbols_in else 0.0
+        write.append(f"{name}: Calls: {calls}, Runtime: {runtime // 1000}μs, "
+                     f"Symbols in: {symbols_in}, Symbols out: {symbols_out}, "
+                     f"Ratio: {ratio:.4f}")
+
+    write.append("\nFormat:\n\tNOTE: Stages listed in the order applied "
+                 "before encoding, and undone in reverse after decoding. "
+                 "Runtimes measured in microseconds (μs)")
+
+    return '\n'.join(write)
+
+
+def format_engine_report(engine: str, engine_usage: Dict[str, Tuple[int, int]],
+                         thresholds: List[Tuple[int, str]]) -> str:
+    """
+    Function that formats the engine setting, the engine chosen per line size
+    in auto mode, and the lines and characters each engine encoded.
+
+    Args:
+        engine (str): engine name given, OR 'auto'
+        engine_usage (Dict[str, Tuple[int, int]]): lines and characters
+            encoded per engine
+        thresholds (List[Tuple[int, str]]): engine chosen from each
+            calibrated line size upward. Empty if not in auto mode
+
+    Returns:
+        str: engine choices and usage, formatted to suit a text file
+    """
+    write = ["\n-------Engine Report-------\n", f"Engine: {engine}"]
+
+    if thresholds:
+        write.append("Chosen by size: " + ", ".join(
+            f"{size}+ chars: {name}" for size, name in thresholds))
+
+    for name, (lines, chars) in engine_usage.items():
+        write.append(f"{name}: Lines: {lines}, Characters: {chars}")
+
+    write.append("\nFormat:\n\tNOTE: Lines shorter than the smallest "
+                 "calibrated size use its engine. Decoding always walks "
+                 "the Huffman Tree")
+
     return '\n'.join(write)
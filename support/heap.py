@@ -2,37 +2,82 @@
 heap
 
 This module contains a Heap class that implements the Min Heap ADT, including
-several optional methods. The underlying data structure is a Python List. As a 
+several optional methods. The underlying data structure is a Python List. As a
 stylistic choice, methods that would otherwise return None will instead return
-self, allowing for method chaining. 
+self, allowing for method chaining.
+
+The heap may be d-ary, with each node having up to d children, for fewer
+levels to percolate through. Given a key function, the heap orders items by
+their keys alone, so cheap keys (such as tuples of ints) are compared instead
+of the items themselves.
 
 Author: Rani Hinnawi
 Date: 2023-08-08
 """
-from typing import List, TypeVar, Optional
+from typing import Any, Callable, Iterable, List, Optional, Tuple, TypeVar
 
 # Set up generic type for stack to remain type-agnostic
 T = TypeVar('T')
 
+DEFAULT_ARITY = 2
+
 
 class Heap:
     """
     This class holds items of any type in a generic Min Heap data structure.
-    Items must be of the same type and allow for >, <, !=, and == comparisons.
+    Items must be of the same type and allow for >, <, !=, and == comparisons,
+    unless a key function is given, in which case only keys are compared.
     All uses of the term 'heap' specifically reference a min heap.
     """
 
-    def __init__(self):
+    def __init__(self, arity=DEFAULT_ARITY,
+                 key: Optional[Callable[[T], Any]] = None):
         """
         Instantiate an empty heap
+
+        Args:
+            arity (int): max number of children per node. Must be >= 2
+            key (Callable): function returning the value each item is ordered
+                by OR None to compare items directly
+
+        Raises:
+            ValueError: when arity is less than 2
+        """
+        if arity < 2:
+            raise ValueError("Heap arity must be at least 2")
+
+        self._arity = arity
+        self._key = key
+
+        # Entries are (ordering value, item) pairs. Only the ordering value is
+        # ever compared, and it is the item itself without a key function
+        self._heap: List[Tuple[Any, T]] = []
+
+    @classmethod
+    def from_iterable(cls, items: Iterable[T], arity=DEFAULT_ARITY,
+                      key: Optional[Callable[[T], Any]] = None) -> 'Heap':
+        """
+        Alternate constructor that builds a heap from all items at once in
+        linear time, rather than pushing them one at a time.
+
+        Args:
+            items (Iterable[T]): items being added to heap
+            arity (int): max number of children per node. Must be >= 2
+            key (Callable): function returning the value each item is ordered
+                by OR None to compare items directly
+
+        Returns:
+            'Heap': new heap holding all items
         """
-        self.heap: List[Optional[T]] = []
+        heap = cls(arity=arity, key=key)
+        heap._heap = [heap._entry(item) for item in items]
+        return heap.heapify()
 
     def __str__(self) -> str:
         """
         Return a basic string representation of the heap
         """
-        return f"Heap[{', '.join(map(str, self.heap))}]"
+        return f"Heap[{', '.join(map(str, self.get_items()))}]"
 
     def heap_push(self, item: T) -> 'Heap':
         """
@@ -41,10 +86,10 @@ class Heap:
         Args:
             item (T): new item being added to heap
 
-        Returns: 
+        Returns:
             'Heap': current instance of the heap
         """
-        self.heap.append(item)
+        self._heap.append(self._entry(item))
         self._percolate_up(self.size() - 1)
         return self
 
@@ -56,7 +101,8 @@ class Heap:
         Returns:
             'Heap': current instance of the heap
         """
-        for i in range(self.size() // 2, -1, -1):
+        # Percolate down every parent node, starting from the last one
+        for i in range((self.size() - 2) // self._arity, -1, -1):
             self._percolate_down(i)
 
         return self
@@ -82,7 +128,7 @@ class Heap:
         """
         if self.is_empty():
             raise IndexError("Heap is empty")
-        return self.heap[0]
+        return self._heap[0][1]
 
     def size(self) -> int:
         """
@@ -91,7 +137,26 @@ class Heap:
         Returns:
             int: number of items on the heap
         """
-        return len(self.heap)
+        return len(self._heap)
+
+    def get_items(self) -> List[T]:
+        """
+        Getter method for the items on the heap, in the order of the
+        underlying List. Only the first item is guaranteed to be the min.
+
+        Returns:
+            List[T]: items on the heap
+        """
+        return [item for _, item in self._heap]
+
+    def get_arity(self) -> int:
+        """
+        Getter method for the max number of children per node.
+
+        Returns:
+            int: arity of the heap
+        """
+        return self._arity
 
     def heap_pop(self):
         """
@@ -107,72 +172,137 @@ class Heap:
         if self.is_empty():
             raise IndexError("Heap is empty")
 
-        root = self.heap[0]
-        last_element = self.heap.pop()
+        root = self._heap[0]
+        last_element = self._heap.pop()
 
         if not self.is_empty():
             # Default case: >= 1 element(s) remain on the heap
-            self.heap[0] = last_element
+            self._heap[0] = last_element
             self._percolate_down(0)
-        return root
+        return root[1]
+
+    def pushpop(self, item: T) -> T:
+        """
+        Adds new item to the heap, then removes and returns the min value.
+        Faster than heap_push followed by heap_pop, as at most one percolation
+        is needed.
+
+        Args:
+            item (T): new item being added to heap
+
+        Returns:
+            T: min value among the heap and the new item
+        """
+        entry = self._entry(item)
+
+        if self.is_empty() or not (self._heap[0][0] < entry[0]):
+            # Case: new item is the min. The heap is left unchanged
+            return item
+
+        root = self._heap[0]
+        self._heap[0] = entry
+        self._percolate_down(0)
+        return root[1]
+
+    def replace(self, item: T) -> T:
+        """
+        Removes and returns the min value, then adds new item to the heap.
+        Faster than heap_pop followed by heap_push, as only one percolation is
+        needed. The returned value may be larger than the new item.
+
+        Args:
+            item (T): new item being added to heap
+
+        Returns:
+            T: min value in heap before the new item was added
+
+        Raises:
+            IndexError: if heap is empty
+        """
+        if self.is_empty():
+            raise IndexError("Heap is empty")
+
+        root = self._heap[0]
+        self._heap[0] = self._entry(item)
+        self._percolate_down(0)
+        return root[1]
+
+    def _entry(self, item: T) -> Tuple[Any, T]:
+        """
+        Helper method for pairing an item with the value it is ordered by.
+
+        Args:
+            item (T): item being added to heap
+
+        Returns:
+            Tuple[Any, T]: ordering value and item
+        """
+        return (self._key(item) if self._key else item), item
 
     def _percolate_up(self, index: int) -> 'Heap':
         """
         Helper method for moving an item up the heap to a correct position
-        such that it is larger than its child nodes.
+        such that it is smaller than its child nodes.
 
         Args:
-            index (int): position of item in the underlying List, self.heap
+            index (int): position of item in the underlying List, self._heap
 
         Returns:
             'Heap': current instance of the heap
         """
-        parent_index = (index - 1) // 2
-        while index > 0 and self.heap[index] < self.heap[parent_index]:
-            # Swap
-            self.heap[index], self.heap[parent_index] = \
-                self.heap[parent_index], self.heap[index]
-
-            # Update indices to reflect item's new position and new parent
+        heap = self._heap
+        arity = self._arity
+        entry = heap[index]
+
+        # Shift larger parents down, then place the item in the gap
+        while index > 0:
+            parent_index = (index - 1) // arity
+            parent = heap[parent_index]
+            if not entry[0] < parent[0]:
+                break
+
+            heap[index] = parent
             index = parent_index
-            parent_index = (index - 1) // 2
 
+        heap[index] = entry
         return self
 
     def _percolate_down(self, index: int) -> 'Heap':
         """
         Helper method for moving an item down the heap to a correct position
-        such that it is larger than its child nodes.
+        such that it is smaller than its child nodes.
 
         Args:
-            index (int): position of item in the underlying List, self.heap
+            index (int): position of item in the underlying List, self._heap
 
         Returns:
             'Heap': current instance of the heap
         """
-        child_index = 2 * index + 1
-        value = self.heap[index]
-        heap_size = self.size()
+        heap = self._heap
+        arity = self._arity
+        heap_size = len(heap)
+        entry = heap[index]
+        child_index = arity * index + 1
 
         while child_index < heap_size:
             # Find the min among the node and all the node's children
-            min_value = value
+            min_value = entry[0]
             min_index = -1
 
-            for i in range(2):
-                child = child_index + i
-                if child < heap_size and self.heap[child] < min_value:
-                    min_value = self.heap[child]
+            for child in range(child_index,
+                               min(child_index + arity, heap_size)):
+                if heap[child][0] < min_value:
+                    min_value = heap[child][0]
                     min_index = child
 
-            if min_value == value:
-                return self
-            else:
-                # Case: current item is smaller than at least one child. Swap
-                # and continue percolating down heap
-                self.heap[index], self.heap[min_index] = \
-                    self.heap[min_index], self.heap[index]
-                index = min_index
-                child_index = 2 * index + 1
+            if min_index == -1:
+                break
+
+            # Case: current item is larger than at least one child. Move the
+            # min child up and continue percolating down heap
+            heap[index] = heap[min_index]
+            index = min_index
+            child_index = arity * index + 1
 
+        heap[index] = entry
         return self
@@ -0,0 +1,147 @@
+"""
+heap_benchmark
+
+This module contains functions for benchmarking the Heap class against
+Python's built-in heapq module. Each benchmark builds a heap of random
+integers, then runs a Huffman-style merge loop until one item remains, which
+pops twice and pushes once per merge. It can be run as a program:
+python -m support.heap_benchmark [--size N] [--repeats N]
+"""
+import argparse
+import heapq
+from random import randint
+from time import time_ns
+from typing import Callable, Dict, List
+from support.heap import Heap
+
+
+def _merge_with_heap(items: List[int], arity=2, bulk=False, key=None,
+                     replace=False) -> int:
+    """
+    Helper function for running the merge loop on a Heap instance.
+
+    Args:
+        items (List[int]): values being added to the heap
+        arity (int): max number of children per node
+        bulk (bool): True if building with from_iterable, otherwise pushing
+            one item at a time
+        key (Callable): key function OR None to compare items directly
+        replace (bool): True if merging with replace, otherwise popping twice
+            and pushing once
+
+    Returns:
+        int: last remaining value
+    """
+    if bulk:
+        heap = Heap.from_iterable(items, arity=arity, key=key)
+    else:
+        heap = Heap(arity=arity, key=key)
+        for item in items:
+            heap.heap_push(item)
+
+    while heap.size() > 1:
+        first = heap.heap_pop()
+        if replace:
+            heap.replace(first + heap.get_root())
+        else:
+            heap.heap_push(first + heap.heap_pop())
+
+    return heap.heap_pop()
+
+
+def _merge_with_heapq(items: List[int]) -> int:
+    """
+    Helper function for running the merge loop with heapq.
+
+    Args:
+        items (List[int]): values being added to the heap
+
+    Returns:
+        int: last remaining value
+    """
+    heap = list(items)
+    heapq.heapify(heap)
+
+    while len(heap) > 1:
+        first = heapq.heappop(heap)
+        heapq.heapreplace(heap, first + heap[0])
+
+    return heapq.heappop(heap)
+
+
+def benchmark_heaps(size: int, repeats=5) -> Dict[str, int]:
+    """
+    Function that times each heap configuration on the same random input and
+    keeps the best runtime of all repeats.
+
+    Args:
+        size (int): number of items per heap. Must be >= 1
+        repeats (int): number of runs per configuration. Must be >= 1
+
+    Returns:
+        Dict[str, int]: best runtime (ns) per configuration
+
+    Raises:
+        ValueError: when size or repeats is not a positive integer
+    """
+    if (size < 1) or (repeats < 1):
+        raise ValueError("Size and repeats must be positive integers")
+
+    items = [randint(1, size) for _ in range(size)]
+
+    configurations: Dict[str, Callable[[], int]] = {
+        "heapq": lambda: _merge_with_heapq(items),
+        "Heap (binary, push)": lambda: _merge_with_heap(items),
+        "Heap (binary, bulk + replace)":
+            lambda: _merge_with_heap(items, bulk=True, replace=True),
+        "Heap (4-ary, bulk + replace)":
+            lambda: _merge_with_heap(items, arity=4, bulk=True, replace=True),
+        "Heap (binary, key, bulk + replace)":
+            lambda: _merge_with_heap(items, bulk=True, key=lambda x: (x,),
+                                     replace=True),
+    }
+
+    runtimes = {}
+    for name, merge in configurations.items():
+        best = None
+        for _ in range(repeats):
+            start = time_ns()
+            merge()
+            runtime = time_ns() - start
+            best = runtime if best is None else min(best, runtime)
+        runtimes[name] = best
+
+    return runtimes
+
+
+def format_benchmark(runtimes: Dict[str, int]) -> str:
+    """
+    Function that formats benchmark runtimes, relative to heapq.
+
+    Args:
+        runtimes (Dict[str, int]): best runtime (ns) per configuration
+
+    Returns:
+        str: one line per configuration with its runtime in microseconds
+    """
+    baseline = runtimes.get("heapq")
+    write = []
+
+    for name, runtime in runtimes.items():
+        line = f"{name}: {runtime // 1000}μs"
+        if baseline:
+            line += f" ({runtime / baseline:.1f}x heapq)"
+        write.append(line)
+
+    return '\n'.join(write)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--size", type=int, default=10000,
+                            help="Number of items per heap")
+    arg_parser.add_argument("--repeats", type=int, default=5,
+                            help="Number of runs per configuration")
+    args = arg_parser.parse_args()
+
+    print(format_benchmark(benchmark_heaps(args.size, args.repeats)))
@@ -0,0 +1,351 @@
+"""
+metrics_export
+
+This module contains functions for exporting the metrics logged by a
+Performance object in machine-readable formats: JSON, and the Prometheus text
+exposition format. Two exported JSON runs can be compared to flag throughput
+or latency regressions beyond a threshold, so upgrades can be gated on
+performance. The comparison can be run as a program, exiting with status 1
+on a regression:
+python -m support.metrics_export compare baseline_json candidate_json
+        [--threshold X]
+"""
+import argparse
+import json
+from sys import exit as sys_exit
+from typing import Any, Dict, List, TextIO
+from support.performance import Performance
+
+# Default max relative change before a metric counts as a regression
+DEFAULT_THRESHOLD = 0.1
+
+PROMETHEUS_PREFIX = "hencoding"
+
+# Summary metrics compared between runs. True if larger values are better
+COMPARED_METRICS = {
+    "throughput_chars_per_sec": True,
+    "latency_mean": False,
+    "latency_p50": False,
+    "latency_p95": False,
+}
+
+
+def _percentile(values: List[int], fraction: float) -> int:
+    """
+    Helper function for the nearest-rank percentile of sorted values.
+
+    Args:
+        values (List[int]): values sorted from smallest to largest
+        fraction (float): percentile as a fraction between 0 and 1
+
+    Returns:
+        int: value at the percentile OR 0 if there are no values
+    """
+    if not values:
+        return 0
+
+    rank = max(int(round(fraction * len(values) + 0.5)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def metrics_to_dict(metrics: 'Performance', micro_sec=True) \
+        -> Dict[str, Any]:
+    """
+    Function that gathers the metrics logged by a Performance object into a
+    dictionary of JSON-serializable values. Runtimes are grouped by size as
+    in the performance report, and summarized as latency percentiles and as
+    throughput over all successes. When sampling, runtimes and totals cover
+    measured lines only, and estimated totals scale them up to all
+    successes. Without sampling, estimated totals equal the totals.
+
+    Args:
+        metrics (Performance): Performance object with logged metrics data
+        micro_sec (bool): True if runtimes were logged in microseconds,
+            otherwise nanoseconds
+
+    Returns:
+        Dict[str, Any]: exported metrics
+    """
+    successes = metrics.get_successes()
+    errors = metrics.get_errors()
+
+    runtimes = sorted(runtime for size_runtimes in successes.values()
+                      for runtime in size_runtimes)
+    total_runtime = sum(runtimes)
+    total_size = sum(size * len(size_runtimes)
+                     for size, size_runtimes in successes.items())
+    scale = metrics.get_success_scale()
+
+    # Throughput in characters per second of runtime
+    seconds = total_runtime / (1e6 if micro_sec else 1e9)
+    throughput = total_size / seconds if seconds else 0.0
+
+    exported = {
+        "runtime_unit": "us" if micro_sec else "ns",
+        "num_successes": metrics.get_num_successes(),
+        "num_errors": metrics.get_num_errors(),
+        "sample_rate": metrics.get_sample_rate(),
+        "num_sampled_successes": metrics.get_num_sampled_successes(),
+        "num_sampled_errors": metrics.get_num_sampled_errors(),
+        "successes": {str(size): sorted(size_runtimes)
+                      for size, size_runtimes in sorted(successes.items())},
+        "errors": {str(size): sorted(size_runtimes)
+                   for size, size_runtimes in sorted(errors.items())},
+        "summary": {
+            "total_size": total_size,
+            "total_runtime": total_runtime,
+            "estimated_total_size": round(total_size * scale),
+            "estimated_total_runtime": round(total_runtime * scale),
+            "throughput_chars_per_sec": throughput,
+            "latency_mean": total_runtime / len(runtimes) if runtimes else 0,
+            "latency_p50": _percentile(runtimes, 0.5),
+            "latency_p95": _percentile(runtimes, 0.95),
+            "latency_max": runtimes[-1] if runtimes else 0,
+        },
+        "compression": {
+            "total_symbols": metrics.get_total_symbols(),
+            "total_bits": metrics.get_total_bits(),
+            "estimated_total_symbols": round(
+                metrics.get_total_symbols() * scale),
+            "estimated_total_bits": round(metrics.get_total_bits() * scale),
+            "bits_per_symbol": metrics.get_total_bits_per_symbol(),
+        },
+    }
+
+    if metrics.is_tracking_memory():
+        exported["memory"] = {
+            str(size): [list(entry) for entry in memory]
+            for size, memory in sorted(metrics.get_success_memory().items())}
+
+    return exported
+
+
+def export_json(metrics: 'Performance', output_file: TextIO,
+                micro_sec=True) -> Dict[str, Any]:
+    """
+    Function that writes the metrics logged by a Performance object to a
+    JSON file.
+
+    Args:
+        metrics (Performance): Performance object with logged metrics data
+        output_file (TextIO): file to which the metrics are written
+        micro_sec (bool): True if runtimes were logged in microseconds,
+            otherwise nanoseconds
+
+    Returns:
+        Dict[str, Any]: exported metrics
+    """
+    exported = metrics_to_dict(metrics, micro_sec)
+
+    with open(output_file, 'w', encoding="utf-8") as output:
+        json.dump(exported, output, indent=2)
+        output.write('\n')
+
+    return exported
+
+
+def format_prometheus(metrics: 'Performance', micro_sec=True) -> str:
+    """
+    Function that formats the metrics logged by a Performance object in the
+    Prometheus text exposition format. Runtimes are converted to seconds and
+    exported as a summary, with one series per size. Counters hold measured
+    values only, and estimates for all lines when sampling are exported as
+    separate gauges.
+
+    Args:
+        metrics (Performance): Performance object with logged metrics data
+        micro_sec (bool): True if runtimes were logged in microseconds,
+            otherwise nanoseconds
+
+    Returns:
+        str: metrics in Prometheus text format
+    """
+    exported = metrics_to_dict(metrics, micro_sec)
+    summary = exported["summary"]
+    compression = exported["compression"]
+    to_seconds = 1e-6 if micro_sec else 1e-9
+    write = []
+
+    def add_metric(name: str, metric_type: str, description: str,
+                   samples: List[str]) -> None:
+        write.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {description}")
+        write.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} {metric_type}")
+        write.extend(f"{PROMETHEUS_PREFIX}_{name}{sample}"
+                     for sample in samples)
+
+    add_metric("conversions_total", "counter", "Lines converted by status",
+               [f'{{status="success"}} {exported["num_successes"]}',
+                f'{{status="error"}} {exported["num_errors"]}'])
+
+    add_metric("sampled_conversions_total", "counter",
+               "Lines timed and measured by status",
+               [f'{{status="success"}} {exported["num_sampled_successes"]}',
+                f'{{status="error"}} {exported["num_sampled_errors"]}'])
+
+    add_metric("sample_rate", "gauge", "Lines per timed line",
+               [f' {exported["sample_rate"]}'])
+
+    runtime_samples = []
+    for status, key in (("success", "successes"), ("error", "errors")):
+        for size, runtimes in exported[key].items():
+            labels = f'status="{status}",size="{size}"'
+            runtime_samples.append(
+                f"_sum{{{labels}}} {sum(runtimes) * to_seconds:.9f}")
+            runtime_samples.append(f"_count{{{labels}}} {len(runtimes)}")
+
+    add_metric("runtime_seconds", "summary",
+               "Runtime per line by status and size", runtime_samples)
+
+    # Prometheus reserves the quantile label for summaries and histograms
+    add_metric("latency_seconds", "gauge",
+               "Runtime percentiles of successful lines",
+               [f'{{percentile="{percentile}"}} '
+                f'{summary[name] * to_seconds:.9f}'
+                for percentile, name in (("50", "latency_p50"),
+                                         ("95", "latency_p95"),
+                                         ("100", "latency_max"))])
+    add_metric("throughput_chars_per_second", "gauge",
+               "Characters converted per second of runtime",
+               [f' {summary["throughput_chars_per_sec"]:.3f}'])
+    add_metric("symbols_total", "counter",
+               "Symbols in measured successful lines",
+               [f' {compression["total_symbols"]}'])
+    add_metric("bits_total", "counter", "Bits in measured successful lines",
+               [f' {compression["total_bits"]}'])
+    add_metric("symbols_estimated", "gauge",
+               "Estimated symbols in all successful lines",
+               [f' {compression["estimated_total_symbols"]}'])
+    add_metric("bits_estimated", "gauge",
+               "Estimated bits in all successful lines",
+               [f' {compression["estimated_total_bits"]}'])
+    add_metric("bits_per_symbol", "gauge", "Bits per symbol",
+               [f' {compression["bits_per_symbol"]:.6f}'])
+
+    if "memory" in exported:
+        add_metric("memory_peak_bytes", "gauge",
+                   "Max peak memory of successful lines by size",
+                   [f'{{size="{size}"}} {max(peak for peak, _ in memory)}'
+                    for size, memory in exported["memory"].items()])
+
+    return '\n'.join(write) + '\n'
+
+
+def export_prometheus(metrics: 'Performance', output_file: TextIO,
+                      micro_sec=True) -> str:
+    """
+    Function that writes the metrics logged by a Performance object to a file
+    in the Prometheus text exposition format.
+
+    Args:
+        metrics (Performance): Performance object with logged metrics data
+        output_file (TextIO): file to which the metrics are written
+        micro_sec (bool): True if runtimes were logged in microseconds,
+            otherwise nanoseconds
+
+    Returns:
+        str: metrics in Prometheus text format
+    """
+    exposition = format_prometheus(metrics, micro_sec)
+
+    with open(output_file, 'w', encoding="utf-8") as output:
+        output.write(exposition)
+
+    return exposition
+
+
+def load_json(input_file: TextIO) -> Dict[str, Any]:
+    """
+    Function that reads metrics exported by export_json.
+
+    Args:
+        input_file (TextIO): JSON file written by export_json
+
+    Returns:
+        Dict[str, Any]: exported metrics
+
+    Raises:
+        ValueError: when the file is not exported metrics
+    """
+    with open(input_file, 'r', encoding="utf-8") as file:
+        try:
+            exported = json.load(file)
+        except json.JSONDecodeError as jde:
+            raise ValueError(f"INVALID METRICS: {input_file} is not "
+                             "JSON") from jde
+
+    if not isinstance(exported, dict) or ("summary" not in exported):
+        raise ValueError(f"INVALID METRICS: {input_file} has no summary")
+
+    return exported
+
+
+def compare_metrics(baseline: Dict[str, Any], candidate: Dict[str, Any],
+                    threshold=DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Function that compares the summaries of two exported runs. A metric
+    regresses when it is worse in the candidate than in the baseline by more
+    than threshold, relative to the baseline: lower throughput, or higher
+    latency.
+
+    Args:
+        baseline (Dict[str, Any]): exported metrics of the reference run
+        candidate (Dict[str, Any]): exported metrics of the run being checked
+        threshold (float): max relative change allowed. Must be >= 0
+
+    Returns:
+        List[str]: one message per regressed metric. Empty if none regressed
+
+    Raises:
+        ValueError: when threshold is negative or runtime units differ
+    """
+    if threshold < 0:
+        raise ValueError("Threshold must be >= 0")
+
+    if baseline.get("runtime_unit") != candidate.get("runtime_unit"):
+        raise ValueError("INVALID METRICS: runtime units differ")
+
+    regressions = []
+    for name, higher_is_better in COMPARED_METRICS.items():
+        before = baseline["summary"].get(name, 0)
+        after = candidate["summary"].get(name, 0)
+
+        if before == 0:
+            # Case: nothing to compare against
+            continue
+
+        change = (after - before) / before
+        worse = -change if higher_is_better else change
+
+        if worse > threshold:
+            regressions.append(f"{name}: {before:.2f} -> {after:.2f} "
+                               f"({change:+.1%}, threshold {threshold:.1%})")
+
+    return regressions
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    subparsers = arg_parser.add_subparsers(dest="command", required=True)
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Flags regressions between two exported runs")
+    compare_parser.add_argument("baseline", type=str,
+                                help="Baseline metrics JSON pathname")
+    compare_parser.add_argument("candidate", type=str,
+                                help="Candidate metrics JSON pathname")
+    compare_parser.add_argument("--threshold", type=float,
+                                default=DEFAULT_THRESHOLD,
+                                help="(Optional) Max relative change allowed")
+    args = arg_parser.parse_args()
+
+    try:
+        found = compare_metrics(load_json(args.baseline),
+                                load_json(args.candidate), args.threshold)
+    except (FileNotFoundError, ValueError) as error:
+        arg_parser.error(str(error))
+
+    if found:
+        print("REGRESSION:\n\t" + "\n\t".join(found))
+        sys_exit(1)
+
+    print("OK: no regressions")
@@ -2,25 +2,52 @@
 output_formatters
 
 This module contains helper functions called to format strings intended to be
-outputted to a text file.
+outputted to a text file. Output is a list of items separated by newlines.
+An item is either text, or a function that writes its text to an open file,
+so long items such as Huffman Trees are streamed instead of built as strings.
 
 Author: Rani Hinnawi
 Date: 2023-08-08
 """
-from typing import TextIO, List
+from typing import Callable, Iterable, TextIO, List, Union
 
+# Output item: text, OR a function writing its text to an open file
+OutputItem = Union[str, Callable[[TextIO], None]]
 
-def write_to_output(output_file: TextIO, output_text: List[str]) -> None:
+
+def write_items(output: TextIO, items: Iterable[OutputItem]) -> None:
+    """
+    Helper function for writing output items to an open file, separated by
+    newlines. Functions are called with the file to write their text.
+
+    Args:
+        output (TextIO): open file or stream written to
+        items (Iterable[OutputItem]): text or writer functions
+    """
+    separator = ""
+
+    for item in items:
+        output.write(separator)
+        if callable(item):
+            item(output)
+        else:
+            output.write(item)
+        separator = '\n'
+
+
+def write_to_output(output_file: TextIO, output_text: List[OutputItem]) \
+        -> None:
     """
     Helper function for writing to an output file the text from a list of
     result and formatting strings.
 
     Args:
         output_file (TextIO): file to which the results are written
-        output_text (List[str]): list of results
+        output_text (List[OutputItem]): list of results, as text or writer
+            functions
     """
     with open(output_file, 'w', encoding="utf-8") as output:
-        output.write('\n'.join(output_text))
+        write_items(output, output_text)
         output.write("\nDone.")
 
     return
@@ -115,3 +142,53 @@ def format_decoded_results(line_number: int, expression: str, result: str,
     write.append(f"{metrics}\n")
 
     return '\n'.join(write)
+
+
+def format_estimated_results(line_number: int, expression: str, result: str,
+                             metrics: str, error=False, chars_per_line=80) \
+        -> str:
+    """
+    Function that formats the inputted expression and the projected output
+    size given from a dry run of the encoding process.
+
+    Args:
+        line_number (int): number for labelling lines in the output
+        expression (str): original expression being measured
+        result (str): projected size and ratio OR error message
+        metrics (str): string representation of Performance values (size,
+            runtime)
+        error (bool): indicator of whether result is an error message
+
+    Returns:
+        str: conditionally formatted results
+    """
+    # Format header line with original expression
+    prefix = f"{line_number}. Original: "
+    expression = break_string(expression, chars_per_line - len(prefix))
+    write = [prefix + expression]
+
+    # Format and append result with error handling
+    prefix = "\tError - " if error else "\tProjected: "
+    result = break_string(result, chars_per_line - len(prefix))
+    write.append(prefix + result)
+
+    # Add metrics and return
+    write.append(f"{metrics}\n")
+
+    return '\n'.join(write)
+
+
+def format_projected_size(bits: int, size: int) -> str:
+    """
+    Helper function for describing the projected encoded size of an
+    expression and its ratio to the expression's size as 8-bit characters.
+
+    Args:
+        bits (int): projected number of encoded bits
+        size (int): number of characters in the original expression
+
+    Returns:
+        str: projected bits, bytes, and ratio
+    """
+    ratio = bits / (size * 8) if size else 0.0
+    return f"{bits} bits ({(bits + 7) // 8} bytes), Ratio: {ratio:.4f}"
@@ -3,60 +3,69 @@ output_tree_formatters
 
 This module contains helper functions called to format strings intended to be
 outputted to a text file. These are specifically for formatting Huffman Trees
-and nodes.
+and nodes. Trees are traversed iteratively, and formatted nodes are generated
+one at a time, so large trees can be streamed to a file without building the
+whole string.
 
 Author: Rani Hinnawi
 Date: 2023-08-08
 """
-from sys import setrecursionlimit
-from typing import Optional, List, Tuple
+from typing import Iterator, Optional, TextIO
 from hencoding.huffman_tree import HuffmanTree
 from hencoding.huffman_node import HuffmanNode
 
-# Set recursion limit. Python default: 1000. Should not need to exceed number
-# of letters in Latin (English) alphabet. +1 for buffer. Limit extended for
-# Python built-in functions
-RECURSION_LIMIT = 500
-setrecursionlimit(RECURSION_LIMIT)
 
+def _preorder(root: Optional['HuffmanNode'], leaves_only=False) \
+        -> Iterator['HuffmanNode']:
+    """
+    Generator for an iterative preorder traversal of a Huffman Tree.
 
-def format_huffman_tree(huffman_tree: 'HuffmanTree', nodes_per_line: int) \
-        -> str:
+    Args:
+        root (HuffmanNode): root of a Huffman tree or subtree OR None
+        leaves_only (bool): True if only leaf nodes are yielded
+
+    Yields:
+        HuffmanNode: nodes in preorder
     """
-    Function that formats the number of Huffman Tree nodes per line for easier
-    readability in an output file.
+    stack = [root] if root else []
+
+    while stack:
+        node = stack.pop()
+
+        if not (leaves_only and not node.is_leaf()):
+            yield node
+
+        # Push right first so the left subtree is visited first
+        if node.get_right():
+            stack.append(node.get_right())
+        if node.get_left():
+            stack.append(node.get_left())
+
+
+def _wrap_lines(node_strs: Iterator[str], nodes_per_line: int) \
+        -> Iterator[str]:
+    """
+    Generator for joining formatted nodes with commas, placing a node on a new
+    indented line once nodes_per_line nodes have followed the last break.
 
     Args:
-        huffman_tree (HuffmanTree): Huffman Tree being printed out
+        node_strs (Iterator[str]): formatted nodes
         nodes_per_line (int): max number of Huffman Nodes printed per line
 
-    Returns:
-        str: string representation of Huffman Nodes
+    Yields:
+        str: each formatted node along with its preceding separator
 
     Raises:
         ValueError: when nodes_per_line is not a positive integer
     """
-    def preorder(root: Optional['HuffmanNode'], nodes_left=nodes_per_line) \
-            -> Tuple[List[str], int]:
-        """
-        Preorder traversal of Huffman Tree and its nodes.
-
-        Args:
-            root (HuffmanNode): root of a Huffman tree or subtree OR None
-
-        Returns:
-            List[str]: list of Python nodes as key-value pairs in format
-                character: frequency
-        """
-        # Add nodes to 'representation' list
-        rep = []
-
-        # Visit root, then left, then right
-        if not root:
-            return rep, nodes_left
+    if nodes_per_line < 1:
+        error = "There must be at least 1 node per line"
+        raise ValueError(error)
 
-        node_str = str(root)
+    nodes_left = nodes_per_line
+    separator = ""
 
+    for node_str in node_strs:
         # Node is placed on new line when 0 nodes left per line are remaining
         if nodes_left == 0:
             node_str = "\n\t" + node_str
@@ -64,28 +73,72 @@ def format_huffman_tree(huffman_tree: 'HuffmanTree', nodes_per_line: int) \
         else:
             nodes_left -= 1
 
-        # Add HuffmanNode string, then visit left and right branches
-        rep.append(node_str)
+        yield separator + node_str
+        separator = ", "
 
-        if root.get_left():
-            left, nodes_left = preorder(root.get_left(), nodes_left)
-            rep.extend(left)
 
-        if root.get_right():
-            right, nodes_left = preorder(
-                root.get_right(), nodes_left)
-            rep.extend(right)
+def iter_huffman_tree(huffman_tree: 'HuffmanTree', nodes_per_line: int) \
+        -> Iterator[str]:
+    """
+    Generator for the preorder Huffman Tree nodes in format characters:
+    frequency, with line breaks for easier readability in an output file.
+    Joined, the pieces match format_huffman_tree.
 
-        # Returns preorder representation list and remaining nodes for
-        # possible recursive calls
-        return rep, nodes_left
+    Args:
+        huffman_tree (HuffmanTree): Huffman Tree being printed out
+        nodes_per_line (int): max number of Huffman Nodes printed per line
 
-    if nodes_per_line < 1:
-        error = "There must be at least 1 node per line"
-        raise ValueError(error)
+    Yields:
+        str: each formatted node along with its preceding separator
 
-    output, _ = preorder(huffman_tree.get_root())
-    return ", ".join(output)
+    Raises:
+        ValueError: when nodes_per_line is not a positive integer
+    """
+    nodes = _preorder(huffman_tree.get_root())
+    return _wrap_lines((str(node) for node in nodes), nodes_per_line)
+
+
+def iter_huffman_tree_binary_codes(huffman_tree: 'HuffmanTree',
+                                   nodes_per_line: int) -> Iterator[str]:
+    """
+    Generator for the preorder Huffman Tree leaf nodes and their binary
+    Huffman Codes, with line breaks for easier readability in an output file.
+    Joined, the pieces match format_huffman_tree_binary_codes.
+
+    Args:
+        huffman_tree (HuffmanTree): Huffman Tree codes being printed out
+        nodes_per_line (int): max number of Huffman Nodes printed per line
+
+    Yields:
+        str: each formatted node along with its preceding separator
+
+    Raises:
+        ValueError: when nodes_per_line is not a positive integer
+    """
+    yield '\t'
+
+    leaves = _preorder(huffman_tree.get_root(), leaves_only=True)
+    yield from _wrap_lines((f"{leaf} - {leaf.get_code()}" for leaf in leaves),
+                           nodes_per_line)
+
+
+def format_huffman_tree(huffman_tree: 'HuffmanTree', nodes_per_line: int) \
+        -> str:
+    """
+    Function that formats the number of Huffman Tree nodes per line for easier
+    readability in an output file.
+
+    Args:
+        huffman_tree (HuffmanTree): Huffman Tree being printed out
+        nodes_per_line (int): max number of Huffman Nodes printed per line
+
+    Returns:
+        str: string representation of Huffman Nodes
+
+    Raises:
+        ValueError: when nodes_per_line is not a positive integer
+    """
+    return ''.join(iter_huffman_tree(huffman_tree, nodes_per_line))
 
 
 def format_huffman_tree_binary_codes(huffman_tree: 'HuffmanTree',
@@ -105,60 +158,30 @@ def format_huffman_tree_binary_codes(huffman_tree: 'HuffmanTree',
     Raises:
         ValueError: when nodes_per_line is not a positive integer
     """
-    def preorder(root: Optional['HuffmanNode'], nodes_left=nodes_per_line) \
-            -> Tuple[List[str], int]:
-        """
-        Preorder traversal of Huffman Tree and its nodes. Only outputs leaf
-        nodes.
-
-        Args:
-            root (HuffmanNode): root of a Huffman tree or subtree OR None
-
-        Returns:
-            List[str]: list of Python nodes as key-value pairs in format
-                character: Huffman Code
-        """
-        # Add nodes to 'representation' list
-        rep = []
-
-        # Check root, then visit left and right subtrees
-        if not root:
-            # Case: Node (root) does not exist
-            return rep, nodes_left
-
-        if root.is_leaf():
-            # Case: root is a leaf. Can add it and its code to output
-            # node_str = f"{root.get_characters()}: {root.get_code()}"
-            node_str = f"{root} - {root.get_code()}"
-
-            # Node is placed on new line when 0 nodes left per line are remaining
-            if nodes_left == 0:
-                node_str = "\n\t" + node_str
-                nodes_left = nodes_per_line
-            else:
-                nodes_left -= 1
-
-            rep.append(node_str)
-            return rep, nodes_left
-        else:
-            # Get left subtree leaf nodes
-            if root.get_left():
-                left, nodes_left = preorder(root.get_left(), nodes_left)
-                rep.extend(left)
+    return ''.join(iter_huffman_tree_binary_codes(huffman_tree,
+                                                  nodes_per_line))
 
-            # Get right subtree leaf nodes
-            if root.get_right():
-                right, nodes_left = preorder(
-                    root.get_right(), nodes_left)
-                rep.extend(right)
 
-            # Returns preorder representation list and remaining nodes for
-            # possible recursive calls
-            return rep, nodes_left
+def write_huffman_tree(output: TextIO, huffman_tree: 'HuffmanTree',
+                       nodes_per_line: int, binary_codes=False) -> None:
+    """
+    Function that streams a formatted Huffman Tree to an open writer, one
+    node at a time, without building the whole string.
 
-    if nodes_per_line < 1:
-        error = "There must be at least 1 node per line"
-        raise ValueError(error)
+    Args:
+        output (TextIO): open file or stream written to
+        huffman_tree (HuffmanTree): Huffman Tree being printed out
+        nodes_per_line (int): max number of Huffman Nodes printed per line
+        binary_codes (bool): True if writing leaf nodes and their binary
+            Huffman Codes, otherwise all nodes and their frequencies
+
+    Raises:
+        ValueError: when nodes_per_line is not a positive integer
+    """
+    if binary_codes:
+        pieces = iter_huffman_tree_binary_codes(huffman_tree, nodes_per_line)
+    else:
+        pieces = iter_huffman_tree(huffman_tree, nodes_per_line)
 
-    output, _ = preorder(huffman_tree.get_root())
-    return '\t' + ", ".join(output)
+    for piece in pieces:
+        output.write(piece)
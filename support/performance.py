@@ -3,16 +3,22 @@ performance
 
 This module holds a class that tracks metrics and performance. It allows for
 maintaining a timer for runtime, storing size of a process (user's discretion),
-and tracking previous successes' and errors' sizes and runtimes. Methods that 
-would otherwise return None instead return current instance to allow for method
-chaining.
+and tracking previous successes' and errors' sizes and runtimes. Memory tracking
+is optional: when on, the peak and net change in memory allocated between start
+and stop are measured with tracemalloc and logged alongside runtimes. Sampling
+is optional too: with a sample rate of N, only 1 in N processes is timed and
+logged, while the rest are only counted, so success and error counts stay
+exact and logged totals can be scaled up to estimate the whole run. Methods
+that would otherwise return None instead return current instance to allow for
+method chaining.
 
 Author: Rani Hinnawi
 Date: 2023-07-25
 """
 from sys import stderr
 from time import time_ns
-from typing import Dict, List
+from typing import Dict, List, Tuple
+import tracemalloc
 
 
 class Performance:
@@ -20,10 +26,16 @@ class Performance:
     Class for logging space and time performance based stored size and runtime.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, track_memory=False, sample_rate=1) -> None:
         """
         Creates instance of Performance class that saves start time, stop time,
         and size of input. It also logs previous runs. Times are all in ns
+
+        Args:
+            track_memory (bool): True if measuring memory between start and
+                stop, otherwise False
+            sample_rate (int): 1 in sample_rate processes is fully measured.
+                Must be >= 1
         """
         self._size = 0
         self._start_time = time_ns()
@@ -36,6 +48,34 @@ class Performance:
         self._num_successes = 0
         self._num_errors = 0
 
+        # Sampling: every sample_rate-th process is timed and logged. The
+        # others are only counted in the totals above
+        self._sample_rate = 1
+        self._sample_counter = 0
+        self._num_sampled_successes = 0
+        self._num_sampled_errors = 0
+
+        # Compression metrics: symbols and bits of the current process, and
+        # running totals across all logged successes
+        self._symbols = 0
+        self._bits = 0
+        self._total_symbols = 0
+        self._total_bits = 0
+
+        # Memory metrics (bytes): peak above and net change from the memory
+        # allocated at start. Logged as (peak, delta) pairs per size
+        self._track_memory = False
+        self._started_tracemalloc = False
+        self._start_memory = 0
+        self._memory_peak = 0
+        self._memory_delta = 0
+        self._success_memory: Dict[int, List[Tuple[int, int]]] = {}
+        self._error_memory: Dict[int, List[Tuple[int, int]]] = {}
+
+        # Validated first, so an invalid rate never leaves tracemalloc on
+        self.set_sample_rate(sample_rate)
+        self.set_memory_tracking(track_memory)
+
     def __str__(self):
         """
         Returns a string representation of the Performance class
@@ -69,28 +109,226 @@ class Performance:
         """
         return self._size
 
+    def set_compression(self, symbols: int, bits: int) -> 'Performance':
+        """
+        Setter method for the compression metrics of the current process: the
+        number of symbols (characters) and the number of binary bits they
+        correspond to. Encoding maps symbols to bits, decoding bits to symbols
+
+        Args:
+            symbols (int): number of symbols in the process. Must be >= 0
+            bits (int): number of binary bits in the process. Must be >= 0
+
+        Returns:
+            "Performance": Current instance of Performance class with updated
+                compression attributes
+        """
+        if (symbols < 0) or (bits < 0):
+            print("Invalid compression metrics. Must be >= 0. Automatically "
+                  "setting to 0.", file=stderr)
+
+        self._symbols = max(symbols, 0)
+        self._bits = max(bits, 0)
+        return self
+
+    def get_symbols(self) -> int:
+        """
+        Getter method for number of symbols in the current process
+
+        Returns:
+            int: Stored number of symbols
+        """
+        return self._symbols
+
+    def get_bits(self) -> int:
+        """
+        Getter method for number of bits in the current process
+
+        Returns:
+            int: Stored number of bits
+        """
+        return self._bits
+
+    def get_bits_per_symbol(self) -> float:
+        """
+        Returns the average number of bits per symbol of the current process.
+        If no symbols are stored, returns 0
+
+        Returns:
+            float: Ratio of stored bits to stored symbols or 0
+        """
+        return self._bits / self._symbols if self._symbols else 0.0
+
+    def get_compression_metrics(self) -> str:
+        """
+        Returns a string representation of the current compression metrics
+        """
+        return f"Symbols: {self._symbols}, Bits: {self._bits}, " \
+            f"Bits per symbol: {self.get_bits_per_symbol():.4f}"
+
+    def set_memory_tracking(self, track_memory: bool) -> 'Performance':
+        """
+        Setter method for memory tracking. Turning it on starts tracemalloc if
+        it is not already tracing. Turning it off stops tracemalloc only if
+        this instance started it. Only allocations made by Python in this
+        process are traced, and tracing slows down measured runtimes
+
+        Args:
+            track_memory (bool): True if measuring memory between start and
+                stop, otherwise False
+
+        Returns:
+            "Performance": Current instance of Performance class with updated
+                memory tracking
+        """
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        elif (not track_memory) and self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+        self._track_memory = track_memory
+        return self
+
+    def is_tracking_memory(self) -> bool:
+        """
+        Indicates whether memory is measured between start and stop
+
+        Returns:
+            bool: True if tracking memory, otherwise False
+        """
+        return self._track_memory
+
+    def set_sample_rate(self, sample_rate: int) -> 'Performance':
+        """
+        Setter method for the sample rate. 1 in sample_rate processes is
+        fully measured, starting with the next one
+
+        Args:
+            sample_rate (int): number of processes per measured process
+
+        Returns:
+            "Performance": Current instance of Performance class with updated
+                sample rate
+
+        Raises:
+            ValueError: if sample_rate is not a positive integer
+        """
+        if sample_rate < 1:
+            raise ValueError("Sample rate must be a positive integer")
+
+        self._sample_rate = sample_rate
+        self._sample_counter = 0
+        return self
+
+    def get_sample_rate(self) -> int:
+        """
+        Getter method for the number of processes per measured process
+
+        Returns:
+            int: sample rate. 1 if every process is measured
+        """
+        return self._sample_rate
+
+    def sample(self) -> bool:
+        """
+        Decides whether the next process is fully measured, with start, stop,
+        and log_success or log_error, or only counted, with count_success or
+        count_error. Every sample_rate-th call returns True, beginning with
+        the first
+
+        Returns:
+            bool: True if the next process is measured, otherwise False
+        """
+        sampled = self._sample_counter == 0
+        self._sample_counter = (self._sample_counter + 1) % self._sample_rate
+        return sampled
+
+    def count_success(self) -> 'Performance':
+        """
+        Method for counting an unmeasured process as a success
+
+        Returns:
+            "Performance": Current instance of Performance class with updated
+                number of successes
+        """
+        self._num_successes += 1
+        return self
+
+    def count_error(self) -> 'Performance':
+        """
+        Method for counting an unmeasured process as an error
+
+        Returns:
+            "Performance": Current instance of Performance class with updated
+                number of errors
+        """
+        self._num_errors += 1
+        return self
+
     def start(self) -> 'Performance':
         """
-        Setter method for start time. Essentially starts a timer in nanoseconds
+        Setter method for start time. Essentially starts a timer in nanoseconds.
+        If tracking memory, also resets the peak and saves the memory allocated
 
         Returns: 
             "Performance": Current instance of Performance class with updated 
                 _start_time attribute
         """
+        if self._track_memory:
+            tracemalloc.reset_peak()
+            self._start_memory = tracemalloc.get_traced_memory()[0]
+
         self._start_time = time_ns()
         return self
 
     def stop(self) -> 'Performance':
         """
-        Setter method for stop time. Essentially ends a timer in nanoseconds
+        Setter method for stop time. Essentially ends a timer in nanoseconds.
+        If tracking memory, also saves the peak and net change in memory
+        allocated since start
 
         Returns: 
             "Performance": Current instance of Performance class with updated 
                 _stop_time attribute
         """
         self._stop_time = time_ns()
+
+        if self._track_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            self._memory_peak = max(peak - self._start_memory, 0)
+            self._memory_delta = current - self._start_memory
+
         return self
 
+    def get_memory_peak(self) -> int:
+        """
+        Getter method for the peak memory allocated between start and stop,
+        above the memory allocated at start. 0 if not tracking memory
+
+        Returns:
+            int: Peak memory in bytes
+        """
+        return self._memory_peak
+
+    def get_memory_delta(self) -> int:
+        """
+        Getter method for the net change in memory allocated between start and
+        stop. Negative if memory was freed. 0 if not tracking memory
+
+        Returns:
+            int: Change in memory in bytes
+        """
+        return self._memory_delta
+
+    def get_memory_metrics(self) -> str:
+        """
+        Returns a string representation of the current memory metrics
+        """
+        return f"Peak memory: {self._memory_peak}B, " \
+            f"Memory delta: {self._memory_delta}B"
+
     def get_runtime(self) -> int:
         """
         Returns runtime based off stored start and stop times. If start is
@@ -119,7 +357,13 @@ class Performance:
         Prints a string representation of current Performance metrics using a
         runtime measured in microseconds (μs).
         """
-        return f"Size: {self._size}, Runtime: {self.get_runtime_micro_sec()}μs"
+        metrics = f"Size: {self._size}, " \
+            f"Runtime: {self.get_runtime_micro_sec()}μs"
+
+        if self._track_memory:
+            metrics += f", {self.get_memory_metrics()}"
+
+        return metrics
 
     def log_success(self, micro_sec=False) -> 'Performance':
         """
@@ -142,8 +386,14 @@ class Performance:
         else:
             self._successes[self._size] = [new_log]
 
-        # Update number of success
+        if self._track_memory:
+            self._log_memory(self._success_memory)
+
+        # Update number of success and compression totals
         self._num_successes += 1
+        self._num_sampled_successes += 1
+        self._total_symbols += self._symbols
+        self._total_bits += self._bits
 
         return self
 
@@ -168,9 +418,29 @@ class Performance:
         else:
             self._errors[self._size] = [new_log]
 
+        if self._track_memory:
+            self._log_memory(self._error_memory)
+
         # Update number of errors
         self._num_errors += 1
+        self._num_sampled_errors += 1
+
+        return self
+
+    def _log_memory(self, memory_log: Dict[int, List[Tuple[int, int]]]) \
+            -> 'Performance':
+        """
+        Helper method for logging the current memory metrics by size
+
+        Args:
+            memory_log (Dict[int, List[Tuple[int, int]]]): successes' or
+                errors' memory log
 
+        Returns:
+            "Performance": Current instance of Performance class
+        """
+        memory_log.setdefault(self._size, []).append(
+            (self._memory_peak, self._memory_delta))
         return self
 
     def get_successes(self) -> Dict[int, List[int]]:
@@ -195,6 +465,65 @@ class Performance:
         """
         return self._errors
 
+    def get_success_memory(self) -> Dict[int, List[Tuple[int, int]]]:
+        """
+        Getter method for retrieving the memory logged for successes. They are
+        formatted as key-value pairs, with keys being the sizes and values
+        being a list of (peak, delta) bytes for successful runs given that
+        size. Empty if not tracking memory
+
+        Returns:
+            dict: Key-value pairs of memory used by all successful runs
+        """
+        return self._success_memory
+
+    def get_error_memory(self) -> Dict[int, List[Tuple[int, int]]]:
+        """
+        Getter method for retrieving the memory logged for failures. They are
+        formatted as key-value pairs, with keys being the sizes and values
+        being a list of (peak, delta) bytes for failed runs given that size.
+        Empty if not tracking memory
+
+        Returns:
+            dict: Key-value pairs of memory used by all failed runs
+        """
+        return self._error_memory
+
+    def merge(self, other: 'Performance') -> 'Performance':
+        """
+        Method for adding the successes, errors, memory, and compression
+        totals logged by another Performance object to this one, such as to
+        aggregate the metrics of several runs. Current (unlogged) metrics are
+        left unchanged
+
+        Args:
+            other (Performance): Performance object whose logs are added
+
+        Returns:
+            "Performance": Current instance of Performance class with the
+                other's logs added
+        """
+        for own_log, other_log in ((self._successes, other.get_successes()),
+                                   (self._errors, other.get_errors()),
+                                   (self._success_memory,
+                                    other.get_success_memory()),
+                                   (self._error_memory,
+                                    other.get_error_memory())):
+            for size, logs in other_log.items():
+                own_log.setdefault(size, []).extend(logs)
+
+        self._num_successes += other.get_num_successes()
+        self._num_errors += other.get_num_errors()
+        self._num_sampled_successes += other.get_num_sampled_successes()
+        self._num_sampled_errors += other.get_num_sampled_errors()
+
+        # Runs sampled at different rates are reported at the sparsest one
+        self._sample_rate = max(self._sample_rate, other.get_sample_rate())
+        self._total_symbols += other.get_total_symbols()
+        self._total_bits += other.get_total_bits()
+
+        return self
+
     def get_num_successes(self) -> int:
         """
         Getter method that returns the total number of successful runs logge
@@ -212,3 +541,68 @@ class Performance:
             int: Number of errors logged
         """
         return self._num_errors
+
+    def get_num_sampled_successes(self) -> int:
+        """
+        Getter method that returns the number of successful runs measured and
+        logged, rather than only counted
+
+        Returns:
+            int: Number of successful runs logged with runtimes
+        """
+        return self._num_sampled_successes
+
+    def get_num_sampled_errors(self) -> int:
+        """
+        Getter method that returns the number of failed runs measured and
+        logged, rather than only counted
+
+        Returns:
+            int: Number of errors logged with runtimes
+        """
+        return self._num_sampled_errors
+
+    def get_success_scale(self) -> float:
+        """
+        Returns the factor that scales totals logged for measured successes up
+        to estimates for all successes. 1 if every success was measured or
+        none were
+
+        Returns:
+            float: Ratio of successes to measured successes
+        """
+        if self._num_sampled_successes == 0:
+            return 1.0
+        return self._num_successes / self._num_sampled_successes
+
+    def get_total_symbols(self) -> int:
+        """
+        Getter method that returns the total number of symbols across all
+        logged successful runs. When sampling, only measured runs are logged
+
+        Returns:
+            int: Total number of symbols logged
+        """
+        return self._total_symbols
+
+    def get_total_bits(self) -> int:
+        """
+        Getter method that returns the total number of bits across all logged
+        successful runs. When sampling, only measured runs are logged
+
+        Returns:
+            int: Total number of bits logged
+        """
+        return self._total_bits
+
+    def get_total_bits_per_symbol(self) -> float:
+        """
+        Returns the average number of bits per symbol across all logged
+        successful runs. If no symbols are logged, returns 0
+
+        Returns:
+            float: Ratio of total bits to total symbols or 0
+        """
+        if self._total_symbols == 0:
+            return 0.0
+        return self._total_bits / self._total_symbols
@@ -0,0 +1,95 @@
+"""
+tests
+
+This package holds regression tests for the hencoding and support packages.
+Each check compares a conversion mode against a plain HuffmanEncoding run on
+the input files in resources, so a mode that drifts from the serial results
+fails. Run from the root folder with:
+python -m unittest discover tests
+"""
+import re
+from pathlib import Path
+from typing import List
+from hencoding.huffman_tree import HuffmanTree
+from hencoding.huffman_encoding import HuffmanEncoding
+
+ROOT = Path(__file__).resolve().parent.parent
+RESOURCES = ROOT / "resources"
+FREQUENCY_TABLE = ROOT / "hencoding" / "DefaultFreqTable.txt"
+
+# Input files holding text that encodes without errors, and encoded files
+CLEAR_TEXT_FILES = ("ClearText.txt", "repeats.txt", "single_char.txt")
+ENCODED_FILES = ("Encoded.txt", "encoded_all_valid.txt",
+                 "encoded_all_invalid.txt", "encoded_empty_lines.txt",
+                 "encoded_repeats.txt")
+
+# Measured values that change from run to run
+_RUNTIMES = re.compile(r"(Runtime: |stalls: )[0-9]+|\[[0-9, ]+\]")
+
+
+def make_encoding(memo=False) -> 'HuffmanEncoding':
+    """
+    Helper function for building the plain encoder every mode is compared
+    against
+
+    Args:
+        memo (bool): True if memoizing HuffmanTree nodes, otherwise False
+
+    Returns:
+        HuffmanEncoding: encoder for the default frequency table
+    """
+    return HuffmanEncoding(HuffmanTree(FREQUENCY_TABLE, memo=memo))
+
+
+def clear_lines() -> List[str]:
+    """
+    Helper function for reading the lines of the clear text files that
+    encode to at least 1 bit without errors
+
+    Returns:
+        List[str]: stripped lines, in file order
+    """
+    encoding = make_encoding()
+    lines = []
+
+    for name in CLEAR_TEXT_FILES:
+        with open(RESOURCES / name, 'r', encoding="utf-8") as file:
+            for line in file:
+                try:
+                    if encoding.encode(line.strip()):
+                        lines.append(line.strip())
+                except ValueError:
+                    continue
+
+    return lines
+
+
+def symbols_of(encoding: 'HuffmanEncoding', expression: str) -> str:
+    """
+    Helper function for the text that decoding an encoded expression gives
+    back: its encodable characters, lowercased
+
+    Args:
+        encoding (HuffmanEncoding): encoder whose punctuation is skipped
+        expression (str): clear text
+
+    Returns:
+        str: encodable characters of the expression
+    """
+    allowed = encoding.get_allowed_nonalpha_chars()
+    return ''.join(char.lower() for char in expression
+                   if not ((char in allowed) or char.isspace()))
+
+
+def mask_runtimes(text: str) -> str:
+    """
+    Helper function for replacing measured runtimes in an output file, so
+    outputs of two runs can be compared
+
+    Args:
+        text (str): output file text
+
+    Returns:
+        str: text with every runtime replaced by X
+    """
+    return _RUNTIMES.sub(lambda match: (match.group(1) or "") + "X", text)
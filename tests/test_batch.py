@@ -0,0 +1,86 @@
+"""
+test_batch
+
+This module contains regression tests for listing and converting the files of
+a batch.
+"""
+import unittest
+from pathlib import Path
+from shutil import copy
+from tempfile import TemporaryDirectory
+from hencoding.batch import collect_inputs, run_batch
+from hencoding.run import run
+from tests import FREQUENCY_TABLE, RESOURCES, ENCODED_FILES, mask_runtimes
+
+
+class TestBatch(unittest.TestCase):
+    """
+    Batches must skip only their own outputs, reject shared outputs, and
+    write the same output files as plain runs.
+    """
+
+    def setUp(self) -> None:
+        self._directory = TemporaryDirectory()
+        self._path = Path(self._directory.name)
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def _write(self, name: str, text="abc\n") -> Path:
+        path = self._path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        return path
+
+    def test_skips_outputs_of_this_batch(self) -> None:
+        source = self._write("a.txt")
+        self._write("a_output.txt")
+
+        self.assertEqual(collect_inputs(str(self._path)),
+                         [(source, self._path / "a_output.txt")])
+
+    def test_keeps_inputs_named_like_outputs(self) -> None:
+        # No b.txt in the batch, so b_output.txt is an input
+        source = self._write("b_output.txt")
+
+        self.assertEqual(
+            collect_inputs(str(self._path)),
+            [(source, self._path / "b_output_output.txt")])
+
+    def test_shared_output_raises(self) -> None:
+        self._write("one/a.txt")
+        self._write("two/a.txt")
+
+        with self.assertRaisesRegex(ValueError, "both written"):
+            collect_inputs(str(self._path / "*" / "a.txt"),
+                           output_dir=self._path)
+
+    def test_manifest_shared_output_raises(self) -> None:
+        manifest = self._write("manifest.txt", "a.txt\tout.txt\n"
+                               "b.txt\tout.txt\n")
+
+        with self.assertRaisesRegex(ValueError, "both written"):
+            collect_inputs(str(manifest), manifest=True)
+
+    def test_outputs_match_plain_runs(self) -> None:
+        for name in ENCODED_FILES:
+            copy(RESOURCES / name, self._path / name)
+
+        pairs = collect_inputs(str(self._path))
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                run_batch(FREQUENCY_TABLE, pairs, self._path / "report.txt",
+                          workers=workers, decode=True)
+
+                for source, output in pairs:
+                    expected = self._path / "expected.txt"
+                    expected.touch()
+                    run(FREQUENCY_TABLE, source, expected, memo=True,
+                        decode=True)
+                    self.assertEqual(
+                        mask_runtimes(output.read_text(encoding="utf-8")),
+                        mask_runtimes(expected.read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+test_block_model
+
+This module contains regression tests for encoding each block of a line with
+the best of several Huffman Trees.
+"""
+import unittest
+from pathlib import Path
+from string import ascii_lowercase
+from tempfile import TemporaryDirectory
+from typing import Iterator, Tuple
+from hencoding.huffman_tree import HuffmanTree
+from hencoding.block_model import BlockModelEncoding
+from tests import make_encoding, clear_lines, symbols_of
+
+BLOCK_SIZES = (1, 8, 64)
+
+
+class TestBlockModel(unittest.TestCase):
+    """
+    Block model encodings must round trip, and their estimates must match
+    the bits they encode.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._encoding = make_encoding()
+
+        # A second tree with other frequencies, so blocks choose between them
+        with TemporaryDirectory() as directory:
+            table = Path(directory) / "ascending.txt"
+            table.write_text(''.join(
+                f"{letter} - {index + 1}\n" for index, letter in
+                enumerate(ascii_lowercase)), encoding="utf-8")
+            cls._trees = [cls._encoding.get_tree(), HuffmanTree(table)]
+
+        # Long runs of a few rare letters, which inline trees encode best
+        cls._lines = clear_lines() + ["z" * 200, "qj x" * 50]
+
+    def _encodings(self) -> Iterator[Tuple[int, bool, BlockModelEncoding]]:
+        for block_size in BLOCK_SIZES:
+            for inline_trees in (False, True):
+                yield block_size, inline_trees, BlockModelEncoding(
+                    self._trees, block_size=block_size,
+                    inline_trees=inline_trees)
+
+    def test_round_trip(self) -> None:
+        for block_size, inline_trees, encoding in self._encodings():
+            for line in self._lines:
+                with self.subTest(block_size=block_size,
+                                  inline_trees=inline_trees, line=line):
+                    self.assertEqual(encoding.decode(encoding.encode(line)),
+                                     symbols_of(self._encoding, line))
+
+    def test_estimate_bits_matches_encode(self) -> None:
+        for block_size, inline_trees, encoding in self._encodings():
+            for line in self._lines:
+                with self.subTest(block_size=block_size,
+                                  inline_trees=inline_trees, line=line):
+                    self.assertEqual(encoding.estimate_bits(line),
+                                     len(encoding.encode(line)))
+
+
+if __name__ == "__main__":
+    unittest.main()
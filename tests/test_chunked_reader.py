@@ -0,0 +1,83 @@
+"""
+test_chunked_reader
+
+This module contains regression tests for reading and converting lines in
+fixed-size pieces, on their own and in run_stream's chunk_size mode.
+"""
+import unittest
+from io import StringIO
+from typing import Optional, Tuple
+from hencoding.stream import run_stream, ERROR_PREFIX
+from hencoding.chunked_reader import convert_line_chunks
+from tests import FREQUENCY_TABLE, RESOURCES, ENCODED_FILES, make_encoding, \
+    clear_lines
+
+# Input files encoded by the stream tests, including failing and empty lines
+ENCODE_FILES = ("ClearText.txt", "repeats.txt", "all_invalid.txt",
+                "empty_lines.txt")
+
+CHUNK_SIZES = (1, 3, 64)
+
+
+class TestChunkedReader(unittest.TestCase):
+    """
+    Converting lines in pieces must give the same results, sizes, and counts
+    as converting whole lines.
+    """
+
+    def _run_stream(self, text: str, encode: bool,
+                    chunk_size: Optional[int], sample_rate=1) -> Tuple:
+        output = StringIO()
+        performance = run_stream(FREQUENCY_TABLE, StringIO(text), output,
+                                 StringIO(), encode=encode,
+                                 decode=not encode, chunk_size=chunk_size,
+                                 sample_rate=sample_rate)
+
+        sizes = {size: len(runtimes) for size, runtimes
+                 in performance.get_successes().items()}
+        error_sizes = {size: len(runtimes) for size, runtimes
+                       in performance.get_errors().items()}
+
+        # Pieces converted before an error are written ahead of its marker
+        lines = [line[line.find(ERROR_PREFIX):] if ERROR_PREFIX in line
+                 else line for line in output.getvalue().split('\n')]
+
+        return (lines, sizes, error_sizes,
+                performance.get_num_successes(), performance.get_num_errors(),
+                performance.get_total_symbols(), performance.get_total_bits())
+
+    def _assert_chunks_match(self, name: str, encode: bool) -> None:
+        text = (RESOURCES / name).read_text(encoding="utf-8")
+        # Surrounding whitespace must not count towards a line's size
+        text = '\n'.join(f"  {line}\t" for line in text.split('\n'))
+
+        for sample_rate in (1, 2):
+            expected = self._run_stream(text, encode, None, sample_rate)
+            for chunk_size in CHUNK_SIZES:
+                with self.subTest(name=name, chunk_size=chunk_size,
+                                  sample_rate=sample_rate):
+                    self.assertEqual(
+                        self._run_stream(text, encode, chunk_size,
+                                         sample_rate), expected)
+
+    def test_stream_encode_matches_whole_lines(self) -> None:
+        for name in ENCODE_FILES:
+            self._assert_chunks_match(name, encode=True)
+
+    def test_stream_decode_matches_whole_lines(self) -> None:
+        for name in ENCODED_FILES:
+            self._assert_chunks_match(name, encode=False)
+
+    def test_decode_round_trip(self) -> None:
+        encoding = make_encoding()
+        encoded = encoding.encode(' '.join(clear_lines()))
+
+        for chunk_size in CHUNK_SIZES:
+            with self.subTest(chunk_size=chunk_size):
+                pieces = [piece for _, _, piece, _, _ in convert_line_chunks(
+                    encoding, StringIO(encoded), chunk_size=chunk_size)]
+                self.assertEqual(''.join(pieces), encoding.decode(encoded))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+test_encoded_ops
+
+This module contains regression tests for concatenating and slicing encoded
+data without decoding it.
+"""
+import unittest
+from hencoding.encoded_ops import SymbolIndex, concat_packed, \
+    concat_encoded, slice_packed, slice_encoded
+from hencoding.packed_bits import pack_bits, unpack_bits
+from tests import make_encoding, clear_lines, symbols_of
+
+
+class TestEncodedOps(unittest.TestCase):
+    """
+    Concatenated and sliced encoded data must decode to the decoded text
+    joined or sliced.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._encoding = make_encoding()
+        cls._tree = cls._encoding.get_tree()
+        cls._lines = clear_lines()
+        cls._encoded = [cls._encoding.encode(line) for line in cls._lines]
+        cls._symbols = ''.join(symbols_of(cls._encoding, line)
+                               for line in cls._lines)
+
+        # Ranges at and around both ends, and across the middle
+        size = len(cls._symbols)
+        cls._ranges = [(start, stop) for start in (0, 1, 7, size // 2, size)
+                       for stop in (start, start + 1, start + 13, size)
+                       if stop <= size]
+
+    def _decode_packed(self, packed: bytes, bit_length: int) -> str:
+        return self._encoding.decode(unpack_bits(packed, bit_length))
+
+    def test_concat_encoded_matches_decode(self) -> None:
+        self.assertEqual(
+            self._encoding.decode(concat_encoded(
+                f" {encoded}\n" for encoded in self._encoded)),
+            self._symbols)
+
+    def test_concat_packed_matches_decode(self) -> None:
+        # Most parts end mid-byte, so their padding must be dropped
+        packed, bit_length = concat_packed(
+            pack_bits(encoded) for encoded in self._encoded)
+        self.assertEqual(self._decode_packed(packed, bit_length),
+                         self._symbols)
+
+    def test_slice_encoded_matches_decode(self) -> None:
+        encoded = ''.join(self._encoded)
+
+        for start, stop in self._ranges:
+            with self.subTest(start=start, stop=stop):
+                self.assertEqual(
+                    self._encoding.decode(slice_encoded(self._tree, encoded,
+                                                        start, stop)),
+                    self._symbols[start:stop])
+
+    def test_slice_packed_matches_decode(self) -> None:
+        packed, bit_length = pack_bits(''.join(self._encoded))
+
+        for interval in (None, 1, 5, 64):
+            index = None if interval is None else \
+                SymbolIndex.build(self._tree, packed, bit_length, interval)
+            for start, stop in self._ranges:
+                with self.subTest(interval=interval, start=start, stop=stop):
+                    self.assertEqual(
+                        self._decode_packed(*slice_packed(
+                            self._tree, packed, bit_length, start, stop,
+                            index)),
+                        self._symbols[start:stop])
+
+    def test_slice_past_end_raises(self) -> None:
+        encoded = ''.join(self._encoded)
+        size = len(self._symbols)
+
+        with self.assertRaises(ValueError):
+            slice_encoded(self._tree, encoded, 0, size + 1)
+        with self.assertRaises(ValueError):
+            slice_encoded(self._tree, encoded, 2, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
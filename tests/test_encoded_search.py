@@ -0,0 +1,66 @@
+"""
+test_encoded_search
+
+This module contains regression tests for finding text inside encoded data
+without decoding it.
+"""
+import unittest
+from typing import List, Tuple
+from hencoding.encoded_search import EncodedSearch
+from hencoding.packed_bits import pack_bits
+from tests import make_encoding, clear_lines, symbols_of
+
+
+class TestEncodedSearch(unittest.TestCase):
+    """
+    Matches in encoded data must be the matches of a plain-text find on the
+    decoded text.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._encoding = make_encoding()
+        cls._text = ' '.join(clear_lines())
+        cls._symbols = symbols_of(cls._encoding, cls._text)
+
+        # Every substring of up to 3 symbols, and longer words of the text
+        patterns = {cls._symbols[start:start + size]
+                    for size in (1, 2, 3)
+                    for start in range(len(cls._symbols) - size + 1)}
+        patterns.update(word for word in cls._text.lower().split()
+                        if word.isalpha())
+        cls._patterns = sorted(patterns) + ["zzz", "qxj"]
+
+    def _expected(self, pattern: str) -> List[Tuple[int, int]]:
+        # Plain-text find, with each match's offset in the encoded text
+        matches = []
+        start = self._symbols.find(pattern)
+
+        while start != -1:
+            matches.append((len(self._encoding.encode(self._symbols[:start])),
+                            start))
+            start = self._symbols.find(pattern, start + 1)
+
+        return matches
+
+    def test_find_all_matches_plain_find(self) -> None:
+        encoded = self._encoding.encode(self._text)
+
+        for pattern in self._patterns:
+            with self.subTest(pattern=pattern):
+                search = EncodedSearch(self._encoding.get_tree(), pattern)
+                self.assertEqual(search.find_all(encoded),
+                                 self._expected(pattern))
+
+    def test_find_all_packed_matches_plain_find(self) -> None:
+        packed, bit_length = pack_bits(self._encoding.encode(self._text))
+
+        for pattern in self._patterns:
+            with self.subTest(pattern=pattern):
+                search = EncodedSearch(self._encoding.get_tree(), pattern)
+                self.assertEqual(search.find_all_packed(packed, bit_length),
+                                 self._expected(pattern))
+
+
+if __name__ == "__main__":
+    unittest.main()
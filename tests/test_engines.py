@@ -0,0 +1,76 @@
+"""
+test_engines
+
+This module contains regression tests for encoding with each of the encoding
+engines, and with the engine chosen per line size.
+"""
+import unittest
+from typing import Iterator, Tuple
+from hencoding.engines import AUTO_ENGINE, ENGINE_NAMES, EngineEncoding
+from tests import RESOURCES, make_encoding, clear_lines
+
+# Cost model that switches engines twice, so auto mode uses each of them
+SWITCHING_COST_MODEL = {
+    1: {"traversal": 1, "table": 2, "translate": 3},
+    16: {"traversal": 3, "table": 1, "translate": 2},
+    64: {"traversal": 3, "table": 2, "translate": 1},
+}
+
+
+class TestEngines(unittest.TestCase):
+    """
+    Every engine must encode exactly as HuffmanEncoding.encode does, and
+    raise the same errors.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._encoding = make_encoding()
+        cls._tree = cls._encoding.get_tree()
+
+        lines = clear_lines()
+        cls._lines = lines + [' '.join(lines), "", "   "]
+
+        with open(RESOURCES / "all_invalid.txt", 'r',
+                  encoding="utf-8") as file:
+            cls._invalid_lines = [line.strip() for line in file
+                                  if line.strip()]
+
+    def _engines(self) -> Iterator[Tuple[str, 'EngineEncoding']]:
+        for engine in ENGINE_NAMES:
+            yield engine, EngineEncoding(self._tree, engine=engine)
+        yield AUTO_ENGINE, EngineEncoding(self._tree)
+        yield "switching", EngineEncoding(
+            self._tree, cost_model=SWITCHING_COST_MODEL)
+
+    def test_encode_matches_huffman_encoding(self) -> None:
+        for engine, encoding in self._engines():
+            for line in self._lines:
+                with self.subTest(engine=engine, line=line):
+                    self.assertEqual(encoding.encode(line),
+                                     self._encoding.encode(line))
+
+    def test_switching_uses_every_engine(self) -> None:
+        encoding = EngineEncoding(self._tree,
+                                  cost_model=SWITCHING_COST_MODEL)
+
+        for line in self._lines:
+            encoding.encode(line)
+
+        self.assertTrue(all(lines for lines, _ in
+                            encoding.get_engine_usage().values()))
+
+    def test_invalid_lines_raise_same_error(self) -> None:
+        for engine, encoding in self._engines():
+            for line in self._invalid_lines:
+                with self.subTest(engine=engine, line=line):
+                    with self.assertRaises(ValueError) as expected:
+                        self._encoding.encode(line)
+                    with self.assertRaises(ValueError) as raised:
+                        encoding.encode(line)
+                    self.assertEqual(str(raised.exception),
+                                     str(expected.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
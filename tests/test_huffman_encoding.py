@@ -0,0 +1,48 @@
+"""
+test_huffman_encoding
+
+This module contains regression tests for the encoded-size estimates and
+symbol counts of HuffmanEncoding, which dry runs report in place of encoding.
+"""
+import unittest
+from tests import RESOURCES, make_encoding, clear_lines
+
+
+class TestHuffmanEncoding(unittest.TestCase):
+    """
+    Estimates must match the sizes that encoding actually produces.
+    """
+
+    def test_estimate_bits_matches_encode(self) -> None:
+        for memo in (False, True):
+            encoding = make_encoding(memo=memo)
+            for line in clear_lines():
+                with self.subTest(memo=memo, line=line):
+                    self.assertEqual(encoding.estimate_bits(line),
+                                     len(encoding.encode(line)))
+
+    def test_count_symbols_matches_decode(self) -> None:
+        encoding = make_encoding()
+        for line in clear_lines():
+            with self.subTest(line=line):
+                self.assertEqual(
+                    encoding.count_symbols(line),
+                    len(encoding.decode(encoding.encode(line))))
+
+    def test_estimate_errors_match_encode(self) -> None:
+        encoding = make_encoding()
+        text = (RESOURCES / "all_invalid.txt").read_text(encoding="utf-8")
+
+        for line in filter(None, map(str.strip, text.split('\n'))):
+            with self.subTest(line=line):
+                with self.assertRaises(ValueError) as encoded:
+                    encoding.encode(line)
+                with self.assertRaises(ValueError) as estimated:
+                    encoding.estimate_bits(line)
+
+                self.assertEqual(estimated.exception.args,
+                                 encoded.exception.args)
+
+
+if __name__ == "__main__":
+    unittest.main()
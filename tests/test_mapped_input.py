@@ -0,0 +1,79 @@
+"""
+test_mapped_input
+
+This module contains regression tests for decoding through a memory map, in
+the mapped_input module and with run's mapped option.
+"""
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from hencoding.run import run
+from hencoding.mapped_input import MappedEncodedFile
+from hencoding.packed_bits import write_packed_file
+from tests import FREQUENCY_TABLE, RESOURCES, ENCODED_FILES, make_encoding, \
+    clear_lines, mask_runtimes
+
+
+class TestMappedInput(unittest.TestCase):
+    """
+    Mapped decoding must give the same results as decoding each line's text.
+    """
+
+    def setUp(self) -> None:
+        self._directory = TemporaryDirectory()
+        self._path = Path(self._directory.name)
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def _run_output(self, input_file: Path, mapped: bool) -> str:
+        output_file = self._path / f"output_{mapped}.txt"
+        run(FREQUENCY_TABLE, input_file, output_file, decode=True,
+            mapped=mapped)
+        return mask_runtimes(output_file.read_text(encoding="utf-8"))
+
+    def test_run_output_matches_decode(self) -> None:
+        for name in ENCODED_FILES:
+            with self.subTest(name=name):
+                self.assertEqual(
+                    self._run_output(RESOURCES / name, mapped=True),
+                    self._run_output(RESOURCES / name, mapped=False))
+
+    def test_unicode_whitespace_matches_decode(self) -> None:
+        # NBSP and \x1c are whitespace to str.strip but not bytes.strip
+        input_file = self._path / "whitespace.txt"
+        input_file.write_bytes(b"0101\n\xc2\xa0\n\x1c\n\xc2\xa00111\xc2\xa0\n"
+                               b"01\xc2\xa011\n0\xc3\xa9\n")
+
+        self.assertEqual(self._run_output(input_file, mapped=True),
+                         self._run_output(input_file, mapped=False))
+
+    def test_decode_lines_round_trip(self) -> None:
+        encoding = make_encoding()
+        lines = clear_lines()
+        input_file = self._path / "encoded.txt"
+        input_file.write_text(
+            '\n'.join(encoding.encode(line) for line in lines) + '\n',
+            encoding="utf-8")
+
+        with MappedEncodedFile(input_file) as mapped_file:
+            results = list(mapped_file.decode_lines(encoding))
+
+        self.assertEqual(results,
+                         [(encoding.decode(encoding.encode(line)), False)
+                          for line in lines])
+
+    def test_packed_round_trip(self) -> None:
+        encoding = make_encoding()
+        encoded = ''.join(encoding.encode(line) for line in clear_lines())
+        input_file = self._path / "encoded.bin"
+        write_packed_file(input_file, encoded)
+
+        with MappedEncodedFile(input_file, packed=True) as mapped_file:
+            results = list(mapped_file.decode_lines(encoding))
+
+        self.assertEqual(results, [(encoding.decode(encoded), False)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+test_parallel
+
+This module contains regression tests for encoding and decoding long lines
+in parallel chunks.
+"""
+import unittest
+from hencoding.parallel import ParallelHuffmanEncoding
+from tests import make_encoding, clear_lines
+
+
+class TestParallel(unittest.TestCase):
+    """
+    Parallel conversions must give the same results as serial ones.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._encoding = make_encoding()
+        cls._text = ' '.join(clear_lines())
+
+        # Small chunks, so every line is split across the workers
+        cls._parallel = ParallelHuffmanEncoding(
+            cls._encoding.get_tree(), max_workers=2, chunk_size=16)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._parallel.close()
+
+    def test_encode_matches_serial(self) -> None:
+        self.assertEqual(self._parallel.encode(self._text),
+                         self._encoding.encode(self._text))
+
+    def test_decode_round_trip(self) -> None:
+        # Words are separated by whitespace, where decoding is split
+        encoded = ' '.join(self._encoding.encode(line)
+                           for line in clear_lines())
+        self.assertEqual(self._parallel.decode(encoded),
+                         self._encoding.decode(encoded))
+
+    def test_speculative_decode_round_trip(self) -> None:
+        # One bitstream without whitespace, so chunks guess code boundaries
+        encoded = self._encoding.encode(self._text)
+        self.assertEqual(self._parallel.decode_speculative(encoded),
+                         self._encoding.decode(encoded))
+
+        with self.assertRaises(ValueError):
+            self._parallel.decode_speculative(encoded[:-1])
+
+    def test_errors_match_serial(self) -> None:
+        expression = self._text + " 5"
+        with self.assertRaises(ValueError) as serial:
+            self._encoding.encode(expression)
+        with self.assertRaises(ValueError) as parallel:
+            self._parallel.encode(expression)
+
+        self.assertEqual(parallel.exception.args, serial.exception.args)
+
+
+if __name__ == "__main__":
+    unittest.main()
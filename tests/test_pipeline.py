@@ -0,0 +1,61 @@
+"""
+test_pipeline
+
+This module contains regression tests for run's pipelined mode, which reads,
+converts, and writes in overlapping threads.
+"""
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from hencoding.run import run
+from tests import FREQUENCY_TABLE, RESOURCES, ENCODED_FILES, mask_runtimes
+
+# Input files encoded by the pipeline tests
+ENCODE_FILES = ("ClearText.txt", "repeats.txt", "all_invalid.txt",
+                "empty_lines.txt", "empty.txt")
+
+PIPELINE_REPORT = "\n\n-------Pipeline Report-------\n"
+
+
+class TestPipeline(unittest.TestCase):
+    """
+    Pipelined runs must write the same output as plain runs, followed by the
+    pipeline report.
+    """
+
+    def setUp(self) -> None:
+        self._directory = TemporaryDirectory()
+        self._path = Path(self._directory.name)
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def _run_output(self, name: str, encode: bool, pipelined: bool,
+                    queue_size=2) -> str:
+        output_file = self._path / f"output_{pipelined}.txt"
+        run(FREQUENCY_TABLE, RESOURCES / name, output_file, encode=encode,
+            decode=not encode, pipelined=pipelined, queue_size=queue_size)
+        return mask_runtimes(output_file.read_text(encoding="utf-8"))
+
+    def _assert_pipeline_matches(self, name: str, encode: bool) -> None:
+        expected = self._run_output(name, encode, pipelined=False)
+        output = self._run_output(name, encode, pipelined=True)
+
+        start = output.index(PIPELINE_REPORT)
+        end = output.rindex("\nDone.")
+        self.assertEqual(output[:start] + output[end:], expected)
+        self.assertIn("Write queue:", output[start:end])
+
+    def test_encode_matches_plain(self) -> None:
+        for name in ENCODE_FILES:
+            with self.subTest(name=name):
+                self._assert_pipeline_matches(name, encode=True)
+
+    def test_decode_matches_plain(self) -> None:
+        for name in ENCODED_FILES:
+            with self.subTest(name=name):
+                self._assert_pipeline_matches(name, encode=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+test_stream
+
+This module contains regression tests for encoding and decoding open streams
+with run_stream.
+"""
+import unittest
+from io import StringIO
+from hencoding.stream import run_stream, ERROR_PREFIX
+from tests import FREQUENCY_TABLE, RESOURCES, make_encoding, symbols_of
+
+# Input files streamed, including failing and empty lines
+STREAM_FILES = ("ClearText.txt", "repeats.txt", "all_invalid.txt",
+                "empty_lines.txt", "single_char.txt")
+
+
+def _stream(text: str, encode: bool) -> str:
+    """
+    Helper function for converting text through run_stream
+
+    Args:
+        text (str): input stream text
+        encode (bool): True if encoding, otherwise decoding
+
+    Returns:
+        str: output stream text
+    """
+    output = StringIO()
+    run_stream(FREQUENCY_TABLE, StringIO(text), output, StringIO(),
+               encode=encode, decode=not encode)
+    return output.getvalue()
+
+
+class TestStream(unittest.TestCase):
+    """
+    Streamed lines must match plain conversions, one output line per input
+    line.
+    """
+
+    def test_encode_matches_plain(self) -> None:
+        encoding = make_encoding()
+
+        for name in STREAM_FILES:
+            lines = (RESOURCES / name).read_text(encoding="utf-8") \
+                .splitlines()
+            with self.subTest(name=name):
+                expected = []
+                for line in lines:
+                    try:
+                        expected.append(encoding.encode(line.strip()))
+                    except ValueError as ve:
+                        expected.append(ERROR_PREFIX + ve.args[0])
+
+                self.assertEqual(_stream('\n'.join(lines), True).split('\n'),
+                                 expected + [""])
+
+    def test_round_trip(self) -> None:
+        encoding = make_encoding()
+
+        for name in STREAM_FILES:
+            lines = (RESOURCES / name).read_text(encoding="utf-8") \
+                .splitlines()
+            with self.subTest(name=name):
+                encoded = _stream('\n'.join(lines), True)
+                decoded = _stream(encoded, False).split('\n')
+
+                self.assertEqual(len(decoded), len(lines) + 1)
+                for line, result in zip(lines, decoded):
+                    try:
+                        encoding.encode(line)
+                    except ValueError:
+                        # Error markers are not binary, so they fail again
+                        self.assertTrue(result.startswith(ERROR_PREFIX))
+                        continue
+
+                    self.assertEqual(result, symbols_of(encoding, line))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+test_transforms
+
+This module contains regression tests for the reversible transforms applied
+before Huffman Encoding.
+"""
+import unittest
+from itertools import permutations
+from random import Random
+from typing import Iterator, List
+from hencoding.transforms import TRANSFORMS, TransformChain, \
+    TransformEncoding
+from tests import make_encoding, clear_lines, symbols_of
+
+
+class TestTransforms(unittest.TestCase):
+    """
+    Every chain of transforms must round trip, alone and with encoding.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._encoding = make_encoding()
+        random = Random(0)
+
+        # Runs of every length around the run threshold, and random text
+        cls._symbols = [symbols_of(cls._encoding, line)
+                        for line in clear_lines()]
+        cls._symbols += ["", "a", "ab" * 40, "z" * 100] + \
+            [letter * length for letter in "aq" for length in range(1, 40)]
+        cls._symbols += [''.join(random.choice("abcz") for _ in range(size))
+                         for size in range(1, 200, 7)]
+
+    def _chains(self) -> Iterator[List[str]]:
+        for size in range(1, len(TRANSFORMS) + 1):
+            for names in permutations(TRANSFORMS, size):
+                yield list(names)
+
+    def test_chain_round_trip(self) -> None:
+        for names in self._chains():
+            chain = TransformChain(names)
+            for symbols in self._symbols:
+                with self.subTest(names=names, symbols=symbols):
+                    self.assertEqual(chain.inverse(chain.forward(symbols)),
+                                     symbols)
+
+    def test_encoding_round_trip(self) -> None:
+        for names in self._chains():
+            encoding = TransformEncoding(self._encoding,
+                                         TransformChain(names))
+            for line in clear_lines():
+                with self.subTest(names=names, line=line):
+                    encoded = encoding.encode(line)
+                    self.assertEqual(encoding.decode(encoded),
+                                     symbols_of(self._encoding, line))
+                    self.assertEqual(encoding.estimate_bits(line),
+                                     len(encoded))
+
+
+if __name__ == "__main__":
+    unittest.main()